@@ -13,8 +13,9 @@ from flask import Flask
 
 # Local application imports
 from config import DevelopmentConfig
-from .extensions import db
-from .utils.ui_utils import highlight_keywords
+from .extensions import db, task_queue
+from .utils.ui_utils import highlight_keywords, highlight_skills
+from .utils import timing, db_profile, schema
 
 
 def create_app(config_class=DevelopmentConfig):
@@ -26,10 +27,15 @@ def create_app(config_class=DevelopmentConfig):
 
     # Load configuration from the specified config object
     app.config.from_object(config_class)
+    db_profile.init_app(app)
     db.init_app(app)
+    db_profile.init_engines(app, db)
+    timing.init_app(app)
+    task_queue.init_app(app)
 
     # Register Custom Functionality
     app.jinja_env.filters['highlight'] = highlight_keywords
+    app.jinja_env.filters['highlight_skills'] = highlight_skills
 
     # Ensure Instance Folders Exist
     try:
@@ -44,15 +50,23 @@ def create_app(config_class=DevelopmentConfig):
         from . import models
 
         # Import and register all the application's route blueprints
-        from .routes import auth_routes, public_routes, recruiter_routes, candidate_routes
+        from .routes import (auth_routes, public_routes, recruiter_routes, candidate_routes, metrics_routes,
+                             admin_routes)
 
         app.register_blueprint(auth_routes.auth_bp)
         app.register_blueprint(public_routes.public_bp)
         app.register_blueprint(recruiter_routes.recruiter_bp)
         app.register_blueprint(candidate_routes.candidate_bp)
+        app.register_blueprint(metrics_routes.metrics_bp)
+        app.register_blueprint(admin_routes.admin_bp)
 
-        # Create all database tables defined in the models if they don't exist
+        # Create all database tables defined in the models if they don't exist, and add
+        # the columns introduced since to tables that do
         db.create_all()
+        schema.upgrade_schema(db.engine)
+
+        from .services.pool_matching import reset_outdated_matches
+        reset_outdated_matches()
 
     # Return the fully configured application instance
     return app
\ No newline at end of file
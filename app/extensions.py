@@ -4,5 +4,8 @@ This file initializes shared extensions to prevent circular import errors betwee
 app and its blueprints/models
 """
 from flask_sqlalchemy import SQLAlchemy
+from app.services.task_queue import BackgroundTaskQueue
+from app.utils.db_profile import RoutingSession
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+task_queue = BackgroundTaskQueue()
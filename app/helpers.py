@@ -3,22 +3,41 @@
 This module contains helper functions, specifically decorators, used across
 the route blueprints to handle common logic like authentication checks.
 """
+import inspect
 from functools import wraps
-from flask import session, redirect, url_for
+from flask import session, redirect, url_for, current_app
+from app.extensions import db
+from app.models import User
+
+def _access_denied(role):
+    """Returns the response for a user who may not open the page, or None if they may."""
+    if 'user_id' not in session:
+        return redirect(url_for('public.login_page'))
+
+    if role == "admin":
+        # Admins are named by user ID in the config rather than by a role chosen at sign-up.
+        if session['user_id'] not in current_app.config['ADMIN_USER_IDS'] \
+                or db.session.get(User, session['user_id']) is None:
+            return "<h1>403 Forbidden: You do not have access to this page.</h1>", 403
+    elif role != "any" and session.get('role') != role:
+        return "<h1>403 Forbidden: You do not have access to this page.</h1>", 403
+
+    return None
 
 def login_required(role="any"):
     """
     A decorator to protect routes that require a user to be logged in.
+    Works for both regular and async views.
     """
     def decorator(f):
+        if inspect.iscoroutinefunction(f):
+            @wraps(f)
+            async def decorated_coroutine(*args, **kwargs):
+                return _access_denied(role) or await f(*args, **kwargs)
+            return decorated_coroutine
+
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if 'user_id' not in session:
-                return redirect(url_for('public.login_page'))
-
-            if role != "any" and session.get('role') != role:
-                return "<h1>403 Forbidden: You do not have access to this page.</h1>", 403
-
-            return f(*args, **kwargs)
+            return _access_denied(role) or f(*args, **kwargs)
         return decorated_function
-    return decorator
\ No newline at end of file
+    return decorator
@@ -5,4 +5,9 @@ This file makes the 'models' directory a Python package and exposes the model cl
 from .user import User
 from .job import Job
 from .resume import Resume
-from .application import Application
\ No newline at end of file
+from .application import Application
+from .application_features import ApplicationFeatures, FEATURE_NAMES, FEATURE_SCHEMA_VERSION
+from .job_pool_match import JobPoolMatch
+from .document_embedding import DocumentEmbedding
+from .resume_signature import ResumeSignature
+from .resume_lsh_bucket import ResumeLshBucket
\ No newline at end of file
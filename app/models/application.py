@@ -24,10 +24,16 @@ class Application(db.Model):
     # This will hold the final score from our ML model later
     final_score = db.Column(db.Float, nullable=True)
 
+    # 'pending' while the application waits for background scoring, then 'scored' or 'failed'.
+    scoring_status = db.Column(db.String(20), nullable=False, default='scored')
+
     # Relationships
     job = db.relationship('Job', back_populates='applications')
     candidate = db.relationship('User')
     resume = db.relationship('Resume')
+    # Typed copy of feature_scores, one column per feature
+    features = db.relationship('ApplicationFeatures', back_populates='application', uselist=False,
+                               cascade="all, delete-orphan")
 
     def __init__(self, job_id, candidate_id, resume_id, feature_scores=None, final_score=None, **kwargs):
         """
@@ -38,8 +44,18 @@ class Application(db.Model):
         self.job_id = job_id
         self.candidate_id = candidate_id
         self.resume_id = resume_id
-        self.feature_scores = feature_scores
         self.final_score = final_score
+        if feature_scores is not None:
+            self.set_feature_scores(feature_scores)
+
+    def set_feature_scores(self, feature_vector: dict):
+        """Stores a feature vector both as the JSON blob and in the typed ApplicationFeatures row."""
+        from .application_features import ApplicationFeatures
+
+        self.feature_scores = feature_vector
+        if self.features is None:
+            self.features = ApplicationFeatures()
+        self.features.update_from(feature_vector)
 
     def __repr__(self) -> str:
         """String representation of the Application object."""
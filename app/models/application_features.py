@@ -0,0 +1,57 @@
+# app/models/application_features.py
+from datetime import datetime, timezone
+from app.extensions import db
+
+# Bump FEATURE_SCHEMA_VERSION whenever a feature is added, removed or computed differently.
+FEATURE_SCHEMA_VERSION = 2
+FEATURE_NAMES = (
+    "overall_similarity",
+    "experience_similarity",
+    "skills_similarity",
+    "accomplishment_score",
+    "readability_score",
+    "skill_jaccard",
+    "skill_coverage",
+)
+
+
+class ApplicationFeatures(db.Model):
+    """
+    The feature vector of an application, one float column per feature, so it can
+    be filtered and sorted in SQL and loaded as a numeric matrix.
+    """
+    __tablename__ = 'application_features'
+    __table_args__ = (
+        db.Index('ix_application_features_version', 'schema_version'),
+    )
+
+    application_id = db.Column(db.String(36), db.ForeignKey('application.id'), primary_key=True)
+    schema_version = db.Column(db.Integer, nullable=False, default=FEATURE_SCHEMA_VERSION)
+
+    overall_similarity = db.Column(db.Float, nullable=False, default=0.0)
+    experience_similarity = db.Column(db.Float, nullable=False, default=0.0)
+    skills_similarity = db.Column(db.Float, nullable=False, default=0.0)
+    accomplishment_score = db.Column(db.Float, nullable=False, default=0.0)
+    readability_score = db.Column(db.Float, nullable=False, default=0.0)
+    skill_jaccard = db.Column(db.Float, nullable=False, default=0.0)
+    skill_coverage = db.Column(db.Float, nullable=False, default=0.0)
+
+    date_computed = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                              onupdate=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    application = db.relationship('Application', back_populates='features')
+
+    def update_from(self, feature_vector: dict):
+        """Copies a feature vector dict into the typed columns; missing features become 0."""
+        for name in FEATURE_NAMES:
+            value = feature_vector.get(name, 0.0)
+            setattr(self, name, float(value) if isinstance(value, (int, float)) else 0.0)
+        self.schema_version = FEATURE_SCHEMA_VERSION
+
+    def to_vector(self) -> dict:
+        """Returns the features as the dict produced by RankingService.generate_feature_vector."""
+        return {name: getattr(self, name) for name in FEATURE_NAMES}
+
+    def __repr__(self) -> str:
+        return f"<ApplicationFeatures application_id='{self.application_id}' version={self.schema_version}>"
@@ -0,0 +1,30 @@
+# app/models/document_embedding.py
+from datetime import datetime, timezone
+from app.extensions import db
+import uuid
+
+class DocumentEmbedding(db.Model):
+    """
+    A stored sentence embedding of a job or resume text. The content hash ties the
+    vector to the exact text it was computed from, so stale vectors are recomputed.
+    """
+    __tablename__ = 'document_embedding'
+    __table_args__ = (
+        db.UniqueConstraint('doc_type', 'doc_id', 'section', name='uq_document_embedding_doc_section'),
+        db.Index('ix_document_embedding_type_date', 'doc_type', 'date_updated'),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    doc_type = db.Column(db.String(20), nullable=False)  # 'job' or 'resume'
+    doc_id = db.Column(db.String(36), nullable=False)
+    section = db.Column(db.String(50), nullable=False, default='overall')
+
+    model_name = db.Column(db.String(100), nullable=False)
+    content_hash = db.Column(db.String(40), nullable=False)
+    # float32 vector bytes, L2-normalized
+    vector = db.Column(db.LargeBinary, nullable=False)
+    date_updated = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                             onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self) -> str:
+        return f"<DocumentEmbedding {self.doc_type}='{self.doc_id}' section='{self.section}'>"
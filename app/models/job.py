@@ -1,6 +1,7 @@
 # app/models/job.py
 from datetime import datetime, timezone
 from app.extensions import db
+from app.models.types import CompressedJSON
 import uuid
 
 class Job(db.Model):
@@ -15,8 +16,13 @@ class Job(db.Model):
     processed_description = db.Column(db.Text, nullable=True)
     date_created = db.Column(db.DateTime, default=datetime.now(timezone.utc))
 
-    # JSON column to store the sectioned document
-    sectioned_text = db.Column(db.JSON, nullable=True)
+    # JSON column to store the sectioned document, zlib-compressed
+    sectioned_text = db.Column(CompressedJSON, nullable=True)
+
+    # When the recruiter's talent pool was last fully scored against this job (see JobPoolMatch).
+    pool_matched_at = db.Column(db.DateTime, nullable=True)
+    # The feature schema and ranking model those matches were scored with; other versions are stale.
+    pool_scoring_version = db.Column(db.String(120), nullable=True)
 
     # Foreign Key to link to the User who uploaded the job
     uploader_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
@@ -27,5 +33,8 @@ class Job(db.Model):
     # One-to-many relationship with Application
     applications = db.relationship('Application', back_populates='job', lazy=True, cascade="all, delete-orphan")
 
+    # One-to-many relationship with the precomputed talent-pool matches
+    pool_matches = db.relationship('JobPoolMatch', back_populates='job', lazy=True, cascade="all, delete-orphan")
+
     def __repr__(self) -> str:
         return f"<Job id = '{self.id}' title= '{self.title}'>"
\ No newline at end of file
@@ -0,0 +1,32 @@
+# app/models/job_pool_match.py
+from datetime import datetime, timezone
+from app.extensions import db
+import uuid
+
+class JobPoolMatch(db.Model):
+    """
+    A precomputed score of a talent-pool resume against a job, maintained in the
+    background so the ranking page can read passive candidates with one query.
+    """
+    __tablename__ = 'job_pool_match'
+    __table_args__ = (
+        db.UniqueConstraint('job_id', 'resume_id', name='uq_job_pool_match_job_resume'),
+        db.Index('ix_job_pool_match_job_score', 'job_id', 'score'),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    job_id = db.Column(db.String(36), db.ForeignKey('job.id'), nullable=False)
+    resume_id = db.Column(db.String(36), db.ForeignKey('resume.id'), nullable=False)
+
+    score = db.Column(db.Float, nullable=False)
+    feature_scores = db.Column(db.JSON, nullable=True)
+    # The feature schema and ranking model the score was computed with (see pool_scoring_version()).
+    scoring_version = db.Column(db.String(120), nullable=True)
+    date_computed = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    job = db.relationship('Job', back_populates='pool_matches')
+    resume = db.relationship('Resume')
+
+    def __repr__(self) -> str:
+        return f"<JobPoolMatch job_id='{self.job_id}' resume_id='{self.resume_id}' score={self.score}>"
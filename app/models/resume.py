@@ -1,6 +1,7 @@
 # app/models/resume.py
 from datetime import datetime, timezone
 from app.extensions import  db
+from app.models.types import CompressedText, CompressedJSON
 import uuid
 
 class Resume(db.Model):
@@ -9,14 +10,22 @@ class Resume(db.Model):
     """
 
     __tablename__ = 'resume'
+    __table_args__ = (
+        # One resume per version number and candidate; talent-pool resumes have no candidate.
+        db.Index('uq_resume_candidate_version', 'candidate_id', 'version', unique=True),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     original_filename = db.Column(db.String(255), nullable=False)
+    # Name of the uploaded file in uploads/resumes: '<SHA-256 prefix>-<secure filename>',
+    # so uploads with the same name from different users do not overwrite each other.
+    stored_filename = db.Column(db.String(255), nullable=True)
 
-    extracted_text = db.Column(db.Text, nullable=True)
+    # Large values are stored zlib-compressed (see app/models/types.py)
+    extracted_text = db.Column(CompressedText, nullable=True)
     date_uploaded = db.Column(db.DateTime, default= datetime.now(timezone.utc))
 
-    sectioned_text = db.Column(db.JSON, nullable=True)
+    sectioned_text = db.Column(CompressedJSON, nullable=True)
 
     #Foreign Key to link to the User (candidate) who owns the resume
     candidate_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=True)
@@ -31,11 +40,26 @@ class Resume(db.Model):
     # Distinguish between resumes from application vs the talent pool.
     source = db.Column(db.String(50), nullable=False, default='application')
 
+    # Set when the resume is a near-duplicate of another talent-pool resume; such
+    # resumes are kept for the record but left out of matching.
+    duplicate_of_id = db.Column(db.String(36), db.ForeignKey('resume.id'), nullable=True)
+
+    # A candidate's re-uploads are stored as new versions instead of overwriting the
+    # resume, so every application keeps the text it was scored on.
+    version = db.Column(db.Integer, nullable=False, default=1)
+    previous_version_id = db.Column(db.String(36), db.ForeignKey('resume.id'), nullable=True)
+    # SHA-1 of extracted_text, to recognise an unchanged re-upload and to fingerprint pool shards.
+    content_hash = db.Column(db.String(40), nullable=True)
+
     # Many-to-one relationship with User
     candidate = db.relationship('User', foreign_keys=[candidate_id], back_populates='resumes')
 
     uploader = db.relationship('User', foreign_keys=[uploader_id])
 
+    duplicate_of = db.relationship('Resume', remote_side=[id], foreign_keys=[duplicate_of_id])
+
+    previous_version = db.relationship('Resume', remote_side=[id], foreign_keys=[previous_version_id])
+
     def __repr__(self)->str:
         """String representation of the Resume object."""
         if self.candidate:
@@ -0,0 +1,23 @@
+# app/models/resume_lsh_bucket.py
+from app.extensions import db
+import uuid
+
+class ResumeLshBucket(db.Model):
+    """
+    One locality-sensitive hashing band of a resume's MinHash signature. Resumes
+    sharing a bucket key within a scope are near-duplicate candidates, so a new
+    resume is only compared with the few resumes found by an indexed lookup.
+    """
+    __tablename__ = 'resume_lsh_bucket'
+    __table_args__ = (
+        db.Index('ix_resume_lsh_bucket_scope_key', 'scope', 'bucket_key'),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    scope = db.Column(db.String(50), nullable=False)
+    # Hash of the band number and the band's MinHash values
+    bucket_key = db.Column(db.BigInteger, nullable=False)
+    resume_id = db.Column(db.String(36), db.ForeignKey('resume.id'), nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<ResumeLshBucket scope='{self.scope}' resume_id='{self.resume_id}'>"
@@ -0,0 +1,20 @@
+# app/models/resume_signature.py
+from datetime import datetime, timezone
+from app.extensions import db
+
+class ResumeSignature(db.Model):
+    """
+    The MinHash signature of a resume's text, used to recognise near-duplicate
+    resumes within a scope (a recruiter's talent pool or a candidate's uploads).
+    """
+    __tablename__ = 'resume_signature'
+
+    resume_id = db.Column(db.String(36), db.ForeignKey('resume.id'), primary_key=True)
+    scope = db.Column(db.String(50), nullable=False)
+    # uint32 MinHash values
+    minhash = db.Column(db.LargeBinary, nullable=False)
+    date_computed = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                              onupdate=lambda: datetime.now(timezone.utc))
+
+    def __repr__(self) -> str:
+        return f"<ResumeSignature resume_id='{self.resume_id}' scope='{self.scope}'>"
@@ -0,0 +1,77 @@
+# app/models/types.py
+"""
+Column types that store large text and JSON values zlib-compressed.
+
+Stored values start with a one-byte marker: ZLIB_MARKER for compressed data and
+PLAIN_MARKER for values too small to be worth compressing. Values written
+before the columns were compressed (plain text, or JSON already decoded by the
+database driver) are still read correctly, so rows can be converted in batches
+by migrate_storage.py.
+"""
+import json
+import zlib
+from sqlalchemy.types import TypeDecorator, LargeBinary
+
+PLAIN_MARKER = b'\x00'
+ZLIB_MARKER = b'\x01'
+# Values shorter than this are stored uncompressed.
+MIN_COMPRESSED_BYTES = 128
+COMPRESSION_LEVEL = 6
+
+
+def compress_bytes(data: bytes) -> bytes:
+    if len(data) < MIN_COMPRESSED_BYTES:
+        return PLAIN_MARKER + data
+    return ZLIB_MARKER + zlib.compress(data, COMPRESSION_LEVEL)
+
+
+def decompress_bytes(value) -> bytes:
+    """Returns the original bytes of a stored value, including values stored before compression."""
+    if isinstance(value, str):
+        return value.encode('utf-8')
+    value = bytes(value)
+    if value[:1] == ZLIB_MARKER:
+        return zlib.decompress(value[1:])
+    if value[:1] == PLAIN_MARKER:
+        return value[1:]
+    return value
+
+
+def is_compressed(value) -> bool:
+    """Tells whether a raw stored value is already in the compressed storage format."""
+    return isinstance(value, (bytes, memoryview)) and bytes(value[:1]) in (PLAIN_MARKER, ZLIB_MARKER)
+
+
+class CompressedText(TypeDecorator):
+    """A Text column stored zlib-compressed."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_bytes(value.encode('utf-8'))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decompress_bytes(value).decode('utf-8')
+
+
+class CompressedJSON(TypeDecorator):
+    """A JSON column stored zlib-compressed. Like db.JSON, in-place changes are not tracked."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_bytes(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, (dict, list)):
+            # Legacy native JSON column, already decoded by the driver
+            return value
+        return json.loads(decompress_bytes(value))
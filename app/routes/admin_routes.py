@@ -0,0 +1,81 @@
+# app/routes/admin_routes.py
+# Profiling of the running worker process, for the accounts listed in ADMIN_USER_IDS
+import os
+import time
+from contextlib import contextmanager
+from flask import Blueprint, Response, request, jsonify, current_app
+from werkzeug.exceptions import BadRequest, Conflict
+from app.helpers import login_required
+from app.services.memory_report import service_memory_report
+from app.utils.profiling import (profile_lock, sample_stacks, render_collapsed, allocation_diff,
+                                 ALLOCATION_GROUPINGS)
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+def _window_seconds(default: float) -> float:
+    """Returns the 'seconds' query parameter, which must be within PROFILER_MAX_SECONDS."""
+    seconds = request.args.get('seconds', default, type=float)
+    if not 0 < seconds <= current_app.config['PROFILER_MAX_SECONDS']:
+        raise BadRequest(f"seconds must be between 0 and {current_app.config['PROFILER_MAX_SECONDS']}.")
+    return seconds
+
+
+@contextmanager
+def _exclusive_profile():
+    """Holds the process-wide profile lock, or refuses the request while another profile runs."""
+    if not profile_lock.acquire(blocking=False):
+        raise Conflict("Another profile is running in this worker. Try again when it has finished.")
+    try:
+        yield
+    finally:
+        profile_lock.release()
+
+
+@admin_bp.route('/profile/stacks')
+@login_required(role="admin")
+def profile_stacks():
+    """
+    Samples the stacks of the worker's threads for a few seconds and returns them
+    as a collapsed-stacks file, e.g. for `flamegraph.pl profile.collapsed > profile.svg`.
+    Query parameters: seconds, interval_ms, idle (1 keeps threads waiting for work).
+    """
+    seconds = _window_seconds(default=10)
+    interval_ms = request.args.get('interval_ms', current_app.config['PROFILER_SAMPLE_INTERVAL_MS'], type=int)
+    if not 1 <= interval_ms <= 1000:
+        raise BadRequest("interval_ms must be between 1 and 1000.")
+
+    with _exclusive_profile():
+        stacks, rounds = sample_stacks(seconds, interval_ms / 1000, include_idle=request.args.get('idle') == '1')
+    print(f"INFO: Sampled {rounds} stack rounds over {seconds:g}s ({sum(stacks.values())} busy thread samples).")
+
+    filename = f"stacks-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+    return Response(render_collapsed(stacks), mimetype='text/plain', headers={
+        'Content-Disposition': f'attachment; filename={filename}',
+        'X-Profile-Rounds': str(rounds),
+    })
+
+
+@admin_bp.route('/profile/allocations')
+@login_required(role="admin")
+def profile_allocations():
+    """
+    Traces memory allocations for a few seconds and returns the allocation sites
+    that grew the most. Query parameters: seconds, top, group_by.
+    """
+    seconds = _window_seconds(default=5)
+    top = request.args.get('top', current_app.config['PROFILER_TOP_ALLOCATIONS'], type=int)
+    group_by = request.args.get('group_by', 'lineno')
+    if group_by not in ALLOCATION_GROUPINGS:
+        raise BadRequest(f"group_by must be one of {', '.join(ALLOCATION_GROUPINGS)}.")
+
+    with _exclusive_profile():
+        report = allocation_diff(seconds, max(top, 1), group_by, current_app.config['PROFILER_TRACEMALLOC_FRAMES'])
+    return jsonify(report)
+
+
+@admin_bp.route('/memory')
+@login_required(role="admin")
+def memory():
+    """Reports the process RSS and the memory held by the shared services and the database sessions."""
+    return jsonify(service_memory_report())
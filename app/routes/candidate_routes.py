@@ -1,19 +1,27 @@
 # app/routes/candidate_routes.py
 # This file handles all pages and logic specific to the 'candidate' role
-import os
 from flask import (Blueprint, render_template, session, redirect,
-                   url_for, flash, request, current_app)
+                   url_for, flash, request, current_app, jsonify)
 from sqlalchemy import or_
 from werkzeug.utils import secure_filename
 
-from app.models import Job, Resume, Application
-from app.services.shared_services import nlp_service, ranking_service
+from app.models import Job, Application
+from app.services.shared_services import ranking_service
+from app.services.application_scoring import queue_application_scoring, resume_upload_path, save_resume_upload
+from app.services.resume_versions import (record_upload, store_version, new_version, latest_version,
+                                          flush_new_version, discard_placeholder)
+from app.services.inference_executor import inference_executor
+from app.services.job_recommendations import recommend_jobs
 from app.utils.nlp_utils import extract_text_from_file
 from app.helpers import login_required
+from app.utils.db_profile import replica_reads
 from app.extensions import db
 
 candidate_bp = Blueprint('candidate', __name__, url_prefix='/candidate')
 
+# Upper bound on the application IDs one status poll may ask about.
+MAX_POLLED_APPLICATIONS = 50
+
 @candidate_bp.route('/jobs')
 @login_required()
 def job_list():
@@ -40,20 +48,31 @@ def job_list():
         )
 
     # Execute the final query, ordering by the most recent jobs
-    jobs = query.order_by(Job.date_created.desc()).all()
+    with replica_reads():
+        jobs = query.order_by(Job.date_created.desc()).all()
+
+    # Suggest the most similar postings to the candidate's latest resume
+    recommended_jobs = []
+    if not search_term and session.get('role') == 'candidate':
+        recommended_jobs = recommend_jobs(
+            session['user_id'],
+            top_n=current_app.config['RECOMMENDATION_COUNT'],
+            shortlist_size=current_app.config['RECOMMENDATION_SHORTLIST_SIZE']
+        )
 
     # Pass the search term back to the template to display it in the search box
-    return render_template('job_list.html', jobs=jobs, search_term=search_term)
+    return render_template('job_list.html', jobs=jobs, search_term=search_term, recommended_jobs=recommended_jobs)
 
 
 @candidate_bp.route('/apply/<job_id>', methods=['GET', 'POST'])
 @login_required(role="candidate")
-def apply_for_job(job_id):
+async def apply_for_job(job_id):
     """Handles the full application process, including resume upload and instant ranking."""
     job = Job.query.get_or_404(job_id)
     candidate_id = session['user_id']
 
-    if Application.query.filter_by(job_id=job.id, candidate_id=candidate_id).first():
+    existing_application = Application.query.filter_by(job_id=job.id, candidate_id=candidate_id).first()
+    if existing_application and existing_application.scoring_status != 'failed':
         flash('You have already applied for this job.', 'info')
         return redirect(url_for('candidate.job_list'))
 
@@ -64,31 +83,30 @@ def apply_for_job(job_id):
 
         file = request.files['resume']
         filename = secure_filename(file.filename)
-        file_path = os.path.join(current_app.instance_path, 'uploads/resumes', filename)
-        file.save(file_path)
+        stored_filename = save_resume_upload(file)
+        file_path = resume_upload_path(stored_filename)
 
-        extracted_text = extract_text_from_file(file_path, filename)
-        if not extracted_text:
-            flash('Could not read the uploaded file. Please try another.', 'danger')
-            return redirect(request.url)
+        if current_app.config['DEFERRED_SCORING']:
+            _replace_failed_application(existing_application)
+            return _submit_deferred_application(job, candidate_id, filename, stored_filename)
 
-        sectioned_resume_data = nlp_service.process_document(extracted_text)
+        with inference_executor.admit():
+            extracted_text = await inference_executor.run(extract_text_from_file, file_path, filename)
+            if not extracted_text:
+                flash('Could not read the uploaded file. Please try another.', 'danger')
+                return redirect(request.url)
 
-        resume = Resume.query.filter_by(candidate_id=candidate_id).first()
-        if resume:
-            resume.extracted_text = extracted_text
-            resume.sectioned_text = sectioned_resume_data
-        else:
-            resume = Resume(
-                extracted_text=extracted_text, sectioned_text=sectioned_resume_data,
-                candidate_id=candidate_id, original_filename=filename
-            )
-            db.session.add(resume)
+            # Store a new version of the candidate's resume, analysing only what changed since the last one
+            resume, signature = await inference_executor.run(record_upload, candidate_id, filename, stored_filename,
+                                                            extracted_text)
 
-        db.session.flush()
+            feature_vector = await inference_executor.run(ranking_service.generate_feature_vector, job, resume)
+            final_score = await inference_executor.run(ranking_service.predict_score, feature_vector)
 
-        feature_vector = ranking_service.generate_feature_vector(job, resume)
-        final_score = ranking_service.predict_score(feature_vector)
+        # Written only now, so the request does not hold the database write lock while it awaits the pool
+        _replace_failed_application(existing_application)
+        if signature is not None:
+            store_version(resume, signature)
 
         new_application = Application(
             job_id=job.id, candidate_id=candidate_id, resume_id=resume.id,
@@ -104,6 +122,32 @@ def apply_for_job(job_id):
     return render_template('apply_for_job.html', job=job)
 
 
+def _replace_failed_application(application: Application | None):
+    """Deletes an application whose background scoring failed, with the empty resume version it was given."""
+    if application is None:
+        return
+    failed_resume = application.resume
+    db.session.delete(application)
+    if failed_resume is not None and failed_resume.extracted_text is None:
+        discard_placeholder(failed_resume)
+
+
+def _submit_deferred_application(job: Job, candidate_id: str, filename: str, stored_filename: str):
+    """Stores a pending application for an uploaded resume and queues it for background scoring."""
+    resume = new_version(candidate_id, filename, stored_filename, latest_version(candidate_id))
+    flush_new_version(resume)
+
+    new_application = Application(
+        job_id=job.id, candidate_id=candidate_id, resume_id=resume.id, scoring_status='pending'
+    )
+    db.session.add(new_application)
+    db.session.commit()
+    queue_application_scoring(new_application)
+
+    flash('Application submitted! Your match score will appear below once your resume has been analysed.', 'success')
+    return redirect(url_for('candidate.my_applications'))
+
+
 @candidate_bp.route('/my-applications')
 @login_required(role="candidate")
 def my_applications():
@@ -112,6 +156,22 @@ def my_applications():
         .order_by(Application.date_applied.desc()).all()
     return render_template('my_applications.html', applications=applications)
 
+@candidate_bp.route('/my-applications/status')
+@login_required(role="candidate")
+def application_status():
+    """
+    Returns the scoring status and score of the candidate's applications given
+    as ?ids=<id>,<id>, polled by the applications page while any is pending.
+    """
+    application_ids = request.args.get('ids', '').split(',')[:MAX_POLLED_APPLICATIONS]
+    rows = db.session.query(Application.id, Application.scoring_status, Application.final_score).filter(
+        Application.candidate_id == session['user_id'], Application.id.in_(application_ids)
+    ).all()
+    return jsonify({
+        'applications': [{'id': row.id, 'status': row.scoring_status, 'score': row.final_score} for row in rows],
+        'poll_seconds': current_app.config['SCORING_STATUS_POLL_SECONDS'],
+    })
+
 @candidate_bp.route('/job/<job_id>')
 @login_required() # Any logged-in user can view the job details
 def job_detail(job_id):
@@ -0,0 +1,25 @@
+# app/routes/metrics_routes.py
+import hmac
+from flask import Blueprint, Response, request, current_app
+from app.utils.timing import registry
+
+# Operational endpoints for the metrics scraper
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def _has_metrics_token() -> bool:
+    """
+    True when the request carries the configured METRICS_TOKEN as a bearer token.
+    The client address is not trusted: behind a reverse proxy every request is local.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    authorization = request.headers.get('Authorization', '')
+    return bool(token) and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
+
+
+@metrics_bp.route('/metrics')
+def metrics():
+    """Exposes the aggregated timing histograms in the Prometheus text format."""
+    if not _has_metrics_token():
+        return "<h1>403 Forbidden</h1>", 403
+    return Response(registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
@@ -4,12 +4,20 @@ import sys
 import subprocess
 from flask import (Blueprint, render_template, session, redirect,
                    url_for, flash, request, current_app)
-from werkzeug.utils import secure_filename
 
 from app.models import Job, Application, Resume
-from app.services.shared_services import nlp_service,ranking_service
+from app.services.shared_services import nlp_service
+from app.services.pool_matching import (get_pool_matches, has_current_matches, find_passive_candidates,
+                                        load_scored_resumes, queue_job_materialization,
+                                        queue_resume_materialization)
+from app.services.job_recommendations import queue_job_indexing
+from app.services.near_duplicates import pool_scope, process_with_reuse
+from app.services.upload_ingestion import receive_uploads, ResumeBatchWriter
+from app.services.embedding_store import text_digest
+from app.services.inference_executor import inference_executor
 from app.utils.nlp_utils import preprocess_text, extract_text_from_file
 from app.helpers import login_required
+from app.utils.db_profile import replica_reads
 from app.extensions import db
 
 recruiter_bp = Blueprint('recruiter', __name__, url_prefix='/recruiter')
@@ -46,6 +54,10 @@ def post_job():
         db.session.add(new_job)
         db.session.commit()
 
+        # Score the talent pool against the new job and index it for recommendations in the background
+        queue_job_materialization(new_job)
+        queue_job_indexing(new_job)
+
         flash('Your new job has been posted successfully!', 'success')
         return redirect(url_for('recruiter.dashboard'))
 
@@ -53,20 +65,29 @@ def post_job():
 
 @recruiter_bp.route('/job/<job_id>/ranking')
 @login_required(role="recruiter")
-def job_ranking(job_id):
+async def job_ranking(job_id):
     """Displays the ranked list of candidates for a specific job."""
     job = Job.query.get_or_404(job_id)
     if job.uploader_id != session['user_id']:
         return "<h1>Forbidden</h1>", 403
 
-    applications = Application.query.filter_by(job_id=job_id) \
-        .order_by(Application.final_score.desc().nulls_last()).all()
+    # Only these read-only queries go to the replica; the matching below reads and writes the primary.
+    with replica_reads():
+        applications = Application.query.filter_by(job_id=job_id) \
+            .order_by(Application.final_score.desc().nulls_last()).all()
 
-    chart_labels = [f"# {i+1} {app.candidate.username}" for i, app in enumerate(applications)]
-    chart_scores = [app.final_score or 0 for app in applications]
+        chart_labels = [f"# {i+1} {app.candidate.username}" for i, app in enumerate(applications)]
+        chart_scores = [app.final_score or 0 for app in applications]
 
-    # Find passive candidates
-    passive_candidates = ranking_service.find_matches_in_pool(job, recruiter_id=session['user_id'])
+    # Find passive candidates, from the precomputed matches once they are available
+    # and were scored with the current features and ranking model
+    if has_current_matches(job):
+        passive_candidates = get_pool_matches(job)
+    else:
+        with inference_executor.admit():
+            matches = await inference_executor.run_isolated(find_passive_candidates, job.id, session['user_id'])
+        passive_candidates = load_scored_resumes(matches)
+        queue_job_materialization(job)
 
     return render_template(
         'job_ranking.html',
@@ -113,42 +134,57 @@ def trigger_retraining():
 
 @recruiter_bp.route('/talent-pool', methods=['GET', 'POST'])
 @login_required(role="recruiter")
-def talent_pool():
+async def talent_pool():
     """Handles viewing and uploading resumes to the recruiter's private talent pool."""
     recruiter_id = session['user_id']
 
     if request.method == 'POST':
-        files = request.files.getlist('resumes')
-        if not files or files[0].filename == '':
-            flash('No files selected for upload.', 'danger')
+        # Stream the files to disk before anything parses the form
+        upload_dir = os.path.join(current_app.instance_path, 'uploads/resumes')
+        uploads, rejected = receive_uploads(request, 'resumes', upload_dir)
+        for filename, reason in rejected:
+            flash(f'{filename} was not uploaded: it is {reason}.', 'warning')
+        if not uploads:
+            if not rejected:
+                flash('No files selected for upload.', 'danger')
             return redirect(url_for('recruiter.talent_pool'))
 
-        for file in files:
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(current_app.instance_path, 'uploads/resumes', filename)
-            file.save(file_path)
-
-            text = extract_text_from_file(file_path, filename)
-            if not text:
-                flash(f'Could not process {filename}. It may be empty or corrupted.', 'warning')
-                continue
-
-            #Process and extract all data
-            processed_data = nlp_service.process_document(text)
-
-            new_resume = Resume(
-                original_filename=filename,
-                extracted_text=text,
-                sectioned_text=processed_data,
-                extracted_name=processed_data.get('extracted_name'),
-                extracted_email=processed_data.get('extracted_email'),
-                source='talent_pool',
-                uploader_id=recruiter_id # Associate the resume with the recruiter
-            )
-            db.session.add(new_resume)
-
-        db.session.commit()
-        flash(f'{len(files)} resumes successfully added to the talent pool.', 'success')
+        scope = pool_scope(recruiter_id)
+        writer = ResumeBatchWriter(scope, current_app.config['UPLOAD_INSERT_BATCH_SIZE'])
+        with inference_executor.admit():
+            for upload in uploads:
+                text = await inference_executor.run(extract_text_from_file, upload.path, upload.filename)
+                if not text:
+                    flash(f'Could not process {upload.filename}. It may be empty or corrupted.', 'warning')
+                    continue
+
+                #Process and extract all data, reusing the analysis of a near-duplicate already in the pool
+                processed_data, duplicate, signature = await inference_executor.run(
+                    process_with_reuse, text, scope, writer.pending)
+
+                # Near-duplicates are kept but not indexed, scored or matched.
+                writer.add({
+                    'original_filename': upload.filename,
+                    'stored_filename': os.path.basename(upload.path),
+                    'extracted_text': text,
+                    'content_hash': text_digest(text),
+                    'sectioned_text': processed_data,
+                    'extracted_name': processed_data.get('extracted_name'),
+                    'extracted_email': processed_data.get('extracted_email'),
+                    'source': 'talent_pool',
+                    'uploader_id': recruiter_id, # Associate the resume with the recruiter
+                }, signature, duplicate)
+            writer.flush()
+
+        # Score only the new resumes against the recruiter's jobs in the background
+        queue_resume_materialization(writer.indexed_ids, recruiter_id)
+        if writer.added:
+            flash(f'{writer.added} resumes successfully added to the talent pool.', 'success')
+        if writer.duplicates:
+            flash(f'{writer.duplicates} of them are near-duplicates of resumes already in your pool '
+                  f'and are left out of candidate matching.', 'info')
+        if writer.failed:
+            flash(f'{writer.failed} resumes could not be saved. Please upload them again.', 'danger')
         return redirect(url_for('recruiter.talent_pool'))
 
     # For GET request, display all resumes in the pool
@@ -0,0 +1,83 @@
+# app/services/application_scoring.py
+"""
+Deferred scoring of candidate applications. In deferred mode the apply route
+only stores the uploaded file and a 'pending' application; the text extraction,
+NLP analysis and scoring happen here on the background task queue.
+"""
+import os
+import hashlib
+from flask import current_app
+from werkzeug.utils import secure_filename
+from app.extensions import db, task_queue
+from app.models import Application
+from app.services.shared_services import ranking_service
+from app.services.embedding_store import text_digest, cache_stored_embeddings
+from app.services.resume_versions import analyse_version, store_version, content_hash, discard_placeholder
+from app.utils.nlp_utils import extract_text_from_file
+
+
+def resume_upload_path(filename: str) -> str:
+    """Returns where an uploaded resume file is stored."""
+    return os.path.join(current_app.instance_path, 'uploads/resumes', filename)
+
+
+def save_resume_upload(file) -> str:
+    """
+    Saves an uploaded resume file as '<SHA-256 prefix>-<secure filename>', the
+    naming of talent-pool uploads, and returns that name. Two uploads only share
+    a stored file when their content is identical.
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.stream.read(current_app.config['UPLOAD_CHUNK_SIZE']), b''):
+        digest.update(chunk)
+    file.stream.seek(0)
+    stored_filename = f"{digest.hexdigest()[:16]}-{secure_filename(file.filename)}"
+    file.save(resume_upload_path(stored_filename))
+    return stored_filename
+
+
+def score_application(application_id: str, file_path: str):
+    """Extracts, analyses and scores the resume of a pending application."""
+    application = db.session.get(Application, application_id)
+    if application is None or application.scoring_status != 'pending':
+        return
+
+    extracted_text = extract_text_from_file(file_path, os.path.basename(file_path))
+    if not extracted_text:
+        application.scoring_status = 'failed'
+        db.session.commit()
+        return
+
+    resume = application.resume
+    previous = resume.previous_version
+    if previous is not None and content_hash(previous) == text_digest(extracted_text):
+        # Unchanged re-upload: score the previous version and drop the empty new one
+        application.resume = previous
+        discard_placeholder(resume, previous)
+        resume = previous
+        cache_stored_embeddings('resume', resume.id)
+    else:
+        store_version(resume, analyse_version(resume, extracted_text, previous))
+
+    feature_vector = ranking_service.generate_feature_vector(application.job, resume)
+    application.set_feature_scores(feature_vector)
+    application.final_score = ranking_service.predict_score(feature_vector)
+    application.scoring_status = 'scored'
+    db.session.commit()
+
+
+def queue_application_scoring(application: Application):
+    """Queues a committed, pending application for background scoring."""
+    resume = application.resume
+    # Resumes stored before uploads got unique names only have their original filename.
+    task_queue.submit(score_application, application.id,
+                      resume_upload_path(resume.stored_filename or resume.original_filename))
+
+
+def requeue_pending_applications():
+    """Queues applications left pending by a previous process, e.g. after a restart."""
+    pending = Application.query.filter_by(scoring_status='pending').all()
+    for application in pending:
+        queue_application_scoring(application)
+    if pending:
+        print(f"INFO: Re-queued {len(pending)} pending applications for scoring.")
@@ -0,0 +1,157 @@
+# app/services/cascade_ranking.py
+"""
+Cascade ranking of a talent pool against a job. Instead of running the full
+feature vector (three SBERT similarities) and the ranking model on every resume,
+candidates go through three stages of increasing cost:
+
+  1. prefilter: job-skill coverage, experience years and education level,
+     computed from the stored NLP analysis without any encoding;
+  2. shortlist: cosine similarity of the stored 'overall' document embeddings;
+  3. full score: generate_feature_vectors and predict_scores on the survivors.
+
+Each stage keeps a configurable number of candidates, and the whole cascade has
+a time budget: once it is spent, the best fully scored results so far are returned.
+"""
+import re
+import time
+import numpy as np
+from flask import current_app
+from app.extensions import db
+from app.models import Job, Resume
+from app.services.shared_services import ranking_service
+from app.services.embedding_store import get_document_embeddings
+from app.utils.timing import span, timed
+
+# Ordinal ranks of the levels returned by NLPService._extract_education_level.
+EDUCATION_RANKS = {
+    "Not Found": 0,
+    "Associate Degree": 1,
+    "Bachelor's Degree": 2,
+    "Master's Degree": 3,
+    "Doctorate": 4,
+}
+# Job postings state requirements as "5+ years of experience" rather than date ranges.
+REQUIRED_YEARS_PATTERN = re.compile(r'(\d{1,2})\s*\+?\s*(?:years|yrs)', re.IGNORECASE)
+
+PREFILTER_WEIGHTS = {"skill_coverage": 0.6, "experience_fit": 0.25, "education_fit": 0.15}
+
+
+def required_experience_years(job: Job) -> int:
+    """Returns the years of experience a job asks for (0 when it does not say)."""
+    years = (job.sectioned_text or {}).get("experience_years", 0)
+    if years:
+        return years
+    return max((int(y) for y in REQUIRED_YEARS_PATTERN.findall(job.description or '')), default=0)
+
+
+class CascadeRanker:
+    """Ranks talent-pool resumes for a job through the prefilter, shortlist and full-score stages."""
+
+    def __init__(self, ranking_service):
+        self.ranking_service = ranking_service
+
+    def prefilter_scores(self, job: Job, resumes: list[Resume]) -> tuple[np.ndarray, np.ndarray | None]:
+        """
+        Returns the stage-one score and the job-skill coverage of every resume
+        (None when the job has no recognised skills to cover).
+        """
+        vocabulary = self.ranking_service.skill_vocabulary
+        job_skill_ids = vocabulary.ids_for_document(job.sectioned_text)
+        _, coverage = vocabulary.skill_overlap(job_skill_ids,
+                                               [vocabulary.ids_for_document(r.sectioned_text) for r in resumes])
+
+        required_years = required_experience_years(job)
+        years = np.array([(r.sectioned_text or {}).get("experience_years", 0) for r in resumes], dtype=np.float64)
+        experience_fit = np.minimum(years / required_years, 1.0) if required_years else np.ones(len(resumes))
+
+        required_rank = EDUCATION_RANKS.get((job.sectioned_text or {}).get("education_level"), 0)
+        ranks = np.array([EDUCATION_RANKS.get((r.sectioned_text or {}).get("education_level"), 0) for r in resumes],
+                         dtype=np.float64)
+        education_fit = np.minimum(ranks / required_rank, 1.0) if required_rank else np.ones(len(resumes))
+
+        scores = (PREFILTER_WEIGHTS["skill_coverage"] * np.asarray(coverage, dtype=np.float64)
+                  + PREFILTER_WEIGHTS["experience_fit"] * experience_fit
+                  + PREFILTER_WEIGHTS["education_fit"] * education_fit)
+        return scores, np.asarray(coverage) if job_skill_ids else None
+
+    @staticmethod
+    def shortlist_scores(job: Job, resumes: list[Resume]) -> np.ndarray:
+        """Returns the cosine similarity of the stored 'overall' embeddings of the job and each resume."""
+        job_vector = get_document_embeddings('job', [(job.id, job.description)])[0]
+        resume_vectors = get_document_embeddings('resume', [(r.id, r.extracted_text or '') for r in resumes])
+        return resume_vectors @ job_vector
+
+    @staticmethod
+    def _top(scores: np.ndarray, size: int) -> np.ndarray:
+        """Returns the positions of the `size` highest scores, best first (ties keep pool order)."""
+        return np.argsort(-scores, kind='stable')[:size]
+
+    @timed("cascade_rank")
+    def rank(self, job: Job, resumes: list[Resume], prefilter_size: int, shortlist_size: int,
+             time_budget_ms: int = 0, batch_size: int = 32,
+             min_skill_overlap: float = 0.0) -> list[tuple[Resume, dict, float]]:
+        """
+        Returns (resume, feature vector, score) triples of the fully scored
+        survivors, best first. A zero time budget disables the deadline; at
+        least one batch is always fully scored. Newly encoded embeddings are
+        added to the session, and the caller is responsible for committing it.
+        """
+        deadline = time.perf_counter() + time_budget_ms / 1000 if time_budget_ms else None
+        if not resumes:
+            return []
+
+        with span("cascade_prefilter"):
+            scores, coverage = self.prefilter_scores(job, resumes)
+            if min_skill_overlap and coverage is not None:
+                scores[coverage < min_skill_overlap] = -np.inf
+            candidates = [resumes[i] for i in self._top(scores, prefilter_size) if np.isfinite(scores[i])]
+
+        if len(candidates) > shortlist_size:
+            if deadline is not None and time.perf_counter() >= deadline:
+                # No time left for the embeddings: shortlist on the prefilter order.
+                candidates = candidates[:shortlist_size]
+            else:
+                with span("cascade_shortlist"):
+                    similarities = self.shortlist_scores(job, candidates)
+                    candidates = [candidates[i] for i in self._top(similarities, shortlist_size)]
+
+        scored = []
+        with span("cascade_full_score"):
+            for start in range(0, len(candidates), batch_size):
+                if scored and deadline is not None and time.perf_counter() >= deadline:
+                    print(f"INFO: Cascade ranking of job {job.id} ran out of its {time_budget_ms} ms budget after "
+                          f"{len(scored)} of {len(candidates)} shortlisted resumes.")
+                    break
+                batch = candidates[start:start + batch_size]
+                feature_vectors = self.ranking_service.generate_feature_vectors(job, batch)
+                scored.extend(zip(batch, feature_vectors, self.ranking_service.predict_scores(feature_vectors)))
+        return sorted(scored, key=lambda match: match[2], reverse=True)
+
+    @timed("cascade_find_matches")
+    def find_matches(self, job: Job, recruiter_id: str, score_threshold: float = 0.5, limit: int = 5,
+                     min_skill_overlap: float = 0.0) -> list[Resume]:
+        """
+        Cascade equivalent of RankingService.find_matches_in_pool: the same
+        pool, threshold and limit, with each score attached as `resume.score`.
+        """
+        config = current_app.config
+        scored = self.rank(
+            job, self.ranking_service.pool_candidates(job, recruiter_id),
+            prefilter_size=config['CASCADE_PREFILTER_SIZE'], shortlist_size=config['CASCADE_SHORTLIST_SIZE'],
+            time_budget_ms=config['CASCADE_TIME_BUDGET_MS'], batch_size=config['CASCADE_BATCH_SIZE'],
+            min_skill_overlap=min_skill_overlap
+        )
+
+        # Store the new embeddings, so the next ranking of this pool does not encode them again.
+        db.session.commit()
+
+        matches = []
+        for resume, _, score in scored:
+            if score >= score_threshold:
+                # Add the score to the resume object temporarily for display
+                resume.score = score
+                matches.append(resume)
+        return matches[:limit]
+
+
+cascade_ranker = CascadeRanker(ranking_service)
@@ -0,0 +1,99 @@
+# app/services/embedding_store.py
+"""
+Persistent storage of document embeddings. Vectors are stored per document and
+section together with the hash of the text they were computed from, so a
+document is only re-encoded when its text actually changes.
+"""
+import hashlib
+import numpy as np
+from app.extensions import db
+from app.models import DocumentEmbedding
+from app.services.shared_services import ranking_service
+
+
+def text_digest(text: str) -> str:
+    """Returns the hash that identifies an embedded text."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def vector_to_bytes(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def vector_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.float32)
+
+
+def get_document_embeddings(doc_type: str, documents: list[tuple[str, str]], section: str = 'overall') -> np.ndarray:
+    """
+    Returns the normalized embeddings of (doc_id, text) pairs as a matrix,
+    reading up-to-date vectors from the database and encoding and storing the
+    rest in one batch. The caller is responsible for committing the session.
+    """
+    if not documents:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    stored = {
+        row.doc_id: row for row in DocumentEmbedding.query.filter(
+            DocumentEmbedding.doc_type == doc_type,
+            DocumentEmbedding.section == section,
+            DocumentEmbedding.doc_id.in_([doc_id for doc_id, _ in documents])
+        )
+    }
+
+    vectors = {}
+    stale = []
+    for doc_id, text in documents:
+        row = stored.get(doc_id)
+        if row is not None and row.content_hash == text_digest(text) and row.model_name == ranking_service.model_name:
+            vectors[doc_id] = vector_from_bytes(row.vector)
+        else:
+            stale.append((doc_id, text))
+
+    if stale:
+        embeddings = ranking_service.encode([text for _, text in stale])
+        for (doc_id, text), embedding in zip(stale, embeddings):
+            vectors[doc_id] = embedding
+            row = stored.get(doc_id)
+            if row is None:
+                row = DocumentEmbedding(doc_type=doc_type, doc_id=doc_id, section=section)
+                db.session.add(row)
+            row.model_name = ranking_service.model_name
+            row.content_hash = text_digest(text)
+            row.vector = vector_to_bytes(embedding)
+
+    return np.vstack([vectors[doc_id] for doc_id, _ in documents])
+
+
+def cache_stored_embeddings(doc_type: str, doc_id: str) -> int:
+    """
+    Adds the stored vectors of a document to the ranking service's embedding
+    cache, so scoring it does not encode its texts again. Returns their number.
+    """
+    rows = DocumentEmbedding.query.filter_by(doc_type=doc_type, doc_id=doc_id,
+                                             model_name=ranking_service.model_name).all()
+    ranking_service.cache_embeddings({row.content_hash: vector_from_bytes(row.vector) for row in rows})
+    return len(rows)
+
+
+def carry_over_embeddings(doc_type: str, old_doc_id: str, new_doc_id: str, texts: dict) -> set:
+    """
+    Copies the stored vectors of a document to a new version of it for every
+    section whose text is unchanged (`texts` maps section names to the new
+    version's texts), and adds them to the ranking service's embedding cache so
+    they are not encoded again. Returns the sections carried over.
+    The caller is responsible for committing the session.
+    """
+    rows = DocumentEmbedding.query.filter_by(doc_type=doc_type, doc_id=old_doc_id,
+                                             model_name=ranking_service.model_name).all()
+    carried, sections = {}, set()
+    for row in rows:
+        text = texts.get(row.section)
+        if text and row.content_hash == text_digest(text):
+            db.session.add(DocumentEmbedding(doc_type=doc_type, doc_id=new_doc_id, section=row.section,
+                                             model_name=row.model_name, content_hash=row.content_hash,
+                                             vector=row.vector))
+            carried[row.content_hash] = vector_from_bytes(row.vector)
+            sections.add(row.section)
+    ranking_service.cache_embeddings(carried)
+    return sections
@@ -0,0 +1,183 @@
+# app/services/encoder_service.py
+"""
+Sentence encoder backends used by the RankingService.
+
+The default backend runs the SentenceTransformer model on PyTorch. The ONNX
+backends run an exported (optionally int8-quantized) copy of the same model
+on ONNX Runtime, which is considerably faster on CPU-only hosts. Use
+`export_encoder.py` to export the model and verify its parity with PyTorch.
+"""
+import os
+import numpy as np
+
+ENCODER_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+ONNX_MODEL_FILENAME = 'model.onnx'
+ONNX_INT8_MODEL_FILENAME = 'model.int8.onnx'
+
+
+class TorchEncoder:
+    """Encodes text with the SentenceTransformer model on PyTorch."""
+    backend = 'torch'
+
+    def __init__(self, model_name: str, intra_op_threads: int = 0):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if intra_op_threads:
+            torch.set_num_threads(intra_op_threads)
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.model = SentenceTransformer(model_name)
+        self.model.to(self.device)
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        """Returns a (len(texts), dim) float32 array of sentence embeddings."""
+        embeddings = self.model.encode(
+            texts, batch_size=batch_size, convert_to_numpy=True, device=self.device
+        )
+        return embeddings.astype(np.float32)
+
+    def weights_bytes(self) -> int:
+        """Returns the bytes held by the model's parameters and buffers."""
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+
+class OnnxEncoder:
+    """
+    Encodes text with an exported copy of the SentenceTransformer model on
+    ONNX Runtime, reproducing its mean pooling and normalization steps.
+    """
+    backend = 'onnx'
+
+    def __init__(self, model_dir: str, quantized: bool = False, intra_op_threads: int = 0,
+                 max_seq_length: int = 256):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        filename = ONNX_INT8_MODEL_FILENAME if quantized else ONNX_MODEL_FILENAME
+        model_path = os.path.join(model_dir, filename)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+
+        self.backend = 'onnx-int8' if quantized else 'onnx'
+        self.model_path = model_path
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_seq_length = max_seq_length
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: list[str], batch_size: int = 32) -> np.ndarray:
+        """Returns a (len(texts), dim) float32 array of normalized sentence embeddings."""
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors='np'
+            )
+            feed = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+            token_embeddings = self.session.run(None, feed)[0]
+
+            # Mean pooling over the attention mask, then L2 normalization,
+            # matching the all-MiniLM-L6-v2 SentenceTransformer modules.
+            mask = tokens['attention_mask'][..., np.newaxis].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            batches.append(pooled / np.clip(norms, 1e-12, None))
+
+        if not batches:
+            return np.zeros((0, self.session.get_outputs()[0].shape[-1] or 0), dtype=np.float32)
+        return np.vstack(batches).astype(np.float32)
+
+    def weights_bytes(self) -> int:
+        """Returns the size of the loaded model file, which is dominated by its weights."""
+        return os.path.getsize(self.model_path)
+
+
+def create_encoder(backend: str, model_name: str, model_dir: str, intra_op_threads: int = 0):
+    """
+    Creates the encoder for the requested backend. Falls back to PyTorch if
+    the ONNX runtime or the exported model is unavailable.
+    """
+    if backend not in ENCODER_BACKENDS:
+        print(f"ERROR: Unknown encoder backend '{backend}'. Using 'torch'.")
+        backend = 'torch'
+
+    if backend in ('onnx', 'onnx-int8'):
+        try:
+            encoder = OnnxEncoder(model_dir, quantized=(backend == 'onnx-int8'),
+                                  intra_op_threads=intra_op_threads)
+            print(f"INFO: Loaded '{backend}' sentence encoder from {model_dir}")
+            return encoder
+        except (ImportError, FileNotFoundError) as e:
+            print(f"WARNING: Could not load '{backend}' encoder ({e}). Falling back to 'torch'. "
+                  f"Run export_encoder.py to export the model.")
+
+    return TorchEncoder(model_name, intra_op_threads=intra_op_threads)
+
+
+def export_onnx_model(model_name: str, model_dir: str, quantize: bool = True, opset: int = 17) -> list[str]:
+    """
+    Exports the transformer behind a SentenceTransformer model to ONNX and,
+    optionally, writes a dynamically int8-quantized copy next to it.
+    Returns the paths of the written model files.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(model_dir, exist_ok=True)
+    sbert_model = SentenceTransformer(model_name, device='cpu')
+    transformer = sbert_model[0].auto_model
+    tokenizer = sbert_model.tokenizer
+    transformer.eval()
+
+    sample = tokenizer(["An example sentence for tracing."], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+
+    model_path = os.path.join(model_dir, ONNX_MODEL_FILENAME)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer, tuple(sample[name] for name in input_names), model_path,
+            input_names=input_names, output_names=['last_hidden_state'],
+            dynamic_axes=dynamic_axes, opset_version=opset
+        )
+    tokenizer.save_pretrained(model_dir)
+    written = [model_path]
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        quantized_path = os.path.join(model_dir, ONNX_INT8_MODEL_FILENAME)
+        quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+        written.append(quantized_path)
+
+    return written
+
+
+def compare_encoders(reference, candidate, texts: list[str]) -> dict:
+    """
+    Compares the embeddings of two encoders on the same texts. Returns the
+    worst-case cosine similarity between paired embeddings and the largest
+    absolute difference between the pairwise similarity matrices, which is
+    what the ranking features are built from.
+    """
+    ref = reference.encode(texts)
+    cand = candidate.encode(texts)
+    ref = ref / np.linalg.norm(ref, axis=1, keepdims=True)
+    cand = cand / np.linalg.norm(cand, axis=1, keepdims=True)
+
+    paired_cosine = (ref * cand).sum(axis=1)
+    similarity_error = np.abs(ref @ ref.T - cand @ cand.T)
+    return {
+        "min_cosine": float(paired_cosine.min()),
+        "max_similarity_error": float(similarity_error.max()),
+    }
@@ -0,0 +1,68 @@
+# app/services/feature_store.py
+"""
+Reads application feature vectors from the typed ApplicationFeatures table as
+contiguous numeric arrays, for model training, analytics and re-scoring,
+instead of deserializing the JSON feature blob of every application.
+"""
+import numpy as np
+import pandas as pd
+from app.extensions import db
+from app.models import Application, ApplicationFeatures, FEATURE_NAMES, FEATURE_SCHEMA_VERSION
+
+
+def backfill_application_features(batch_size: int = 500) -> int:
+    """
+    Creates the ApplicationFeatures rows of applications scored before the typed
+    table existed, from their JSON feature blobs. Returns the number of rows created.
+    """
+    created = 0
+    while True:
+        applications = Application.query.outerjoin(ApplicationFeatures) \
+            .filter(Application.feature_scores.isnot(None), ApplicationFeatures.application_id.is_(None)) \
+            .limit(batch_size).all()
+        if not applications:
+            break
+        for application in applications:
+            application.set_feature_scores(application.feature_scores)
+        db.session.commit()
+        created += len(applications)
+    if created:
+        print(f"INFO: Backfilled typed features for {created} applications.")
+    return created
+
+
+def _feature_rows(criteria: tuple, schema_version: int, extra_columns: tuple = ()) -> list:
+    """Returns (application ID, *features, *extra columns) rows of the matching applications, by ID."""
+    columns = [getattr(ApplicationFeatures, name) for name in FEATURE_NAMES]
+    return db.session.query(ApplicationFeatures.application_id, *columns, *extra_columns) \
+        .join(Application, Application.id == ApplicationFeatures.application_id) \
+        .filter(ApplicationFeatures.schema_version == schema_version, *criteria) \
+        .order_by(ApplicationFeatures.application_id).all()
+
+
+def load_application_features(*criteria, schema_version: int = FEATURE_SCHEMA_VERSION) -> tuple[list[str], np.ndarray]:
+    """
+    Returns the IDs of the applications matching the SQLAlchemy `criteria` and
+    their features as a float64 matrix with one column per FEATURE_NAMES entry.
+    """
+    rows = _feature_rows(criteria, schema_version)
+    application_ids = [row[0] for row in rows]
+    matrix = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(FEATURE_NAMES))
+    return application_ids, matrix
+
+
+def load_application_feature_frame(*criteria, schema_version: int = FEATURE_SCHEMA_VERSION,
+                                   extra_columns: tuple = ()) -> pd.DataFrame:
+    """
+    Same as load_application_features, as a DataFrame indexed by application ID.
+    `extra_columns` (e.g. Application.status) are read by the same query and
+    appended to the frame under their column names.
+    """
+    rows = _feature_rows(criteria, schema_version, extra_columns)
+    feature_count = len(FEATURE_NAMES)
+    index = pd.Index([row[0] for row in rows], name='application_id')
+    matrix = np.array([row[1:1 + feature_count] for row in rows], dtype=np.float64).reshape(len(rows), feature_count)
+    frame = pd.DataFrame(matrix, columns=list(FEATURE_NAMES), index=index)
+    for position, column in enumerate(extra_columns, start=1 + feature_count):
+        frame[column.key] = [row[position] for row in rows]
+    return frame
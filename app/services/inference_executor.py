@@ -0,0 +1,117 @@
+# app/services/inference_executor.py
+"""
+Bounded executor for the CPU-bound NLP and ranking work of the async views.
+
+The upload, apply and ranking views hand their text extraction, document
+analysis and scoring calls to a small thread pool. Only a few documents are
+therefore analysed at the same time, and cheap pages keep their share of the CPU
+during upload bursts.
+
+A request must be admitted before it starts any inference. Once
+INFERENCE_WORKERS requests are running and INFERENCE_QUEUE_SIZE more are
+waiting, further requests are turned away with a 503 and a Retry-After header
+instead of queueing without limit.
+
+Calls run in one of two ways:
+
+  - run() shares the request's context variables, so the call sees the
+    request's app context and database session. The request does not use the
+    session while it awaits the call, so the session is never used by two
+    threads at once. Such a call may read, and may add objects for the request
+    to write, but it must not flush or commit. On SQLite, the first flush takes
+    the write lock until the request commits, and a worker holding that lock
+    would stall the pool. A flush or commit from such a call raises RuntimeError.
+  - run_isolated() runs the call in a fresh app context, with a session of its
+    own that the call may commit. Only plain data (IDs, scores) goes in and
+    comes out; ORM objects of the request's session must not cross over.
+"""
+import asyncio
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.exceptions import ServiceUnavailable
+
+# Set inside calls made with run(), which share the request's database session.
+_shares_request_session = contextvars.ContextVar('shares_request_session', default=False)
+
+
+@event.listens_for(Session, 'before_flush')
+def _refuse_flush(session, flush_context, instances):
+    if _shares_request_session.get():
+        raise RuntimeError("A call on the inference pool must not flush the request's session; "
+                           "write on the request thread after awaiting it, or use run_isolated().")
+
+
+@event.listens_for(Session, 'before_commit')
+def _refuse_commit(session):
+    if _shares_request_session.get():
+        raise RuntimeError("A call on the inference pool must not commit the request's session; "
+                           "commit on the request thread after awaiting it, or use run_isolated().")
+
+
+def _call_sharing_session(func, *args, **kwargs):
+    _shares_request_session.set(True)
+    return func(*args, **kwargs)
+
+
+def _call_in_app_context(app, func, *args, **kwargs):
+    with app.app_context():
+        return func(*args, **kwargs)
+
+
+class InferenceExecutor:
+    """A thread pool with admission control, created on first use from the app config."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+
+    def _ensure_started(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = current_app.config['INFERENCE_WORKERS']
+                    self._slots = threading.BoundedSemaphore(workers + current_app.config['INFERENCE_QUEUE_SIZE'])
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='inference')
+
+    @contextmanager
+    def admit(self):
+        """Reserves an inference slot for the current request, or raises a 503 if none is free."""
+        self._ensure_started()
+        if not self._slots.acquire(blocking=False):
+            print("WARNING: Inference queue is full; rejecting request.")
+            raise ServiceUnavailable("The server is busy analysing other documents. Please try again shortly.",
+                                     retry_after=current_app.config['INFERENCE_RETRY_AFTER'])
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs a blocking call on the inference pool and awaits its result. The call
+        shares the request's app context and database session, which it may read
+        but not flush or commit.
+        """
+        self._ensure_started()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, _call_sharing_session, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def run_isolated(self, func, *args, **kwargs):
+        """
+        Runs a blocking call on the inference pool in a new app context of the
+        current app, with its own database session, and awaits its result.
+        """
+        self._ensure_started()
+        call = functools.partial(_call_in_app_context, current_app._get_current_object(), func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+
+inference_executor = InferenceExecutor()
@@ -0,0 +1,225 @@
+# app/services/job_recommendations.py
+"""
+"Recommended for you" job suggestions for candidates. Job embeddings are kept in
+an in-memory index that is loaded once per process from the stored embeddings
+and extended as jobs are posted. A candidate's latest resume is embedded once,
+the index returns a shortlist of the most similar postings with one matrix
+product, and only that shortlist is re-ranked with the full feature vector.
+
+That work runs on the background task queue. The job list page only reads the
+last recommendations computed in this process; when they were computed for an
+older resume version or index state, or are older than
+RECOMMENDATION_REFRESH_SECONDS, it queues a refresh and shows them meanwhile.
+"""
+import time
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime
+import numpy as np
+from flask import current_app
+from app.extensions import db, task_queue
+from app.models import Job, Resume, Application, DocumentEmbedding
+from app.services.embedding_store import get_document_embeddings, vector_from_bytes
+from app.services.shared_services import ranking_service
+
+
+class JobEmbeddingIndex:
+    """An in-memory matrix of normalized job embeddings for top-N similarity search."""
+
+    def __init__(self):
+        self.job_ids = []
+        self.positions = {}
+        self.matrix = None
+        self.synced_until = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def memory_usage(self) -> dict:
+        """Returns the number of indexed jobs and the bytes of their embedding matrix."""
+        with self._lock:
+            return {'jobs': len(self.job_ids), 'matrix_bytes': 0 if self.matrix is None else self.matrix.nbytes}
+
+    def add(self, job_id: str, vector: np.ndarray):
+        """Adds or replaces the embedding of one job."""
+        with self._lock:
+            self._add_many([job_id], [vector])
+
+    def _add_many(self, job_ids: list[str], vectors: list[np.ndarray]):
+        existing = 0 if self.matrix is None else len(self.matrix)
+        new_rows = []
+        for job_id, vector in zip(job_ids, vectors):
+            position = self.positions.get(job_id)
+            if position is None:
+                self.positions[job_id] = len(self.job_ids)
+                self.job_ids.append(job_id)
+                new_rows.append(vector)
+            elif position < existing:
+                self.matrix[position] = vector
+            else:
+                new_rows[position - existing] = vector
+        if new_rows:
+            new_rows = np.vstack(new_rows).astype(np.float32)
+            self.matrix = new_rows if self.matrix is None else np.vstack([self.matrix, new_rows])
+
+    def sync(self):
+        """
+        Loads job embeddings stored since the last sync, so jobs indexed by other
+        worker processes become searchable. The first call loads the whole index.
+        """
+        query = DocumentEmbedding.query.filter(
+            DocumentEmbedding.doc_type == 'job',
+            DocumentEmbedding.section == 'overall',
+            DocumentEmbedding.model_name == ranking_service.model_name
+        )
+        if self.synced_until is not None:
+            query = query.filter(DocumentEmbedding.date_updated >= self.synced_until)
+        rows = query.order_by(DocumentEmbedding.date_updated).all()
+
+        with self._lock:
+            self._add_many([row.doc_id for row in rows], [vector_from_bytes(row.vector) for row in rows])
+            if rows:
+                self.synced_until = rows[-1].date_updated
+            elif self.synced_until is None:
+                self.synced_until = datetime.min
+
+    def search(self, query_vector: np.ndarray, top_n: int, exclude_ids: set = frozenset()) -> list[tuple[str, float]]:
+        """Returns the (job ID, cosine similarity) pairs of the most similar jobs."""
+        with self._lock:
+            if self.matrix is None:
+                return []
+            similarities = self.matrix @ np.asarray(query_vector, dtype=np.float32)
+            job_ids = list(self.job_ids)
+
+        count = min(len(job_ids), top_n + len(exclude_ids))
+        if count <= 0:
+            return []
+        candidates = np.argpartition(-similarities, count - 1)[:count]
+        candidates = candidates[np.argsort(-similarities[candidates])]
+        results = [(job_ids[i], float(similarities[i])) for i in candidates if job_ids[i] not in exclude_ids]
+        return results[:top_n]
+
+
+job_index = JobEmbeddingIndex()
+
+
+def index_job(job_id: str):
+    """Embeds a job's description, stores it and adds it to this process's index."""
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return
+    vector = get_document_embeddings('job', [(job.id, job.description)])[0]
+    db.session.commit()
+    job_index.add(job.id, vector)
+
+
+def queue_job_indexing(job: Job):
+    """Queues a newly posted job for embedding."""
+    task_queue.submit(index_job, job.id)
+
+
+def index_missing_jobs(batch_size: int = 256):
+    """Embeds every job that has no stored embedding yet, e.g. jobs posted before indexing existed."""
+    indexed_ids = db.session.query(DocumentEmbedding.doc_id).filter(DocumentEmbedding.doc_type == 'job')
+    missing = Job.query.filter(Job.id.notin_(indexed_ids)).all()
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        get_document_embeddings('job', [(job.id, job.description) for job in batch])
+        db.session.commit()
+    if missing:
+        print(f"INFO: Indexed {len(missing)} jobs for recommendations.")
+    job_index.sync()
+
+
+# Shortlisted (job ID, predicted match) pairs, best first, and what they were computed from.
+Recommendations = namedtuple('Recommendations', 'resume_id index_state computed_at matches')
+
+_recommendations = OrderedDict()    # Candidate ID -> Recommendations, least recently shown first
+_recommendations_lock = threading.Lock()
+# Candidates with a refresh queued in this process, to avoid queueing it twice.
+_queued_candidate_ids = set()
+
+
+def _index_state() -> tuple:
+    return len(job_index), job_index.synced_until
+
+
+def _latest_resume_query(candidate_id: str):
+    return Resume.query.filter(Resume.candidate_id == candidate_id, Resume.extracted_text.isnot(None)) \
+        .order_by(Resume.version.desc())
+
+
+def compute_recommendations(candidate_id: str, shortlist_size: int = 20):
+    """
+    Shortlists the jobs most similar to the candidate's latest resume and ranks
+    them with the full ranking model, scoring the whole shortlist in one batch.
+    Runs on the task queue; the result is kept for recommend_jobs().
+    """
+    _queued_candidate_ids.discard(candidate_id)
+    resume = _latest_resume_query(candidate_id).first()
+    if resume is None:
+        return
+
+    if job_index.synced_until is None:
+        index_missing_jobs()
+    job_index.sync()
+
+    resume_vector = get_document_embeddings('resume', [(resume.id, resume.extracted_text)])[0]
+    db.session.commit()
+
+    applied_job_ids = {job_id for (job_id,) in db.session.query(Application.job_id)
+                       .filter(Application.candidate_id == candidate_id)}
+    shortlist = job_index.search(resume_vector, shortlist_size, exclude_ids=applied_job_ids)
+    jobs = Job.query.filter(Job.id.in_([job_id for job_id, _ in shortlist])).all() if shortlist else []
+    scores = ranking_service.predict_scores(ranking_service.generate_job_feature_vectors(jobs, resume)) if jobs else []
+    matches = sorted(zip([job.id for job in jobs], scores), key=lambda match: match[1], reverse=True)
+
+    with _recommendations_lock:
+        _recommendations[candidate_id] = Recommendations(resume.id, _index_state(), time.monotonic(), matches)
+        _recommendations.move_to_end(candidate_id)
+        while len(_recommendations) > current_app.config['RECOMMENDATION_CACHE_SIZE']:
+            _recommendations.popitem(last=False)
+
+
+def queue_recommendations(candidate_id: str, shortlist_size: int = 20):
+    """Queues a refresh of a candidate's recommendations, unless one is already queued."""
+    if candidate_id not in _queued_candidate_ids:
+        _queued_candidate_ids.add(candidate_id)
+        task_queue.submit(compute_recommendations, candidate_id, shortlist_size)
+
+
+def recommend_jobs(candidate_id: str, top_n: int = 5, shortlist_size: int = 20) -> list[Job]:
+    """
+    Returns up to `top_n` recommended jobs the candidate has not applied for,
+    from the recommendations last computed for them, with each predicted match
+    as `job.score`. Nothing is encoded or written here: missing or outdated
+    recommendations are queued for a refresh.
+    """
+    resume_id = _latest_resume_query(candidate_id).with_entities(Resume.id).limit(1).scalar()
+    if resume_id is None:
+        return []
+
+    with _recommendations_lock:
+        cached = _recommendations.get(candidate_id)
+        if cached is not None:
+            _recommendations.move_to_end(candidate_id)
+    if cached is None or cached.resume_id != resume_id or cached.index_state != _index_state() \
+            or time.monotonic() - cached.computed_at > current_app.config['RECOMMENDATION_REFRESH_SECONDS']:
+        queue_recommendations(candidate_id, shortlist_size)
+    if cached is None or not cached.matches:
+        return []
+
+    # Jobs applied for since the recommendations were computed are left out.
+    applied_job_ids = {job_id for (job_id,) in db.session.query(Application.job_id)
+                       .filter(Application.candidate_id == candidate_id)}
+    matches = [(job_id, score) for job_id, score in cached.matches if job_id not in applied_job_ids][:top_n]
+    jobs = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in matches]))}
+    recommended = []
+    for job_id, score in matches:
+        job = jobs.get(job_id)
+        if job is not None:
+            # Add the score to the job object temporarily for display
+            job.score = score
+            recommended.append(job)
+    return recommended
@@ -0,0 +1,54 @@
+# app/services/memory_report.py
+"""
+Per-service memory report of a worker process: the model weights and caches
+held by the shared services, and the ORM objects kept alive by database
+sessions. Pool matching attaches a transient `score` to Resume objects, so
+those are counted separately; a growing number of them, or of instances not
+held by any session, points at objects that outlive their request.
+"""
+from collections import Counter
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.services.shared_services import nlp_service, ranking_service
+from app.services.job_recommendations import job_index
+from app.utils.ui_utils import fragment_cache
+from app.utils.profiling import live_objects, rss_bytes
+
+
+def session_usage() -> dict:
+    """Summarizes the identity maps of the live sessions and the ORM instances alive in the process."""
+    objects = live_objects((Session, db.Model))
+    sessions = [obj for obj in objects if isinstance(obj, Session)]
+    instances = [obj for obj in objects if not isinstance(obj, Session)]
+
+    held = set()
+    summaries = []
+    for session in sessions:
+        identity_map = list(session.identity_map.values())
+        held.update(id(obj) for obj in identity_map)
+        summaries.append({
+            'objects': len(identity_map),
+            'by_class': dict(Counter(type(obj).__name__ for obj in identity_map).most_common()),
+            'scored_resumes': sum(1 for obj in identity_map if 'score' in vars(obj)),
+            'new': len(session.new), 'dirty': len(session.dirty),
+        })
+
+    return {
+        'sessions': sorted(summaries, key=lambda summary: summary['objects'], reverse=True),
+        'instances': dict(Counter(type(obj).__name__ for obj in instances).most_common()),
+        'instances_outside_sessions': sum(1 for obj in instances if id(obj) not in held),
+        'scored_resumes': sum(1 for obj in instances if 'score' in vars(obj)),
+    }
+
+
+def service_memory_report() -> dict:
+    """Returns the process RSS and the estimated memory of every shared service."""
+    rss, peak_rss = rss_bytes()
+    return {
+        'process': {'rss_bytes': rss, 'peak_rss_bytes': peak_rss},
+        'ranking_service': ranking_service.memory_usage(),
+        'nlp_service': nlp_service.memory_usage(),
+        'job_index': job_index.memory_usage(),
+        'highlight_cache': fragment_cache.memory_usage(),
+        'orm': session_usage(),
+    }
@@ -0,0 +1,165 @@
+# app/services/near_duplicates.py
+"""
+Near-duplicate resume detection at ingestion with MinHash and locality-sensitive
+hashing (LSH).
+
+A resume's text is reduced to a MinHash signature over its word shingles. The
+signature is cut into bands, and each band is stored as a bucket key. A new
+resume is only compared with the resumes that share at least one bucket, found
+with one indexed query, so the lookup cost does not grow with the pool.
+"""
+import re
+import zlib
+import hashlib
+from collections import namedtuple
+import numpy as np
+from flask import current_app
+from app.extensions import db
+from app.models import Resume, ResumeSignature, ResumeLshBucket
+from app.services.shared_services import nlp_service
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+# 16 bands of 8 rows make resumes with a similarity of 0.7 or more very likely to share a bucket.
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+# Universal hashing h(x) = (a * x + b) mod p with a fixed seed, so signatures are
+# comparable across processes and restarts.
+_PRIME = np.uint64(4294967291)
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, int(_PRIME), size=NUM_PERMUTATIONS).astype(np.uint64)
+_B = _rng.randint(0, int(_PRIME), size=NUM_PERMUTATIONS).astype(np.uint64)
+
+# A resume analysed during the current upload but not inserted yet; it stands in for a Resume.
+PendingResume = namedtuple('PendingResume', ['id', 'extracted_text', 'sectioned_text'])
+
+
+def pool_scope(recruiter_id: str) -> str:
+    return f"pool:{recruiter_id}"
+
+
+def candidate_scope(candidate_id: str) -> str:
+    return f"candidate:{candidate_id}"
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """Returns the 32-bit hashes of the distinct word shingles of a text."""
+    words = WORD_PATTERN.findall(text.lower())
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    return np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash(text: str) -> np.ndarray:
+    """Returns the MinHash signature of a text as NUM_PERMUTATIONS uint32 values."""
+    hashes = shingle_hashes(text)
+    # (a * x + b) stays below 2**64 because a, x and b are all below 2**32.
+    permuted = (np.outer(hashes, _A) + _B) % _PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def bucket_keys(signature: np.ndarray) -> list[int]:
+    """Returns the LSH bucket key of every band of a signature, as signed 64-bit integers."""
+    keys = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(band.to_bytes(2, 'little') + rows.tobytes(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def estimate_similarity(signature1: np.ndarray, signature2: np.ndarray) -> float:
+    """Estimates the Jaccard similarity of two texts' shingle sets from their signatures."""
+    return float(np.mean(signature1 == signature2))
+
+
+class PendingIndex:
+    """In-memory LSH buckets of the resumes of an upload that are not inserted yet."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._buckets = {}
+        self._entries = {}
+
+    def add(self, resume: PendingResume, signature: np.ndarray):
+        self._entries[resume.id] = (resume, signature)
+        for key in bucket_keys(signature):
+            self._buckets.setdefault(key, set()).add(resume.id)
+
+    def candidates(self, keys: list[int]) -> list[tuple[PendingResume, np.ndarray]]:
+        resume_ids = set().union(*(self._buckets.get(key, ()) for key in keys))
+        return [self._entries[resume_id] for resume_id in resume_ids]
+
+
+def find_near_duplicate(signature: np.ndarray, scope: str, threshold: float = None,
+                        pending: PendingIndex = None) -> tuple[Resume | PendingResume | None, float]:
+    """
+    Returns the indexed resume of the scope (or the pending resume of the
+    current upload) most similar to the signature, with its estimated
+    similarity, if that similarity reaches the threshold.
+    """
+    threshold = threshold if threshold is not None else current_app.config['NEAR_DUPLICATE_THRESHOLD']
+    keys = bucket_keys(signature)
+    candidates = db.session.query(ResumeSignature).join(
+        ResumeLshBucket, ResumeLshBucket.resume_id == ResumeSignature.resume_id
+    ).filter(
+        ResumeLshBucket.scope == scope,
+        ResumeLshBucket.bucket_key.in_(keys)
+    ).distinct().all()
+
+    best, best_similarity = None, 0.0
+    for candidate in candidates:
+        similarity = estimate_similarity(signature, np.frombuffer(candidate.minhash, dtype=np.uint32))
+        if similarity > best_similarity:
+            best, best_similarity = candidate.resume_id, similarity
+    for resume, pending_signature in (pending.candidates(keys) if pending else []):
+        similarity = estimate_similarity(signature, pending_signature)
+        if similarity > best_similarity:
+            best, best_similarity = resume, similarity
+    if best is None or best_similarity < threshold:
+        return None, best_similarity
+    return (best if isinstance(best, PendingResume) else db.session.get(Resume, best)), best_similarity
+
+
+def index_rows(resume_id: str, scope: str, signature: np.ndarray) -> tuple[dict, list[dict]]:
+    """Returns the ResumeSignature row and the ResumeLshBucket rows of a new resume, for bulk inserts."""
+    signature_row = {'resume_id': resume_id, 'scope': scope, 'minhash': signature.astype(np.uint32).tobytes()}
+    bucket_rows = [{'scope': scope, 'bucket_key': key, 'resume_id': resume_id} for key in bucket_keys(signature)]
+    return signature_row, bucket_rows
+
+
+def index_resume(resume: Resume, scope: str, signature: np.ndarray):
+    """Stores (or replaces) the signature and LSH buckets of a flushed resume."""
+    ResumeLshBucket.query.filter_by(resume_id=resume.id).delete(synchronize_session=False)
+    signature_row, bucket_rows = index_rows(resume.id, scope, signature)
+    stored = db.session.get(ResumeSignature, resume.id)
+    if stored is None:
+        stored = ResumeSignature(resume_id=resume.id)
+        db.session.add(stored)
+    stored.scope, stored.minhash = signature_row['scope'], signature_row['minhash']
+    db.session.add_all([ResumeLshBucket(**row) for row in bucket_rows])
+
+
+def process_with_reuse(text: str, scope: str, pending: PendingIndex = None,
+                       base: Resume = None) -> tuple[dict, Resume | None, np.ndarray]:
+    """
+    Analyses an uploaded resume text from an earlier analysis when possible: the
+    near-duplicate of the scope (or among the `pending` resumes of the upload),
+    else `base`, e.g. the previous version of the resume. Its analysis is reused
+    as is if the edits do not touch any extracted field, and section by section
+    otherwise.
+    Returns the processed document, the near-duplicate (or None) and the text's signature.
+    """
+    signature = minhash(text)
+    duplicate, _ = find_near_duplicate(signature, scope, pending=pending)
+    reference = duplicate if duplicate is not None else base
+    processed = None
+    if reference is not None:
+        processed = nlp_service.reprocess_document(reference.extracted_text, reference.sectioned_text, text) or \
+            nlp_service.reprocess_sections(reference.extracted_text, reference.sectioned_text, text)
+    if processed is None:
+        processed = nlp_service.process_document(text)
+    return processed, duplicate, signature
@@ -1,11 +1,13 @@
 # app/services/nlp_service.py
-import spacy
 import re
-from spacy.matcher import PhraseMatcher
+import difflib
+import hashlib
 from datetime import datetime
-import os
-import json
-import textstat
+from app.services import readability
+from app.services.skill_vocabulary import SkillVocabulary
+from app.services.skill_matcher import SkillMatcher, tokenize
+from app.utils.timing import span, timed
+from app.utils.profiling import deep_sizeof
 
 # Document section headings, used for parsing resumes and job descriptions.
 SECTION_HEADINGS = {
@@ -16,105 +18,118 @@ SECTION_HEADINGS = {
     "EDUCATION": [r"education", r"academic background", r"qualifications", r"certifications"],
     "RESPONSIBILITIES": [r"responsibilities", r"duties", r"what you'll do", r"key responsibilities"],
 }
+# One case-insensitive pattern per section, matching any of its headings at the start of a line.
+SECTION_PATTERNS = {name: re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+                    for name, patterns in SECTION_HEADINGS.items()}
+
+ACTION_VERBS = [
+    'achieved', 'analyzed', 'authored', 'automated', 'budgeted', 'built',
+    'created', 'decreased', 'delivered', 'designed', 'developed', 'directed',
+    'enhanced', 'established', 'executed', 'generated', 'implemented',
+    'improved', 'increased', 'initiated', 'innovated', 'launched', 'led',
+    'managed', 'mentored', 'negotiated', 'optimized', 'orchestrated',
+    'organized', 'oversaw', 'pioneered', 'planned', 'produced',
+    'recommended', 'redesigned', 'reduced', 'researched', 'resolved',
+    'restored', 'saved', 'slashed', 'solved', 'spearheaded', 'streamlined',
+    'supervised', 'trained', 'transformed', 'won'
+]
+ACTION_VERB_PATTERN = re.compile(r'\b(' + '|'.join(ACTION_VERBS) + r')\b', re.IGNORECASE)
+DATE_RANGE_PATTERN = re.compile(r'\b(?:(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+)?(\d{4})\b\s*-\s*\b(?:(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|Present)\s+)?(\d{4}|Present)\b', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Education levels from highest to lowest, with the keywords that indicate them.
+EDUCATION_KEYWORDS = {
+    "Doctorate": ["ph.d", "phd", "doctor of philosophy"],
+    "Master's Degree": ["master", "m.s", "m.sc", "m.eng", "mba"],
+    "Bachelor's Degree": ["bachelor", "b.s", "b.sc", "b.a."],
+    "Associate Degree": ["associate", "a.s", "a.a"],
+}
+EDUCATION_PATTERN = re.compile('|'.join(re.escape(k) for keywords in EDUCATION_KEYWORDS.values() for k in keywords),
+                               re.IGNORECASE)
+
+
+def section_texts(text: str, processed_data: dict) -> dict:
+    """
+    Returns the text of every section of a processed document, rebuilt from the
+    stored line offsets. Documents processed before sections were stored as
+    offsets still carry their copies under 'raw_sections'.
+    """
+    processed_data = processed_data or {}
+    if 'raw_sections' in processed_data:
+        return processed_data['raw_sections']
+    sections = {name: "" for name in list(SECTION_HEADINGS) + ["HEADER", "OTHER"]}
+    for name, spans in processed_data.get('section_spans', {}).items():
+        sections[name] = "\n".join(text[start:end] for start, end in spans)
+    return sections
+
+
+def section_digest(text: str) -> str:
+    """Returns the hash that identifies the text of a section block."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
 
 class NLPService:
     """A service for advanced NLP processing of text documents."""
     def __init__(self):
-        """Loads the spaCy model and initializes the skill matcher."""
-        self.nlp = self._load_spacy_model()
-        self.skill_patterns = self._load_skill_patterns()
-        self.matcher = PhraseMatcher(self.nlp.vocab, attr='LOWER')
-        if self.skill_patterns:
-            self.matcher.add("SKILL", self.skill_patterns)
-
-    @staticmethod
-    def _load_spacy_model():
-        """
-        Loads the spaCy model, downloading it if necessary.
-        """
-        try:
-            return spacy.load("en_core_web_md")
-        except OSError:
-            print("Downloading 'en_core_web_md' model...")
-            spacy.cli.download("en_core_web_md")
-            return spacy.load("en_core_web_md")
-
-    def _load_skill_patterns(self) -> list:
-        """Loads skill patterns dynamically from an external JSON file."""
-        skills_path = ""
-        try:
-            current_dir = os.path.dirname(__file__)
-            skills_path = os.path.abspath(os.path.join(current_dir, '..', '..', 'skills.json'))
-            with open(skills_path, 'r', encoding='utf-8') as f:
-                skills_data = json.load(f)
-
-            all_skills = [skill for category in skills_data.values() for skill in category]
-            print(f"INFO: Loaded {len(all_skills)} skills from skills.json")
-            # Use the instance's nlp model to create spaCy doc patterns.
-            return [self.nlp.make_doc(text) for text in all_skills]
-
-        except FileNotFoundError:
-            print(f"FATAL: skills.json not found at {skills_path}. No skills will be matched.")
-            return []
-        except json.JSONDecodeError:
-            print(f"FATAL: Could not decode skills.json. Please check syntax.")
-            return []
-
-    def _extract_skills(self, doc: spacy.tokens.Doc) -> list:
-        """Extracts skills using the pre-built matcher."""
-        matches = self.matcher(doc)
-        skills = {doc[start:end].text.lower() for _, start, end in matches}
-        return sorted(list(skills))
+        """Loads the skill vocabulary, its precompiled skill matcher and the syllable dictionary."""
+        self.skill_vocabulary = SkillVocabulary.from_json()
+        self.skill_matcher = SkillMatcher.load_or_build(self.skill_vocabulary)
+        readability.load_syllable_dictionary()
+        print(f"INFO: Loaded {len(self.skill_vocabulary)} skills from skills.json")
 
-    @staticmethod
-    def _extract_stylistic_features(text: str) -> dict:
-        """Calculates stylistic metrics like readability."""
-        if not text or len(text.split()) < 100:
-            return {"readability_score": 0, "readability_level": "N/A"}
+    def memory_usage(self) -> dict:
+        """Estimates the bytes held by the skill vocabulary, the skill matcher and the readability caches."""
+        syllable_dictionary = readability.load_syllable_dictionary()
+        return {
+            'skill_vocabulary': {'skills': len(self.skill_vocabulary), 'bytes': deep_sizeof(self.skill_vocabulary)},
+            'skill_matcher': {'states': len(self.skill_matcher.goto), 'bytes': deep_sizeof(self.skill_matcher)},
+            'syllable_dictionary': {'words': len(syllable_dictionary), 'bytes': deep_sizeof(syllable_dictionary)},
+            'word_caches': readability.cache_info(),
+        }
 
-        # Calculate score based on the input 'text', not an undefined variable.
-        readability_score = textstat.flesch_reading_ease(text)
+    def _extract_skills(self, text: str, tokens: list = None) -> list:
+        """Extracts skill matches (ID, category, offsets) in one pass of the precompiled skill matcher."""
+        return self.skill_matcher.find(text, tokens)
 
+    @staticmethod
+    def _readability_level(readability_score: float) -> str:
+        """Maps a Flesch reading ease score to a readability level."""
         if readability_score > 90:
-            level = "Very Easy"
+            return "Very Easy"
         elif readability_score > 70:
-            level = "Easy"
+            return "Easy"
         elif readability_score > 50:
-            level = "Standard"
+            return "Standard"
         elif readability_score > 30:
-            level = "Difficult"
+            return "Difficult"
         else:
-            level = "Very Difficult"
+            return "Very Difficult"
 
+    @staticmethod
+    def _extract_stylistic_features(text: str, tokens: list = None) -> dict:
+        """Calculates stylistic metrics like readability."""
+        if not text or len(text.split()) < 100:
+            return {"readability_score": 0, "readability_level": "N/A"}
+
+        indices = readability.analyze(text, tokens)
+        readability_score = indices["flesch_reading_ease"]
         return {
             "readability_score": round(readability_score, 2),
-            "readability_level": level
+            "readability_level": NLPService._readability_level(readability_score),
+            "readability_indices": {name: indices[name] for name in (
+                "flesch_kincaid_grade", "smog_index", "coleman_liau_index", "automated_readability_index", "lix")}
         }
 
     @staticmethod
     def _extract_behavioral_metrics(text: str) -> dict:
         """Finds and counts unique action verbs to score accomplishments."""
-        action_verbs = [
-            'achieved', 'analyzed', 'authored', 'automated', 'budgeted', 'built',
-            'created', 'decreased', 'delivered', 'designed', 'developed', 'directed',
-            'enhanced', 'established', 'executed', 'generated', 'implemented',
-            'improved', 'increased', 'initiated', 'innovated', 'launched', 'led',
-            'managed', 'mentored', 'negotiated', 'optimized', 'orchestrated',
-            'organized', 'oversaw', 'pioneered', 'planned', 'produced',
-            'recommended', 'redesigned', 'reduced', 'researched', 'resolved',
-            'restored', 'saved', 'slashed', 'solved', 'spearheaded', 'streamlined',
-            'supervised', 'trained', 'transformed', 'won'
-        ]
-
-        found = re.findall(r'\b(' + '|'.join(action_verbs) + r')\b', text, re.IGNORECASE)
+        found = ACTION_VERB_PATTERN.findall(text)
         accomplishment_score = len(set(v.lower() for v in found))
         return {"accomplishment_score": accomplishment_score}
 
     @staticmethod
     def _extract_experience_years(text: str) -> int:
         """Calculates total years of experience by parsing date ranges."""
-        date_range_regex = r'\b(?:(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+)?(\d{4})\b\s*-\s*\b(?:(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|Present)\s+)?(\d{4}|Present)\b'
-        matches = re.findall(date_range_regex, text, re.IGNORECASE)
+        matches = DATE_RANGE_PATTERN.findall(text)
         total_months = 0
         now = datetime.now()
 
@@ -138,14 +153,9 @@ class NLPService:
     def _extract_education_level(text: str) -> str:
         """Extracts the highest education level found in the text."""
         text_lower = text.lower()
-        if any(edu in text_lower for edu in ["ph.d", "phd", "doctor of philosophy"]):
-            return "Doctorate"
-        if any(edu in text_lower for edu in ["master", "m.s", "m.sc", "m.eng", "mba"]):
-            return "Master's Degree"
-        if any(edu in text_lower for edu in ["bachelor", "b.s", "b.sc", "b.a."]):
-            return "Bachelor's Degree"
-        if any(edu in text_lower for edu in ["associate", "a.s", "a.a"]):
-            return "Associate Degree"
+        for level, keywords in EDUCATION_KEYWORDS.items():
+            if any(edu in text_lower for edu in keywords):
+                return level
         return "Not Found"
 
     @staticmethod
@@ -154,8 +164,7 @@ class NLPService:
         contact_info = {"name": None, "email": None}
 
         # Regex for email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        match = re.search(email_pattern, text)
+        match = EMAIL_PATTERN.search(text)
         if match:
             contact_info["email"] = match.group(0)
 
@@ -166,40 +175,235 @@ class NLPService:
 
         return contact_info
 
-    def process_document(self, text: str) -> dict:
-        """Performs a full analysis of a document, orchestrating all sub-tasks."""
-        if not text:
-            return {}
-
-        doc = self.nlp(text)
+    @staticmethod
+    def _split_sections(text: str) -> dict:
+        """
+        Splits a document into its sections. Each section is stored as the
+        [start, end] offsets of its lines in the text instead of a copy of them;
+        use `section_texts` to get the text of every section back.
+        """
+        return NLPService._sectionize(text)[0]
 
-        # Sectionizing Logic
+    @staticmethod
+    def _sectionize(text: str) -> tuple[dict, list]:
+        """
+        Splits a document into its sections in one pass. Returns the section line
+        offsets (see `_split_sections`) and the section blocks: [start, end,
+        section, hash] for each run of text from one heading line to the next,
+        the first block being the 'HEADER'. The blocks cover the whole text, so
+        comparing their hashes tells which sections an edit changed.
+        """
         current_section = "HEADER"
-        sections = {key: [] for key in SECTION_HEADINGS.keys()}
-        sections.update({"HEADER": [], "OTHER": []})
+        sections = {}
+        blocks = [[0, None, current_section]]
+        line_start = 0
         for line in text.split('\n'):
-            line = line.strip()
-            if not line: continue
-            matched_section = next(
-                (name for name, patterns in SECTION_HEADINGS.items() if any(re.match(p, line, re.I) for p in patterns)),
-                None)
+            start, line_start = line_start, line_start + len(line) + 1
+            stripped = line.strip()
+            if not stripped: continue
+            matched_section = next((name for name, pattern in SECTION_PATTERNS.items() if pattern.match(stripped)), None)
             if matched_section:
                 current_section = matched_section
+                if start == 0:
+                    blocks[-1][2] = matched_section
+                else:
+                    blocks[-1][1] = start
+                    blocks.append([start, None, matched_section])
             else:
-                sections.get(current_section, sections["OTHER"]).append(line)
-        raw_sections = {name: "\n".join(lines) for name, lines in sections.items()}
+                start += len(line) - len(line.lstrip())
+                sections.setdefault(current_section, []).append([start, start + len(stripped)])
+        blocks[-1][1] = len(text)
+        return sections, [[start, end, name, section_digest(text[start:end])] for start, end, name in blocks]
 
-        # Feature Extraction
+    def _field_spans(self, text: str, skill_matches: list = None, include_name: bool = True) -> list:
+        """
+        Returns the merged [start, end] offsets of the parts of the text that the
+        extracted fields are derived from: skills, email, date ranges, education
+        keywords, action verbs and, with `include_name`, the first line.
+        """
+        if skill_matches is None:
+            skill_matches = self._extract_skills(text)
+        spans = [(m.start, m.end) for m in skill_matches]
+        if include_name:
+            first_line_end = text.find('\n')
+            spans.append((0, len(text) if first_line_end == -1 else first_line_end))
+        for pattern in (EMAIL_PATTERN, DATE_RANGE_PATTERN, EDUCATION_PATTERN, ACTION_VERB_PATTERN):
+            spans.extend(match.span() for match in pattern.finditer(text))
+
+        merged = []
+        for start, end in sorted(spans):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+    @staticmethod
+    def _touches(spans: list, start: int, end: int) -> bool:
+        """Tells whether an edited region overlaps a span; an insertion point must fall inside one."""
+        if start == end:
+            return any(s < start < e for s, e in spans)
+        return any(s < end and e > start for s, e in spans)
+
+    @staticmethod
+    def _text_edits(old_text: str, new_text: str, max_region: int = 5000) -> list:
+        """
+        Returns the (tag, old start, old end, new start, new end) character
+        opcodes turning one text into the other. Lines are compared first, then
+        the characters of replaced lines, so edits stay as small as possible.
+        """
+        old_lines, new_lines = old_text.splitlines(keepends=True), new_text.splitlines(keepends=True)
+        old_offsets, new_offsets = [0], [0]
+        for line in old_lines:
+            old_offsets.append(old_offsets[-1] + len(line))
+        for line in new_lines:
+            new_offsets.append(new_offsets[-1] + len(line))
+
+        edits = []
+        for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes():
+            old_start, old_end, new_start, new_end = old_offsets[i1], old_offsets[i2], new_offsets[j1], new_offsets[j2]
+            if tag == 'replace' and max(old_end - old_start, new_end - new_start) <= max_region:
+                matcher = difflib.SequenceMatcher(None, old_text[old_start:old_end], new_text[new_start:new_end],
+                                                  autojunk=False)
+                edits.extend((t, old_start + a1, old_start + a2, new_start + b1, new_start + b2)
+                             for t, a1, a2, b1, b2 in matcher.get_opcodes())
+            else:
+                edits.append((tag, old_start, old_end, new_start, new_end))
+        return edits
+
+    @staticmethod
+    def _move_spans(spans: list, equal_blocks: list) -> list | None:
+        """
+        Shifts [start, end, ...] spans to their offsets in the edited text, given
+        the (old start, old end, new start) unchanged blocks. Returns None if a
+        span does not lie in an unchanged block.
+        """
+        moved = []
+        for start, end, *rest in spans:
+            block = next((b for b in equal_blocks if b[0] <= start and end <= b[1]), None)
+            if block is None:
+                return None
+            moved.append([start - block[0] + block[2], end - block[0] + block[2], *rest])
+        return moved
+
+    @timed("reprocess_document")
+    def reprocess_document(self, old_text: str, old_data: dict, new_text: str) -> dict | None:
+        """
+        Returns the analysis of `new_text`, an edited version of a processed
+        document, by reusing its previous analysis `old_data` when no edit
+        touches the text an extracted field comes from. Returns None when the
+        document has to be processed again.
+        """
+        if not old_text or not new_text or not old_data or 'field_spans' not in old_data:
+            return None
+        if old_data.get('skill_vocabulary') != self.skill_vocabulary.digest:
+            return None  # Its skill IDs refer to another version of skills.json
+
+        field_spans = old_data['field_spans']
+        equal_blocks = []
+        for tag, old_start, old_end, new_start, new_end in self._text_edits(old_text, new_text):
+            if tag == 'equal':
+                equal_blocks.append((old_start, old_end, new_start))
+                continue
+            # Text removed from, or replaced in, the old document
+            if self._touches(field_spans, old_start, old_end):
+                return None
+            # Text added to the new document, with a line of context on each side for fields crossing its edges
+            line_start = new_text.rfind('\n', 0, new_start) + 1
+            window_start = new_text.rfind('\n', 0, max(line_start - 1, 0)) + 1
+            line_end = new_text.find('\n', new_end)
+            window_end = new_text.find('\n', line_end + 1) if line_end != -1 else -1
+            window_end = len(new_text) if window_end == -1 else window_end
+            window_spans = self._field_spans(new_text[window_start:window_end], include_name=(window_start == 0))
+            if self._touches([(s + window_start, e + window_start) for s, e in window_spans], new_start, new_end):
+                return None
+
+        # Every field lies in an unchanged block, so its offsets only shift.
+        moved_spans = {key: self._move_spans(old_data[key], equal_blocks)
+                       for key in ("field_spans", "skill_spans") if key in old_data}
+        if None in moved_spans.values():
+            return None
+
+        processed_data = dict(old_data)
+        processed_data.pop("readability_indices", None)
+        processed_data.update(moved_spans)
+        processed_data["section_spans"], processed_data["section_blocks"] = self._sectionize(new_text)
+        processed_data.update(self._extract_stylistic_features(new_text))
+        return processed_data
+
+    @timed("reprocess_sections")
+    def reprocess_sections(self, old_text: str, old_data: dict, new_text: str) -> dict | None:
+        """
+        Returns the analysis of `new_text`, an edited version of a processed
+        document, running the skill and field matching only on the section
+        blocks whose hash changed. The matches of unchanged blocks are carried
+        over from `old_data` at their new offsets, and the document-level
+        features are recomputed. Returns None when `old_data` has no section hashes.
+        """
+        if not new_text or not old_data or any(
+                key not in old_data for key in ("section_blocks", "skill_spans", "field_spans")):
+            return None
+        if old_data.get('skill_vocabulary') != self.skill_vocabulary.digest:
+            return None  # Its skill IDs refer to another version of skills.json
+
+        section_spans, section_blocks = self._sectionize(new_text)
+        old_blocks = {digest: (start, end) for start, end, _, digest in old_data["section_blocks"]}
+        skill_spans, field_spans = [], []
+        for start, end, _, digest in section_blocks:
+            old = old_blocks.get(digest)
+            # The first line holds the candidate's name, so a block moving to or from the top is analysed again.
+            if old is not None and (old[0] == 0) == (start == 0):
+                shift = start - old[0]
+                skill_spans.extend([s + shift, e + shift, skill_id] for s, e, skill_id in old_data["skill_spans"]
+                                   if old[0] <= s and e <= old[1])
+                field_spans.extend([s + shift, e + shift] for s, e in old_data["field_spans"]
+                                   if old[0] <= s and e <= old[1])
+            else:
+                block = new_text[start:end]
+                with span("nlp_skills"):
+                    matches = self._extract_skills(block)
+                skill_spans.extend([m.start + start, m.end + start, m.skill_id] for m in matches)
+                field_spans.extend([s + start, e + start]
+                                   for s, e in self._field_spans(block, matches, include_name=(start == 0)))
+
+        return self._document_data(new_text, skill_spans, field_spans, section_spans, section_blocks)
+
+    def _document_data(self, text: str, skill_spans: list, field_spans: list, section_spans: dict,
+                       section_blocks: list, tokens: list = None) -> dict:
+        """Assembles the processed document from its skill, field and section offsets."""
+        skill_ids = sorted({skill_id for _, _, skill_id in skill_spans})
+        contact_info = self._extract_contact_info(text)
         processed_data = {
-            "extracted_name": self._extract_contact_info(text).get("name"),
-            "extracted_email": self._extract_contact_info(text).get("email"),
-            "skills": ", ".join(self._extract_skills(doc)),
+            "extracted_name": contact_info.get("name"),
+            "extracted_email": contact_info.get("email"),
+            "skills": ", ".join(sorted(self.skill_vocabulary.skills[i] for i in skill_ids)),
+            "skill_ids": skill_ids,
+            "skill_vocabulary": self.skill_vocabulary.digest,
+            "skill_categories": sorted({self.skill_vocabulary.categories[i] for i in skill_ids}),
+            "skill_spans": skill_spans,
             "experience_years": self._extract_experience_years(text),
             "education_level": self._extract_education_level(text),
-            "raw_sections": raw_sections
+            "section_spans": section_spans,
+            "section_blocks": section_blocks,
+            "field_spans": field_spans
         }
 
-        processed_data.update(self._extract_stylistic_features(text))
+        with span("nlp_readability"):
+            processed_data.update(self._extract_stylistic_features(text, tokens))
         processed_data.update(self._extract_behavioral_metrics(text))
 
-        return processed_data
\ No newline at end of file
+        return processed_data
+
+    @timed("process_document")
+    def process_document(self, text: str) -> dict:
+        """Performs a full analysis of a document, orchestrating all sub-tasks."""
+        if not text:
+            return {}
+
+        # Feature Extraction, sharing one tokenization between skills and readability
+        tokens = tokenize(text)
+        with span("nlp_skills"):
+            skill_matches = self._extract_skills(text, tokens)
+        section_spans, section_blocks = self._sectionize(text)
+        return self._document_data(text, [[m.start, m.end, m.skill_id] for m in skill_matches],
+                                   self._field_spans(text, skill_matches), section_spans, section_blocks, tokens)
\ No newline at end of file
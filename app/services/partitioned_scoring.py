@@ -0,0 +1,364 @@
+# app/services/partitioned_scoring.py
+"""
+Partitioned, multi-process top-k scoring for very large talent pools.
+
+A recruiter's pool is split into shards by resume ID range (the leading hex
+characters of the UUID), and each shard's section embeddings, skill matrix and
+numeric features are written to memory-mapped files under
+instance/pool_shards/<recruiter_id>/. Scoring a job fans the shards out to a
+process pool; every worker computes the same feature vectors and scores as
+RankingService and returns its partial top-k, and the partial results are
+merged. Only shards whose fingerprint (the IDs, candidates and content hashes
+of their resumes) changed are rebuilt.
+
+Shards are rebuilt under an exclusive flock() on the recruiter's shard
+directory and read under a shared one, so concurrent requests, in one worker
+process or several, never write the same files or score a half-built shard.
+"""
+import os
+import json
+import fcntl
+import shutil
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+from scipy import sparse
+from flask import current_app
+from contextlib import contextmanager
+from sqlalchemy import func
+from app.extensions import db
+from app.models import Job, Resume
+from app.services.ranking_service import RankingService, score_feature_vectors
+from app.utils.timing import timed
+
+MANIFEST_VERSION = 3
+LOCK_FILE = '.lock'
+
+# Section name under which each similarity feature's resume text is stored in DocumentEmbedding.
+EMBEDDING_SECTIONS = {
+    "overall_similarity": "overall",
+    "experience_similarity": "EXPERIENCE",
+    "skills_similarity": "SKILLS",
+}
+NUMERIC_FEATURES = ("accomplishment_score", "readability_score")
+
+
+def _sort_key(match: tuple):
+    """Orders matches by score, descending, breaking ties by resume ID."""
+    return -match[0], match[1]
+
+
+def _is_excluded(candidate_id, applied_candidate_ids: set) -> bool:
+    """
+    Mirrors `Resume.candidate_id.notin_(applied_candidate_ids)` as evaluated by SQL:
+    with a non-empty list, a NULL candidate ID does not pass the filter either.
+    """
+    return bool(applied_candidate_ids) and (candidate_id is None or candidate_id in applied_candidate_ids)
+
+
+# Worker side
+
+_worker_models = {}
+
+
+def _load_worker_model(model_path: str):
+    if model_path and model_path not in _worker_models:
+        _worker_models[model_path] = joblib.load(model_path)
+    return _worker_models.get(model_path)
+
+
+def score_shard(task: dict) -> list[tuple]:
+    """
+    Scores one shard against a job. Runs in a worker process and only reads the
+    shard's memory-mapped files. Returns the shard's (score, resume ID,
+    feature vector) matches, best first, cut to the task's limit.
+    """
+    path = task['path']
+    with open(os.path.join(path, 'resumes.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    resume_ids, candidate_ids = meta['resume_ids'], meta['candidate_ids']
+    count = len(resume_ids)
+
+    # Skill overlap for the whole shard with one sparse product, as SkillVocabulary.skill_overlap does.
+    skills = sparse.load_npz(os.path.join(path, 'skills.npz'))
+    job_ids = task['job_skill_ids']
+    if job_ids:
+        weights = np.asarray(task['skill_weights'], dtype=np.float32)
+        job_vector = np.zeros(skills.shape[1], dtype=np.float32)
+        job_vector[job_ids] = 1.0
+        intersection = skills @ job_vector
+        union = np.asarray(skills.sum(axis=1)).ravel() + len(job_ids) - intersection
+        jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+        coverage = (skills @ (job_vector * weights)) / weights[job_ids].sum()
+    else:
+        jaccard = coverage = np.zeros(count, dtype=np.float32)
+
+    similarities = {}
+    for feature, job_embedding in task['job_embeddings'].items():
+        if job_embedding is None:
+            similarities[feature] = np.zeros(count)
+            continue
+        embeddings = np.load(os.path.join(path, f'{feature}.npy'), mmap_mode='r')
+        mask = np.load(os.path.join(path, f'{feature}.mask.npy'), mmap_mode='r')
+        similarities[feature] = np.where(mask, embeddings @ np.asarray(job_embedding, dtype=np.float32), 0.0)
+    numeric = np.load(os.path.join(path, 'numeric.npy'), mmap_mode='r')
+
+    applied = set(task['applied_candidate_ids'])
+    # A job without recognised skills would leave every resume at 0% coverage.
+    min_skill_overlap = task['min_skill_overlap'] if task['job_skill_ids'] else 0.0
+    rows, feature_vectors = [], []
+    for i in range(count):
+        if _is_excluded(candidate_ids[i], applied):
+            continue
+        if min_skill_overlap and coverage[i] < min_skill_overlap:
+            continue
+        feature_vector = {feature: round(float(values[i]), 4) for feature, values in similarities.items()}
+        feature_vector.update({name: numeric[i, j].item() for j, name in enumerate(NUMERIC_FEATURES)})
+        feature_vector.update({"skill_jaccard": round(float(jaccard[i]), 4),
+                               "skill_coverage": round(float(coverage[i]), 4)})
+        rows.append(i)
+        feature_vectors.append(feature_vector)
+
+    scores = score_feature_vectors(_load_worker_model(task['model_path']), feature_vectors)
+    threshold = task['score_threshold']
+    matches = [(score, resume_ids[i], features)
+               for i, features, score in zip(rows, feature_vectors, scores) if score >= threshold]
+    matches.sort(key=_sort_key)
+    return matches if task['limit'] is None else matches[:task['limit']]
+
+
+# Shard maintenance
+
+@contextmanager
+def _shard_lock(root: str, exclusive: bool):
+    """Holds the lock of a recruiter's shard directory, exclusive while shards are written."""
+    os.makedirs(root, exist_ok=True)
+    # flock() locks belong to the open file, so each holder opens its own and threads exclude each other too.
+    with open(os.path.join(root, LOCK_FILE), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_manifest(root: str) -> dict:
+    try:
+        with open(os.path.join(root, 'manifest.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _clear_shards(root: str):
+    """Removes every shard and the manifest, keeping the lock file that is held."""
+    for entry in os.listdir(root):
+        path = os.path.join(root, entry)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif entry != LOCK_FILE:
+            os.remove(path)
+
+
+def _fingerprint(rows) -> str:
+    """Hashes the (resume ID, candidate ID, content hash) rows of a shard, in resume ID order."""
+    digest = hashlib.sha1()
+    for resume_id, candidate_id, content_hash in rows:
+        digest.update(f"{resume_id}:{candidate_id or ''}:{content_hash or ''}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _numeric_value(value) -> float:
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def _build_shard(path: str, resumes: list[Resume], skill_vocabulary, batch_size: int = 512):
+    """Writes the memory-mapped feature files of one shard."""
+    from app.services.embedding_store import get_document_embeddings
+
+    os.makedirs(path, exist_ok=True)
+    count = len(resumes)
+    texts = [RankingService.resume_comparison_texts(resume) for resume in resumes]
+
+    for feature, section in EMBEDDING_SECTIONS.items():
+        mask = np.array([bool(t[feature]) for t in texts], dtype=bool)
+        embeddings = None
+        for start in range(0, count, batch_size):
+            batch = [(resumes[i].id, texts[i][feature]) for i in range(start, min(start + batch_size, count)) if mask[i]]
+            if not batch:
+                continue
+            vectors = get_document_embeddings('resume', batch, section=section)
+            db.session.commit()
+            if embeddings is None:
+                embeddings = np.lib.format.open_memmap(os.path.join(path, f'{feature}.npy'), mode='w+',
+                                                       dtype=np.float32, shape=(count, vectors.shape[1]))
+            positions = [i for i in range(start, min(start + batch_size, count)) if mask[i]]
+            embeddings[positions] = vectors
+        if embeddings is None:
+            np.save(os.path.join(path, f'{feature}.npy'), np.zeros((count, 1), dtype=np.float32))
+        else:
+            embeddings.flush()
+            del embeddings
+        np.save(os.path.join(path, f'{feature}.mask.npy'), mask)
+
+    numeric = np.array([[_numeric_value((r.sectioned_text or {}).get(name, 0)) for name in NUMERIC_FEATURES]
+                        for r in resumes], dtype=np.float64).reshape(count, len(NUMERIC_FEATURES))
+    np.save(os.path.join(path, 'numeric.npy'), numeric)
+    skill_ids = [skill_vocabulary.ids_for_document(r.sectioned_text) for r in resumes]
+    sparse.save_npz(os.path.join(path, 'skills.npz'), skill_vocabulary.to_matrix(skill_ids))
+    with open(os.path.join(path, 'resumes.json'), 'w', encoding='utf-8') as f:
+        json.dump({'resume_ids': [r.id for r in resumes], 'candidate_ids': [r.candidate_id for r in resumes]}, f)
+
+
+class PartitionedPoolScorer:
+    """Keeps a recruiter's pool shards up to date and scores jobs across them in parallel."""
+
+    def __init__(self):
+        self._executor = None
+        self._executor_workers = None
+
+    def _get_executor(self, workers: int):
+        if self._executor is None or self._executor_workers != workers:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            # 'spawn' keeps the workers independent of the web server's threads and loaded models.
+            self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            self._executor_workers = workers
+        return self._executor
+
+    @staticmethod
+    def shard_root(recruiter_id: str) -> str:
+        return os.path.join(current_app.instance_path, 'pool_shards', recruiter_id)
+
+    @staticmethod
+    def _pool_query(recruiter_id: str):
+        return Resume.query.filter(Resume.source == 'talent_pool', Resume.uploader_id == recruiter_id,
+                                   Resume.duplicate_of_id.is_(None))
+
+    def pool_size(self, recruiter_id: str) -> int:
+        """Returns the number of resumes in the recruiter's talent pool."""
+        return self._pool_query(recruiter_id).count()
+
+    def _shard_fingerprints(self, recruiter_id: str, prefix_length: int) -> dict[str, str]:
+        """Returns the current fingerprint of every shard of the recruiter's pool, by shard prefix."""
+        rows = self._pool_query(recruiter_id) \
+            .with_entities(Resume.id, Resume.candidate_id, Resume.content_hash).order_by(Resume.id).all()
+        shard_rows = {}
+        for row in rows:
+            shard_rows.setdefault(row[0][:prefix_length], []).append(row)
+        return {shard_prefix: _fingerprint(rows) for shard_prefix, rows in shard_rows.items()}
+
+    @timed("sync_pool_shards")
+    def sync_shards(self, recruiter_id: str) -> dict:
+        """
+        Rebuilds the shards whose fingerprint changed since they were written and
+        returns the up-to-date manifest.
+        """
+        from app.services.shared_services import ranking_service
+
+        prefix_length = current_app.config['PARTITIONED_SCORING_PREFIX_LENGTH']
+        root = self.shard_root(recruiter_id)
+        with _shard_lock(root, exclusive=True):
+            # Read under the lock: another request may have just rebuilt the shards.
+            manifest = _read_manifest(root)
+            if (manifest.get('version'), manifest.get('prefix_length'), manifest.get('model_name'),
+                    manifest.get('skill_vocabulary')) != \
+                    (MANIFEST_VERSION, prefix_length, ranking_service.model_name,
+                     ranking_service.skill_vocabulary.digest):
+                _clear_shards(root)
+                manifest = {}
+
+            fingerprints = self._shard_fingerprints(recruiter_id, prefix_length)
+            shards = manifest.get('shards', {})
+            for shard_prefix in set(shards) - set(fingerprints):
+                shutil.rmtree(os.path.join(root, shard_prefix), ignore_errors=True)
+                del shards[shard_prefix]
+            prefix = func.substr(Resume.id, 1, prefix_length)
+            for shard_prefix, fingerprint in sorted(fingerprints.items()):
+                if shards.get(shard_prefix) == fingerprint:
+                    continue
+                resumes = self._pool_query(recruiter_id).filter(prefix == shard_prefix).order_by(Resume.id).all()
+                shard_path = os.path.join(root, shard_prefix)
+                shutil.rmtree(shard_path, ignore_errors=True)
+                _build_shard(shard_path, resumes, ranking_service.skill_vocabulary)
+                # Fingerprint what was built; a resume added meanwhile is picked up by the next sync.
+                shards[shard_prefix] = _fingerprint((r.id, r.candidate_id, r.content_hash) for r in resumes)
+
+            manifest = {'version': MANIFEST_VERSION, 'prefix_length': prefix_length,
+                        'model_name': ranking_service.model_name,
+                        'skill_vocabulary': ranking_service.skill_vocabulary.digest, 'shards': shards}
+            with open(os.path.join(root, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+        return manifest
+
+    @timed("partitioned_scoring")
+    def score_pool(self, job: Job, recruiter_id: str, score_threshold: float = 0.5, limit: int = 5,
+                   min_skill_overlap: float = 0.0, applied_candidate_ids: list = ()) -> list[tuple]:
+        """
+        Scores the recruiter's whole pool against a job and returns the best
+        (score, resume ID, feature vector) matches with a score of at least
+        `score_threshold`, best first; `limit=None` returns every such match.
+        """
+        from app.services.shared_services import ranking_service
+
+        if not self.sync_shards(recruiter_id)['shards']:
+            return []
+
+        # Make sure the model (or the heuristic) the workers use is the one the service uses.
+        ranking_service.predict_scores([])
+        job_texts = ranking_service.job_comparison_texts(job)
+        non_empty = [feature for feature, text in job_texts.items() if text]
+        job_vectors = dict(zip(non_empty, ranking_service.encode([job_texts[f] for f in non_empty]))) if non_empty else {}
+
+        base_task = {
+            'job_embeddings': {feature: job_vectors[feature].tolist() if feature in job_vectors else None
+                               for feature in EMBEDDING_SECTIONS},
+            'job_skill_ids': ranking_service.skill_vocabulary.ids_for_document(job.sectioned_text),
+            'skill_weights': ranking_service.skill_vocabulary.weights.tolist(),
+            'applied_candidate_ids': list(applied_candidate_ids),
+            'min_skill_overlap': min_skill_overlap,
+            'score_threshold': score_threshold,
+            'limit': limit,
+            'model_path': ranking_service.ranking_model_path,
+        }
+        workers = current_app.config['PARTITIONED_SCORING_WORKERS'] or os.cpu_count() or 1
+
+        root = self.shard_root(recruiter_id)
+        with _shard_lock(root, exclusive=False):
+            # The shards as of now, which no other request can rebuild until they are scored
+            manifest = _read_manifest(root)
+            tasks = [dict(base_task, path=os.path.join(root, shard_prefix))
+                     for shard_prefix in sorted(manifest.get('shards', {}))]
+            if workers > 1 and len(tasks) > 1:
+                partials = list(self._get_executor(min(workers, len(tasks))).map(score_shard, tasks))
+            else:
+                partials = [score_shard(task) for task in tasks]
+
+        # Merge the partial top-k lists.
+        matches = sorted((match for partial in partials for match in partial), key=_sort_key)
+        return matches if limit is None else matches[:limit]
+
+    def find_matches(self, job: Job, recruiter_id: str, score_threshold: float = 0.5, limit: int = 5,
+                     min_skill_overlap: float = 0.0) -> list[Resume]:
+        """
+        Partitioned equivalent of RankingService.find_matches_in_pool: the same
+        applicant exclusion, threshold and limit, with each score attached as `resume.score`.
+        """
+        applied_candidate_ids = [app.candidate_id for app in job.applications]
+        matches = self.score_pool(job, recruiter_id, score_threshold, limit, min_skill_overlap,
+                                  applied_candidate_ids)
+        resumes = {r.id: r for r in Resume.query.filter(Resume.id.in_([m[1] for m in matches]))}
+
+        results = []
+        for score, resume_id, _ in matches:
+            resume = resumes.get(resume_id)
+            if resume is not None:
+                # Add the score to the resume object temporarily for display
+                resume.score = score
+                results.append(resume)
+        return results
+
+
+partitioned_scorer = PartitionedPoolScorer()
@@ -0,0 +1,214 @@
+# app/services/pool_matching.py
+"""
+Maintains the materialized JobPoolMatch table. When a job is posted, the
+recruiter's whole talent pool is scored against it in batches; when resumes are
+added to a talent pool, only those resumes are scored against the recruiter's
+jobs. The ranking page then reads its passive candidates with a single indexed
+query instead of rescoring the pool on every view. Matches are stamped with the
+feature schema and ranking model that scored them; after a retrain or a feature
+change, a job's matches are ignored until its pool has been scored again.
+"""
+import uuid
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import or_, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from app.extensions import db, task_queue
+from app.models import Job, Resume, JobPoolMatch, FEATURE_SCHEMA_VERSION
+from app.services.shared_services import ranking_service
+from app.services.partitioned_scoring import partitioned_scorer
+from app.services.cascade_ranking import cascade_ranker
+
+# Jobs with a full materialization queued in this process, to avoid queueing it twice.
+_queued_job_ids = set()
+
+# INSERT ... ON CONFLICT builders; another process may store the same (job, resume) pair concurrently.
+# Other dialects fall back to deleting and inserting the rows.
+UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+
+def _features_tag() -> str:
+    return f"features-v{FEATURE_SCHEMA_VERSION}"
+
+
+def pool_scoring_version() -> str:
+    """Identifies the feature schema and ranking model that stored matches are scored with."""
+    return f"{_features_tag()}/{ranking_service.model_version()}"
+
+
+def reset_outdated_matches() -> int:
+    """
+    Marks the jobs whose stored matches were computed with an older feature
+    schema as not materialized. Runs at startup; returns the number of jobs reset.
+    """
+    outdated = Job.query.filter(Job.pool_matched_at.isnot(None),
+                                or_(Job.pool_scoring_version.is_(None),
+                                    Job.pool_scoring_version.notlike(f"{_features_tag()}/%")))
+    count = outdated.update({Job.pool_matched_at: None, Job.pool_scoring_version: None}, synchronize_session=False)
+    db.session.commit()
+    if count:
+        print(f"INFO: Reset the talent-pool matches of {count} jobs scored with an older feature schema.")
+    return count
+
+
+def _upsert_matches(job: Job, matches: list[tuple[str, float, dict]], version: str, computed_at: datetime):
+    """Inserts or overwrites the JobPoolMatch rows of (resume_id, score, feature_scores) for a job."""
+    if not matches:
+        return
+    rows = [{'id': str(uuid.uuid4()), 'job_id': job.id, 'resume_id': resume_id, 'score': score,
+             'feature_scores': features, 'scoring_version': version, 'date_computed': computed_at}
+            for resume_id, score, features in matches]
+    upsert_insert = UPSERT_INSERTS.get(db.engine.dialect.name)
+    if upsert_insert is None:
+        # No ON CONFLICT support: replace the job's rows for these resumes instead
+        JobPoolMatch.query.filter(JobPoolMatch.job_id == job.id,
+                                  JobPoolMatch.resume_id.in_([row['resume_id'] for row in rows])) \
+            .delete(synchronize_session=False)
+        db.session.execute(insert(JobPoolMatch), rows)
+        return
+    statement = upsert_insert(JobPoolMatch)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['job_id', 'resume_id'],
+        set_={column: statement.excluded[column]
+              for column in ('score', 'feature_scores', 'scoring_version', 'date_computed')}
+    ), rows)
+
+
+def _matches_over_threshold(scored: list) -> list[tuple[str, float, dict]]:
+    """Keeps the (resume_id, score, features) of the scored resumes that reach the match threshold."""
+    threshold = current_app.config['POOL_MATCH_SCORE_THRESHOLD']
+    return [(resume.id, score, features) for resume, features, score in scored if score >= threshold]
+
+
+def materialize_job_matches(job_id: str):
+    """Scores the uploader's whole talent pool against a job and replaces its stored matches."""
+    _queued_job_ids.discard(job_id)
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return
+
+    started_at = datetime.now(timezone.utc)
+    version = pool_scoring_version()
+    if partitioned_scorer.pool_size(job.uploader_id) >= current_app.config['PARTITIONED_SCORING_MIN_POOL']:
+        scored = partitioned_scorer.score_pool(
+            job, job.uploader_id, score_threshold=current_app.config['POOL_MATCH_SCORE_THRESHOLD'], limit=None,
+            min_skill_overlap=current_app.config['POOL_MIN_SKILL_OVERLAP']
+        )
+        matches = [(resume_id, score, features) for score, resume_id, features in scored]
+    else:
+        pool_resumes = Resume.query.filter_by(source='talent_pool', uploader_id=job.uploader_id, duplicate_of_id=None).all()
+        matches = _matches_over_threshold(ranking_service.score_resumes(
+            job, pool_resumes, min_skill_overlap=current_app.config['POOL_MIN_SKILL_OVERLAP']
+        ))
+
+    # Upserted after scoring, so the write transaction stays short; rows this run did not
+    # refresh and no concurrent resume materialization wrote since it started are removed.
+    computed_at = datetime.now(timezone.utc)
+    _upsert_matches(job, matches, version, computed_at)
+    JobPoolMatch.query.filter(JobPoolMatch.job_id == job.id,
+                              JobPoolMatch.date_computed < started_at).delete(synchronize_session=False)
+    job.pool_matched_at = computed_at
+    job.pool_scoring_version = version
+    db.session.commit()
+
+
+def materialize_resume_matches(resume_ids: list[str], recruiter_id: str):
+    """Scores newly added talent-pool resumes against every job of their recruiter."""
+    resumes = Resume.query.filter(Resume.id.in_(resume_ids)).all()
+    if not resumes:
+        return
+
+    # Jobs whose stored matches are stale get a full materialization on their next ranking view instead.
+    version = pool_scoring_version()
+    jobs = Job.query.filter(Job.uploader_id == recruiter_id, Job.pool_matched_at.isnot(None),
+                            Job.pool_scoring_version == version).all()
+    for job in jobs:
+        matches = _matches_over_threshold(ranking_service.score_resumes(
+            job, resumes, min_skill_overlap=current_app.config['POOL_MIN_SKILL_OVERLAP']
+        ))
+        JobPoolMatch.query.filter(JobPoolMatch.job_id == job.id,
+                                  JobPoolMatch.resume_id.in_(resume_ids)).delete(synchronize_session=False)
+        _upsert_matches(job, matches, version, datetime.now(timezone.utc))
+    db.session.commit()
+
+
+def has_current_matches(job: Job) -> bool:
+    """True when the job's stored matches were scored with the current features and ranking model."""
+    return job.pool_matched_at is not None and job.pool_scoring_version == pool_scoring_version()
+
+
+def queue_job_materialization(job: Job):
+    """Queues a full talent-pool scoring for a job, unless one is already queued."""
+    if job.id not in _queued_job_ids:
+        _queued_job_ids.add(job.id)
+        task_queue.submit(materialize_job_matches, job.id)
+
+
+def queue_resume_materialization(resume_ids: list[str], recruiter_id: str):
+    """Queues the scoring of newly uploaded talent-pool resumes against the recruiter's jobs."""
+    if resume_ids:
+        task_queue.submit(materialize_resume_matches, resume_ids, recruiter_id)
+
+
+def get_pool_matches(job: Job, limit: int = 5) -> list[Resume]:
+    """
+    Returns the top stored talent-pool matches for a job, excluding resumes of
+    candidates who already applied, with each score attached as `resume.score`.
+    """
+    applied_candidate_ids = [app.candidate_id for app in job.applications]
+
+    rows = db.session.query(Resume, JobPoolMatch.score) \
+        .join(JobPoolMatch, JobPoolMatch.resume_id == Resume.id) \
+        .filter(
+            JobPoolMatch.job_id == job.id,
+            JobPoolMatch.scoring_version == pool_scoring_version(),
+            JobPoolMatch.score >= current_app.config['POOL_MATCH_SCORE_THRESHOLD'],
+            Resume.candidate_id.notin_(applied_candidate_ids)
+        ) \
+        .order_by(JobPoolMatch.score.desc()) \
+        .limit(limit).all()
+
+    matches = []
+    for resume, score in rows:
+        # Add the score to the resume object temporarily for display
+        resume.score = score
+        matches.append(resume)
+    return matches
+
+
+def find_passive_candidates(job_id: str, recruiter_id: str) -> list[tuple[str, float]]:
+    """
+    Scores the recruiter's talent pool against a job while its matches are not
+    materialized, and returns the best (resume ID, score) pairs. Runs on the
+    inference pool with its own session (see InferenceExecutor.run_isolated),
+    which stores the embeddings encoded along the way.
+    """
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return []
+
+    # The cascade takes precedence on any pool size: its stage cuts and time budget bound the
+    # latency of this live request, whereas the partitioned scorer scores every resume.
+    find_matches = ranking_service.find_matches_in_pool
+    if partitioned_scorer.pool_size(recruiter_id) >= current_app.config['PARTITIONED_SCORING_MIN_POOL']:
+        find_matches = partitioned_scorer.find_matches
+    if current_app.config['CASCADE_RANKING']:
+        find_matches = cascade_ranker.find_matches
+    resumes = find_matches(job, recruiter_id=recruiter_id,
+                           score_threshold=current_app.config['POOL_MATCH_SCORE_THRESHOLD'],
+                           min_skill_overlap=current_app.config['POOL_MIN_SKILL_OVERLAP'])
+    db.session.commit()
+    return [(resume.id, resume.score) for resume in resumes]
+
+
+def load_scored_resumes(matches: list[tuple[str, float]]) -> list[Resume]:
+    """Loads the resumes of (resume ID, score) pairs in order, with each score attached as `resume.score`."""
+    resumes = {resume.id: resume for resume in Resume.query.filter(Resume.id.in_([m[0] for m in matches]))}
+    results = []
+    for resume_id, score in matches:
+        resume = resumes.get(resume_id)
+        if resume is not None:
+            # Add the score to the resume object temporarily for display
+            resume.score = score
+            results.append(resume)
+    return results
@@ -1,26 +1,59 @@
 # app/services/ranking_service.py
 import os
 import glob
+import hashlib
+import threading
+from collections import OrderedDict
 import joblib
+import numpy as np
 import pandas as pd
-import torch
-from sentence_transformers import SentenceTransformer, util
 from flask import current_app
 from app.models import Job, Resume
+from app.services.encoder_service import create_encoder
+from app.services.nlp_service import section_texts
+from app.services.skill_vocabulary import SkillVocabulary
+from app.utils.timing import span, timed
+from app.utils.profiling import deep_sizeof
+
+def score_feature_vectors(ranking_model, feature_vectors: list[dict]) -> list[float]:
+    """
+    Scores feature vectors with a trained ranking model, or with the heuristic
+    formula when no model is available.
+    """
+    if not feature_vectors:
+        return []
+    if ranking_model:
+        feature_df = pd.DataFrame(feature_vectors)
+        # Models trained before newer features were added only know their own columns.
+        if hasattr(ranking_model, 'feature_names_in_'):
+            feature_df = feature_df.reindex(columns=ranking_model.feature_names_in_, fill_value=0)
+        probabilities = ranking_model.predict_proba(feature_df)[:, 1]
+        return [round(float(p), 4) for p in probabilities]
+    else:
+        return [RankingService._get_heuristic_score(features) for features in feature_vectors]
+
 
 class RankingService:
     """
     Ranks candidates using a hybrid approach of semantic similarity and ML
     """
 
-    def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', encoder_backend: str = 'torch',
+                 encoder_model_dir: str = '', intra_op_threads: int = 0,
+                 skill_vocabulary: SkillVocabulary = None, embedding_cache_size: int = 10000):
         """
-        Initializes the RankingService, loading the SentenceTransformer model.
+        Initializes the RankingService, loading the sentence encoder for the
+        selected backend ('torch', 'onnx' or 'onnx-int8').
         """
-        self.sbert_model = SentenceTransformer(model_name)
-        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        self.sbert_model.to(self.device)
+        self.model_name = model_name
+        self.encoder = create_encoder(encoder_backend, model_name, encoder_model_dir, intra_op_threads)
+        # Bounded LRU of normalized embeddings keyed by the SHA-1 of the encoded text.
+        self.embedding_cache = OrderedDict()
+        self.embedding_cache_size = embedding_cache_size
+        self._embedding_cache_lock = threading.Lock()
+        self.skill_vocabulary = skill_vocabulary or SkillVocabulary.from_json()
         self.ranking_model = None
+        self.ranking_model_path = None
         self.model_loaded = False
 
     def _load_latest_model(self):
@@ -41,10 +74,17 @@ class RankingService:
         latest_model_path = max(list_of_models, key=os.path.getctime)
         try:
             self.ranking_model = joblib.load(latest_model_path)
+            self.ranking_model_path = latest_model_path
             print(f"Successfully loaded trained ranking model: {os.path.basename(latest_model_path)}")
         except Exception as e:
             print(f"ERROR: Could not load model file {latest_model_path}: {e}")
 
+    def model_version(self) -> str:
+        """Names the ranking model in use: its file name, or 'heuristic' before one is trained."""
+        if not self.model_loaded:
+            self._load_latest_model()
+        return os.path.basename(self.ranking_model_path) if self.ranking_model_path else 'heuristic'
+
     @staticmethod
     def _get_heuristic_score(features: dict) -> float:
         """
@@ -65,70 +105,232 @@ class RankingService:
 
         return min(round(score, 4), 1.0) # Ensure score does not exceed 1.0
 
-    def _get_section_similarity(self, text1: str, text2: str) -> float:
-        """Calculates semantic cosine similarity between two texts."""
-        if not text1 or not text2:
-            return 0.0
+    @staticmethod
+    def job_comparison_texts(job: Job) -> dict:
+        """Returns the job text compared for each similarity feature."""
+        job_sections = section_texts(job.description or "", job.sectioned_text)
+
+        # Get the text from the most relevant sections, defaulting to empty strings
+        return {
+            "overall_similarity": job.description,
+            "experience_similarity": job_sections.get("RESPONSIBILITIES", "") or job_sections.get("EXPERIENCE", ""),
+            "skills_similarity": job_sections.get("SKILLS", ""),
+        }
+
+    @staticmethod
+    def resume_comparison_texts(resume: Resume) -> dict:
+        """Returns the resume text compared for each similarity feature."""
+        resume_sections = section_texts(resume.extracted_text or "", resume.sectioned_text)
+        return {
+            "overall_similarity": resume.extracted_text,
+            "experience_similarity": resume_sections.get("EXPERIENCE", ""),
+            "skills_similarity": resume_sections.get("SKILLS", ""),
+        }
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Returns L2-normalized embeddings for the texts, reusing cached embeddings
+        and encoding the remaining texts in one batch.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        keys = [hashlib.sha1(text.encode('utf-8')).hexdigest() for text in texts]
+        with self._embedding_cache_lock:
+            cached = {key: self.embedding_cache[key] for key in keys if key in self.embedding_cache}
+            for key in cached:
+                self.embedding_cache.move_to_end(key)
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if missing:
+            with span("sbert_encode"):
+                embeddings = self.encoder.encode(list(missing.values()))
+            embeddings = embeddings / np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+            with self._embedding_cache_lock:
+                for key, embedding in zip(missing, embeddings):
+                    cached[key] = embedding
+                    self.embedding_cache[key] = embedding
+                while len(self.embedding_cache) > self.embedding_cache_size:
+                    self.embedding_cache.popitem(last=False)
+
+        return np.vstack([cached[key] for key in keys]).astype(np.float32)
+
+    def cache_embeddings(self, embeddings: dict):
+        """Adds normalized embeddings computed elsewhere, keyed by the SHA-1 of their text, to the LRU cache."""
+        with self._embedding_cache_lock:
+            for key, embedding in embeddings.items():
+                self.embedding_cache[key] = embedding
+                self.embedding_cache.move_to_end(key)
+            while len(self.embedding_cache) > self.embedding_cache_size:
+                self.embedding_cache.popitem(last=False)
+
+    def memory_usage(self) -> dict:
+        """Estimates the bytes held by the encoder weights, the embedding cache, the ranking model and the vocabulary."""
+        with self._embedding_cache_lock:
+            cache = dict(self.embedding_cache)
+        weights_bytes = getattr(self.encoder, 'weights_bytes', None)
+        return {
+            'encoder': {'backend': getattr(self.encoder, 'backend', type(self.encoder).__name__),
+                        'weights_bytes': weights_bytes() if weights_bytes else None},
+            'embedding_cache': {'entries': len(cache), 'capacity': self.embedding_cache_size,
+                                'bytes': deep_sizeof(cache)},
+            # Native boosters are invisible to deep_sizeof, so the model is sized by its file.
+            'ranking_model': {'path': self.ranking_model_path,
+                              'file_bytes': os.path.getsize(self.ranking_model_path) if self.ranking_model_path else 0},
+            'skill_vocabulary': {'skills': len(self.skill_vocabulary), 'bytes': deep_sizeof(self.skill_vocabulary)},
+        }
+
+    def _get_section_similarities(self, text_pairs: list[tuple[str, str]]) -> list[float]:
+        """
+        Calculates the semantic cosine similarity of many text pairs, encoding
+        every distinct non-empty text once in a single batch.
+        """
+        texts = list(dict.fromkeys(text for pair in text_pairs for text in pair if text))
+        if not texts:
+            return [0.0] * len(text_pairs)
+
+        embeddings = self.encode(texts)
+        index = {text: i for i, text in enumerate(texts)}
 
-        embedding1 = self.sbert_model.encode(text1, convert_to_tensor=True, device=self.device)
-        embedding2 = self.sbert_model.encode(text2, convert_to_tensor=True, device=self.device)
-        cosine_score = util.cos_sim(embedding1, embedding2)
-        return round(float(cosine_score[0][0]), 4)
+        similarities = []
+        for text1, text2 in text_pairs:
+            if not text1 or not text2:
+                similarities.append(0.0)
+            else:
+                cosine_score = np.dot(embeddings[index[text1]], embeddings[index[text2]])
+                similarities.append(round(float(cosine_score), 4))
+        return similarities
+
+    def _get_skill_overlap(self, job: Job, resumes: list[Resume]) -> tuple[np.ndarray, np.ndarray]:
+        """Computes the skill Jaccard index and job-skill coverage for many resumes at once."""
+        job_skill_ids = self.skill_vocabulary.ids_for_document(job.sectioned_text)
+        resume_skill_ids = [self.skill_vocabulary.ids_for_document(r.sectioned_text) for r in resumes]
+        return self.skill_vocabulary.skill_overlap(job_skill_ids, resume_skill_ids)
 
     def generate_feature_vector(self, job: Job, resume: Resume) -> dict:
         """
         Generates the multi-faceted feature vector for a given job-resume pair
         by comparing their semantic sections.
         """
-        job_sections = job.sectioned_text or {}
-        resume_sections = resume.sectioned_text or {}
+        return self.generate_feature_vectors(job, [resume])[0]
 
-        # Get the text from the most relevant sections, defaulting to empty strings
-        job_experience_text = job_sections.get("RESPONSIBILITIES", "") or job_sections.get("EXPERIENCE", "")
-        resume_experience_text = resume_sections.get("EXPERIENCE", "")
-        job_skills_text = job_sections.get("SKILLS", "")
-        resume_skills_text = resume_sections.get("SKILLS", "")
-
-        feature_vector = {
-            "overall_similarity": self._get_section_similarity(job.description, resume.extracted_text),
-            "experience_similarity": self._get_section_similarity(job_experience_text, resume_experience_text),
-            "skills_similarity": self._get_section_similarity(job_skills_text, resume_skills_text),
-            "accomplishment_score": resume_sections.get("accomplishment_score", 0),
-            "readability_score": resume_sections.get("readability_score", 0),
-        }
-        return feature_vector
+    @timed("generate_feature_vectors")
+    def generate_feature_vectors(self, job: Job, resumes: list[Resume]) -> list[dict]:
+        """
+        Generates the feature vectors of one job against many resumes, batching
+        the embedding work and the skill overlap computation.
+        """
+        if not resumes:
+            return []
+        jaccard, coverage = self._get_skill_overlap(job, resumes)
+        return self._assemble_feature_vectors([(job, resume) for resume in resumes], jaccard, coverage)
 
+    @timed("generate_job_feature_vectors")
+    def generate_job_feature_vectors(self, jobs: list[Job], resume: Resume) -> list[dict]:
+        """
+        Generates the feature vectors of many jobs against one resume, e.g. to
+        rank job recommendations, encoding every distinct text in one batch.
+        """
+        if not jobs:
+            return []
+        resume_skill_ids = [self.skill_vocabulary.ids_for_document(resume.sectioned_text)]
+        overlaps = [self.skill_vocabulary.skill_overlap(self.skill_vocabulary.ids_for_document(job.sectioned_text),
+                                                        resume_skill_ids) for job in jobs]
+        return self._assemble_feature_vectors([(job, resume) for job in jobs],
+                                              [jaccard[0] for jaccard, _ in overlaps],
+                                              [coverage[0] for _, coverage in overlaps])
+
+    def _assemble_feature_vectors(self, pairs: list[tuple[Job, Resume]], jaccard, coverage) -> list[dict]:
+        """Builds the feature vectors of (job, resume) pairs from their skill overlaps and section similarities."""
+        job_texts = {id(job): self.job_comparison_texts(job) for job, _ in pairs}
+        resume_texts = {id(resume): self.resume_comparison_texts(resume) for _, resume in pairs}
+        feature_names = list(next(iter(job_texts.values())).keys())
+        similarities = self._get_section_similarities([
+            (job_texts[id(job)][name], resume_texts[id(resume)][name])
+            for job, resume in pairs for name in feature_names
+        ])
+
+        feature_vectors = []
+        for i, (_, resume) in enumerate(pairs):
+            resume_sections = resume.sectioned_text or {}
+            pair_similarities = similarities[i * len(feature_names):(i + 1) * len(feature_names)]
+            feature_vector = dict(zip(feature_names, pair_similarities))
+            feature_vector.update({
+                "accomplishment_score": resume_sections.get("accomplishment_score", 0),
+                "readability_score": resume_sections.get("readability_score", 0),
+                "skill_jaccard": round(float(jaccard[i]), 4),
+                "skill_coverage": round(float(coverage[i]), 4),
+            })
+            feature_vectors.append(feature_vector)
+        return feature_vectors
+
+    @timed("predict_score")
     def predict_score(self, features: dict) -> float:
         """
         Predicts a final match score for a candidate.
         """
+        return self.predict_scores([features])[0]
+
+    @timed("predict_scores")
+    def predict_scores(self, feature_vectors: list[dict]) -> list[float]:
+        """
+        Predicts the final match scores of many candidates with one model call.
+        """
         if not self.model_loaded:
             self._load_latest_model()
 
-        if self.ranking_model:
-            feature_df = pd.DataFrame([features])
-            probability = self.ranking_model.predict_proba(feature_df)[:, 1]
-            return round(float(probability[0]), 4)
-        else:
-            return self._get_heuristic_score(features)
+        return score_feature_vectors(self.ranking_model, feature_vectors)
+
+    def score_resumes(self, job: Job, resumes: list[Resume], min_skill_overlap: float = 0.0,
+                      batch_size: int = 256) -> list[tuple[Resume, dict, float]]:
+        """
+        Scores many resumes against one job in batches. Resumes covering less
+        than `min_skill_overlap` of the job's skills are dropped before any
+        embedding work (0 disables the prefilter, and so does a job without
+        recognised skills, which every resume would cover 0% of).
+        Returns (resume, feature vector, score) triples in the input order.
+        """
+        if min_skill_overlap and resumes and self.skill_vocabulary.ids_for_document(job.sectioned_text):
+            # Compute skill overlap for the whole pool with one sparse matrix product.
+            _, coverage = self._get_skill_overlap(job, resumes)
+            resumes = [resume for resume, c in zip(resumes, coverage) if c >= min_skill_overlap]
+
+        scored = []
+        for start in range(0, len(resumes), batch_size):
+            batch = resumes[start:start + batch_size]
+            feature_vectors = self.generate_feature_vectors(job, batch)
+            scores = self.predict_scores(feature_vectors)
+            scored.extend(zip(batch, feature_vectors, scores))
+        return scored
 
-    def find_matches_in_pool(self, job: Job, recruiter_id: str, score_threshold: float = 0.5, limit: int = 5) -> list[Resume]:
-        """Scans the talent pool for high-scoring matches for a given job."""
+    @staticmethod
+    def pool_candidates(job: Job, recruiter_id: str) -> list[Resume]:
+        """
+        Returns the recruiter's talent-pool resumes that can be suggested for a
+        job: not near-duplicates, and not from candidates who already applied.
+        """
         # Get IDs of candidates who have already applied for this job.
         applied_candidate_ids = [app.candidate_id for app in job.applications]
 
         # Find all resumes in the pool that do not belong to an existing applicant
-        pool_resumes = Resume.query.filter(
+        return Resume.query.filter(
             Resume.source == 'talent_pool',
             Resume.uploader_id == recruiter_id,
-            Resume.candidate_id.notin_(applied_candidate_ids)
+            Resume.candidate_id.notin_(applied_candidate_ids),
+            Resume.duplicate_of_id.is_(None)
         ).all()
 
+    @timed("find_matches_in_pool")
+    def find_matches_in_pool(self, job: Job, recruiter_id: str, score_threshold: float = 0.5, limit: int = 5,
+                             min_skill_overlap: float = 0.0) -> list[Resume]:
+        """
+        Scans the talent pool for high-scoring matches for a given job.
+        Resumes covering less than `min_skill_overlap` of the job's skills are
+        dropped before any embedding work (0 disables the prefilter).
+        """
         matches = []
-        for resume in pool_resumes:
-            features = self.generate_feature_vector(job, resume)
-            score = self.predict_score(features)
-
+        pool_resumes = self.pool_candidates(job, recruiter_id)
+        for resume, _, score in self.score_resumes(job, pool_resumes, min_skill_overlap=min_skill_overlap):
             if score >= score_threshold:
                 # Add the score to the resume object temporarily for display
                 resume.score = score
@@ -0,0 +1,147 @@
+# app/services/readability.py
+"""
+In-house readability engine. Words, sentences, syllables and letters are
+counted in a single pass over the tokens the skill matcher already produced,
+and several readability indices are derived from those counts.
+
+Syllables are looked up in the CMU pronouncing dictionary, loaded once per
+process as a word -> syllable count table, with a fast vowel-group heuristic
+for words it does not know. Word and sentence boundaries follow textstat's
+rules, so the Flesch reading ease stays comparable with stored scores
+(see benchmarks/bench_readability.py).
+"""
+import re
+import math
+from functools import lru_cache
+from app.services.skill_matcher import tokenize
+
+SENTENCE_TERMINATORS = frozenset('.!?')
+# Apostrophes kept inside words, as in "don't" or "we're"; any other apostrophe is punctuation.
+CONTRACTION_ENDING = re.compile(r"(?:[tsd]|ve|ll|re)")
+VOWEL_GROUP = re.compile(r"[aeiouy]+")
+WORD_TOKEN = re.compile(r"\w")
+POLYSYLLABLE_MIN = 3
+LONG_WORD_MIN = 7
+
+_syllable_dictionary = None
+
+
+def load_syllable_dictionary() -> dict:
+    """Loads the CMU dictionary as word -> syllable count, once per process."""
+    global _syllable_dictionary
+    if _syllable_dictionary is None:
+        try:
+            import cmudict
+            _syllable_dictionary = {
+                word: sum(1 for phone in pronunciations[0] if phone[-1].isdigit())
+                for word, pronunciations in cmudict.dict().items() if pronunciations
+            }
+        except Exception as e:
+            print(f"WARNING: Could not load the CMU dictionary, estimating all syllables: {e}")
+            _syllable_dictionary = {}
+    return _syllable_dictionary
+
+
+def estimate_syllables(word: str) -> int:
+    """Estimates the syllables of a word from its vowel groups."""
+    word = word.replace("'", "")
+    count = len(VOWEL_GROUP.findall(word))
+    # Silent final "e" ("make"), but not "-le" ("table") or a lone vowel ("the").
+    if count > 1 and word.endswith('e') and not word.endswith(('le', 'ee', 'ye')):
+        count -= 1
+    return max(1, count)
+
+
+@lru_cache(maxsize=65536)
+def syllable_count(word: str) -> int:
+    """Returns the syllables of a lowercase word."""
+    count = load_syllable_dictionary().get(word)
+    return count if count is not None else estimate_syllables(word)
+
+
+@lru_cache(maxsize=65536)
+def _word_stats(word: str) -> tuple[int, int]:
+    """Returns the syllables and letters of a lowercase word."""
+    return syllable_count(word), len(word) - word.count("'")
+
+
+def cache_info() -> dict:
+    """Returns the hits, misses and sizes of the per-word caches."""
+    return {'syllable_count': syllable_count.cache_info()._asdict(), 'word_stats': _word_stats.cache_info()._asdict()}
+
+
+def analyze(text: str, tokens: list = None) -> dict:
+    """
+    Returns the word, sentence, syllable and letter counts of a text and its
+    readability indices. Pass `tokens` from `skill_matcher.tokenize(text)` to
+    reuse an existing tokenization.
+
+    Words and sentences follow textstat: whitespace separates words and
+    punctuation inside a word is dropped ("node.js" is one word), while any
+    run of terminators ends a sentence, even inside a word ("3.5").
+    """
+    tokens = tokens if tokens is not None else tokenize(text)
+
+    words = syllables = polysyllables = letters = long_words = 0
+    sentences = sentence_words = 0
+    parts, piece_has_word = [], False
+    previous_end = None
+    for i, (token, start, end) in enumerate(tokens):
+        if start != previous_end and previous_end is not None:
+            if parts:
+                word_syllables, word_letters = _word_stats(''.join(parts))
+                words += 1
+                syllables += word_syllables
+                polysyllables += word_syllables >= POLYSYLLABLE_MIN
+                letters += word_letters
+                long_words += word_letters >= LONG_WORD_MIN
+            sentence_words += piece_has_word
+            parts, piece_has_word = [], False
+        previous_end = end
+
+        if token in SENTENCE_TERMINATORS:
+            sentence_words += piece_has_word
+            piece_has_word = False
+            # Sentences of one or two words (headings, bullets, initials) are not counted.
+            sentences += sentence_words > 2
+            sentence_words = 0
+        elif len(token) > 1 or WORD_TOKEN.match(token):
+            parts.append(token)
+            piece_has_word = True
+        elif token == "'" and i + 1 < len(tokens) and tokens[i + 1][1] == end \
+                and CONTRACTION_ENDING.match(tokens[i + 1][0]):
+            parts.append(token)
+    if parts:
+        word_syllables, word_letters = _word_stats(''.join(parts))
+        words += 1
+        syllables += word_syllables
+        polysyllables += word_syllables >= POLYSYLLABLE_MIN
+        letters += word_letters
+        long_words += word_letters >= LONG_WORD_MIN
+    sentence_words += piece_has_word
+    sentences += sentence_words > 2
+    sentences = max(1, sentences) if words else 0
+
+    counts = {"words": words, "sentences": sentences, "syllables": syllables, "polysyllables": polysyllables,
+              "letters": letters, "long_words": long_words}
+    return {**counts, **readability_indices(**counts)}
+
+
+def readability_indices(words: int, sentences: int, syllables: int, polysyllables: int,
+                        letters: int, long_words: int) -> dict:
+    """Computes the readability indices from the counts of a text."""
+    if not words or not sentences:
+        return {"flesch_reading_ease": 0.0, "flesch_kincaid_grade": 0.0, "smog_index": 0.0,
+                "coleman_liau_index": 0.0, "automated_readability_index": 0.0, "lix": 0.0}
+
+    words_per_sentence = words / sentences
+    syllables_per_word = syllables / words
+    return {
+        "flesch_reading_ease": round(206.835 - 1.015 * words_per_sentence - 84.6 * syllables_per_word, 2),
+        "flesch_kincaid_grade": round(0.39 * words_per_sentence + 11.8 * syllables_per_word - 15.59, 2),
+        # SMOG is only defined for texts of three or more sentences.
+        "smog_index": round(1.043 * math.sqrt(polysyllables * 30 / sentences) + 3.1291, 2) if sentences >= 3 else 0.0,
+        "coleman_liau_index": round(0.0588 * letters / words * 100 - 0.296 * sentences / words * 100 - 15.8, 2),
+        "automated_readability_index": round(4.71 * letters / words + 0.5 * words_per_sentence - 21.43, 2),
+        "lix": round(words_per_sentence + 100 * long_words / words, 2),
+    }
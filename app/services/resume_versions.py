@@ -0,0 +1,153 @@
+# app/services/resume_versions.py
+"""
+Versioning of candidate resumes. Every application upload whose text changed
+becomes a new Resume version linked to the previous one, so earlier
+applications keep the version they were scored on, and an unchanged re-upload
+reuses the latest version without any processing.
+
+A new version is analysed incrementally from the previous one: the sectionizer
+hashes every section block, only the blocks whose hash changed are matched
+again, and the stored embeddings of unchanged section texts are carried over
+instead of being encoded again.
+
+In deferred scoring, a version is stored empty when the file is uploaded and
+analysed later. Such placeholders are never used as the previous version, and
+one is removed when its failed application is replaced. Version numbers are
+unique per candidate; an upload whose number was taken by a concurrent upload
+is renumbered.
+"""
+import uuid
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models import Resume
+from app.services.ranking_service import RankingService
+from app.services.embedding_store import (get_document_embeddings, carry_over_embeddings, cache_stored_embeddings,
+                                         text_digest)
+from app.services.near_duplicates import candidate_scope, process_with_reuse, index_resume
+from app.services.partitioned_scoring import EMBEDDING_SECTIONS
+
+# Attempts to store a new version before giving up on concurrent uploads of the same candidate.
+VERSION_INSERT_ATTEMPTS = 3
+
+
+def latest_version(candidate_id: str) -> Resume | None:
+    """Returns the candidate's most recent resume version with a text, skipping pending placeholders."""
+    return Resume.query.filter(Resume.candidate_id == candidate_id, Resume.extracted_text.isnot(None)) \
+        .order_by(Resume.version.desc()).first()
+
+
+def next_version_number(candidate_id: str) -> int:
+    """Returns the number after the candidate's highest version, placeholders included."""
+    with db.session.no_autoflush:
+        highest = db.session.query(func.max(Resume.version)).filter(Resume.candidate_id == candidate_id).scalar()
+    return (highest or 0) + 1
+
+
+def content_hash(resume: Resume) -> str | None:
+    """Returns the hash of a resume's text, computing it for versions stored before hashes were."""
+    if resume.content_hash is None and resume.extracted_text:
+        resume.content_hash = text_digest(resume.extracted_text)
+    return resume.content_hash
+
+
+def new_version(candidate_id: str, filename: str, stored_filename: str, previous: Resume = None) -> Resume:
+    """Adds an empty resume version following `previous`, the candidate's latest version."""
+    resume = Resume(
+        id=str(uuid.uuid4()), candidate_id=candidate_id,
+        original_filename=filename, stored_filename=stored_filename,
+        version=next_version_number(candidate_id),
+        previous_version_id=previous.id if previous else None
+    )
+    db.session.add(resume)
+    return resume
+
+
+def embedding_texts(resume: Resume) -> dict:
+    """Returns the non-empty texts of a resume that are embedded for ranking, by DocumentEmbedding section."""
+    texts = RankingService.resume_comparison_texts(resume)
+    return {EMBEDDING_SECTIONS[feature]: text for feature, text in texts.items() if text}
+
+
+def analyse_version(resume: Resume, text: str, previous: Resume = None):
+    """
+    Analyses the text of a new version, reusing the section results and the
+    stored embeddings of the previous version for the sections that did not
+    change. Returns the MinHash signature to store with store_version().
+
+    Nothing is written here. On SQLite the first flush takes the database write
+    lock until the request commits, so it must not happen on the inference pool,
+    where a request holding the lock would wait for a worker behind requests
+    waiting for the lock.
+    """
+    with db.session.no_autoflush:
+        resume.extracted_text = text
+        resume.content_hash = text_digest(text)
+        resume.sectioned_text, _, signature = process_with_reuse(text, candidate_scope(resume.candidate_id),
+                                                                 base=previous)
+        texts = embedding_texts(resume)
+        carried = carry_over_embeddings('resume', previous.id, resume.id, texts) if previous is not None else set()
+        for section, section_text in texts.items():
+            if section not in carried:
+                get_document_embeddings('resume', [(resume.id, section_text)], section=section)
+    return signature
+
+
+def flush_new_version(resume: Resume):
+    """
+    Flushes the session with a new version in it. If a concurrent upload of the
+    same candidate took its version number, the transaction is rolled back and
+    the session's pending changes are applied again under the next free number.
+    """
+    for attempt in range(VERSION_INSERT_ATTEMPTS):
+        new, deleted = list(db.session.new), list(db.session.deleted)
+        try:
+            db.session.flush()
+            return
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == VERSION_INSERT_ATTEMPTS - 1:
+                raise
+            print(f"INFO: Version {resume.version} of candidate {resume.candidate_id}'s resume was taken "
+                  f"by a concurrent upload; renumbering.")
+            db.session.add_all(new)
+            for obj in deleted:
+                db.session.delete(obj)
+            resume.version = next_version_number(resume.candidate_id)
+
+
+def store_version(resume: Resume, signature):
+    """Flushes an analysed version and indexes it for near-duplicate lookups."""
+    if resume in db.session.new:
+        flush_new_version(resume)
+    else:
+        db.session.flush()
+    index_resume(resume, candidate_scope(resume.candidate_id), signature)
+
+
+def discard_placeholder(resume: Resume, replacement: Resume = None):
+    """
+    Deletes an empty placeholder version, linking versions that follow it to
+    `replacement` (by default the version it followed).
+    """
+    if replacement is None:
+        replacement = resume.previous_version
+    Resume.query.filter_by(previous_version_id=resume.id) \
+        .update({'previous_version_id': replacement.id if replacement else None})
+    db.session.delete(resume)
+
+
+def record_upload(candidate_id: str, filename: str, stored_filename: str, text: str) -> tuple[Resume, object]:
+    """
+    Returns the resume version for an uploaded resume text and its signature:
+    the latest version and None when the text is unchanged, otherwise a new,
+    analysed version to store with store_version(). Nothing is written.
+    """
+    with db.session.no_autoflush:
+        previous = latest_version(candidate_id)
+        if previous is not None and content_hash(previous) == text_digest(text):
+            cache_stored_embeddings('resume', previous.id)
+            return previous, None
+
+        resume = new_version(candidate_id, filename, stored_filename, previous)
+        return resume, analyse_version(resume, text, previous)
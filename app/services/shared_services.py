@@ -2,10 +2,18 @@
 """
 This module initializes and provides shared, singleton instances of the application's core services.
 """
+from config import Config
 from app.services.nlp_service import NLPService
 from app.services.ranking_service import RankingService
 
 #Create single, shared instances of the services for the entire app
 nlp_service = NLPService()
-ranking_service = RankingService()
+ranking_service = RankingService(
+    model_name=Config.ENCODER_MODEL_NAME,
+    encoder_backend=Config.ENCODER_BACKEND,
+    encoder_model_dir=Config.ENCODER_MODEL_DIR,
+    intra_op_threads=Config.ENCODER_INTRA_OP_THREADS,
+    skill_vocabulary=nlp_service.skill_vocabulary,
+    embedding_cache_size=Config.EMBEDDING_CACHE_SIZE,
+)
 
@@ -0,0 +1,126 @@
+# app/services/skill_matcher.py
+"""
+A precompiled Aho-Corasick automaton over normalized skill tokens. It finds
+every skill of the vocabulary in a single linear pass over the text, without
+a spaCy tokenization pass, and reports each match with its skill ID, category
+and character offsets. The compiled automaton is pickled next to skills.json
+and rebuilt automatically when skills.json changes.
+"""
+import os
+import re
+import pickle
+import hashlib
+from collections import deque, namedtuple
+from app.services.skill_vocabulary import SkillVocabulary, SKILLS_PATH
+
+AUTOMATON_VERSION = 1
+
+# Runs of letters/digits are one token, any other non-space character is a
+# token of its own, so "node.js" -> node . js and "c++" -> c + +.
+TOKEN_PATTERN = re.compile(r"[^\W_]+|\S")
+
+SkillMatch = namedtuple('SkillMatch', ['skill_id', 'category', 'start', 'end'])
+
+
+def tokenize(text: str) -> list:
+    """Returns the (normalized token, start, end) triples of a text."""
+    return [(m.group().lower(), m.start(), m.end()) for m in TOKEN_PATTERN.finditer(text)]
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton whose alphabet is the set of tokens used by skills."""
+
+    def __init__(self, vocabulary: SkillVocabulary):
+        self.categories = list(vocabulary.categories)
+        self.token_ids = {}     # token -> symbol ID
+        self.goto = [{}]        # state -> {symbol ID: next state}
+        self.outputs = [()]     # state -> ((skill ID, length in tokens), ...)
+
+        for skill_id, skill in enumerate(vocabulary.skills):
+            tokens = [token for token, _, _ in tokenize(skill)]
+            if not tokens:
+                continue
+            state = 0
+            for token in tokens:
+                symbol = self.token_ids.setdefault(token, len(self.token_ids))
+                next_state = self.goto[state].get(symbol)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][symbol] = next_state
+                    self.goto.append({})
+                    self.outputs.append(())
+                state = next_state
+            self.outputs[state] += ((skill_id, len(tokens)),)
+
+        self.fail = self._build_failure_links()
+
+    def _build_failure_links(self) -> list:
+        """Computes failure links breadth-first and merges the outputs along them."""
+        fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, next_state in self.goto[state].items():
+                queue.append(next_state)
+                if state:
+                    fallback = fail[state]
+                    while fallback and symbol not in self.goto[fallback]:
+                        fallback = fail[fallback]
+                    fail[next_state] = self.goto[fallback].get(symbol, 0)
+                self.outputs[next_state] += self.outputs[fail[next_state]]
+        return fail
+
+    def find(self, text: str, tokens: list = None) -> list[SkillMatch]:
+        """
+        Returns every skill occurrence in the text, in order of its end offset.
+        Pass `tokens` from `tokenize(text)` to reuse an existing tokenization.
+        """
+        if not text:
+            return []
+        tokens = tokens if tokens is not None else tokenize(text)
+        goto, fail, outputs, token_ids = self.goto, self.fail, self.outputs, self.token_ids
+
+        matches = []
+        state = 0
+        for index, (token, _, end) in enumerate(tokens):
+            symbol = token_ids.get(token)
+            if symbol is None:
+                state = 0
+                continue
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            for skill_id, length in outputs[state]:
+                start = tokens[index - length + 1][1]
+                matches.append(SkillMatch(skill_id, self.categories[skill_id], start, end))
+        return matches
+
+    @classmethod
+    def load_or_build(cls, vocabulary: SkillVocabulary, skills_path: str = SKILLS_PATH) -> "SkillMatcher":
+        """
+        Loads the pickled automaton next to skills.json if it was built from the
+        current skills.json, otherwise builds it and writes the pickle.
+        """
+        cache_path = os.path.splitext(skills_path)[0] + '.automaton.pkl'
+        try:
+            with open(skills_path, 'rb') as f:
+                source_hash = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return cls(vocabulary)
+
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('version') == AUTOMATON_VERSION and cached.get('source_hash') == source_hash:
+                return cached['matcher']
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+            pass
+
+        matcher = cls(vocabulary)
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump({'version': AUTOMATON_VERSION, 'source_hash': source_hash, 'matcher': matcher}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"WARNING: Could not write skill automaton cache {cache_path}: {e}")
+        return matcher
@@ -0,0 +1,109 @@
+# app/services/skill_vocabulary.py
+"""
+The skill vocabulary built from skills.json. Every skill gets an integer ID so
+documents can store their skills as sparse ID lists, and skill overlap between
+a job and a whole pool of resumes can be computed with a single sparse matrix
+product.
+
+IDs are positions in skills.json, so they change when the file is edited.
+Documents therefore store the vocabulary's digest next to their IDs, and IDs
+stored under another digest are ignored in favour of the skill names.
+"""
+import os
+import json
+import hashlib
+import numpy as np
+from scipy import sparse
+
+SKILLS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'skills.json'))
+
+
+class SkillVocabulary:
+    """Maps skills to integer IDs and their skills.json category."""
+
+    def __init__(self, skills_data: dict):
+        self.skills = []        # ID -> skill name (lower-case)
+        self.categories = []    # ID -> category name
+        self.skill_to_id = {}
+
+        for category, skills in skills_data.items():
+            for skill in skills:
+                name = skill.strip().lower()
+                if not name or name in self.skill_to_id:
+                    continue
+                self.skill_to_id[name] = len(self.skills)
+                self.skills.append(name)
+                self.categories.append(category)
+
+        # Identifies the ID -> skill mapping that stored skill IDs refer to.
+        self.digest = hashlib.sha1(json.dumps([self.skills, self.categories]).encode('utf-8')).hexdigest()[:16]
+
+        # Per-skill weights used for coverage. Uniform for now, kept as an
+        # array so that skill importance can be tuned without code changes.
+        self.weights = np.ones(len(self.skills), dtype=np.float32)
+
+    @classmethod
+    def from_json(cls, path: str = SKILLS_PATH) -> "SkillVocabulary":
+        """Loads the vocabulary from skills.json. Returns an empty vocabulary on error."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            print(f"FATAL: skills.json not found at {path}. No skills will be matched.")
+        except json.JSONDecodeError:
+            print(f"FATAL: Could not decode skills.json. Please check syntax.")
+        return cls({})
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def ids_for(self, skills) -> list[int]:
+        """Returns the sorted skill IDs for a list of skill names or a comma-joined string."""
+        if isinstance(skills, str):
+            skills = skills.split(',')
+        ids = {self.skill_to_id.get(s.strip().lower()) for s in skills or []}
+        ids.discard(None)
+        return sorted(ids)
+
+    def ids_for_document(self, sectioned: dict) -> list[int]:
+        """
+        Returns the skill IDs of a processed document. Documents processed before
+        skill IDs were stored, or with another version of skills.json, fall back
+        to their comma-joined 'skills' string.
+        """
+        if not sectioned:
+            return []
+        if sectioned.get('skill_ids') is not None and sectioned.get('skill_vocabulary') == self.digest:
+            return sectioned['skill_ids']
+        return self.ids_for(sectioned.get('skills', ''))
+
+    def to_matrix(self, id_lists: list[list[int]]) -> sparse.csr_matrix:
+        """Builds a binary (documents x skills) CSR matrix from skill ID lists."""
+        indptr = np.zeros(len(id_lists) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(ids) for ids in id_lists])
+        indices = np.fromiter((i for ids in id_lists for i in ids), dtype=np.int32, count=int(indptr[-1]))
+        data = np.ones(len(indices), dtype=np.float32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(id_lists), len(self.skills)))
+
+    def skill_overlap(self, job_ids: list[int], resume_id_lists: list[list[int]]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes skill overlap between one job and many resumes at once.
+        Returns two arrays aligned with `resume_id_lists`:
+        the Jaccard index of the skill sets, and the weighted share of the
+        job's skills that each resume covers.
+        """
+        count = len(resume_id_lists)
+        if not job_ids or not count:
+            return np.zeros(count, dtype=np.float32), np.zeros(count, dtype=np.float32)
+
+        resume_matrix = self.to_matrix(resume_id_lists)
+        job_vector = np.zeros(len(self.skills), dtype=np.float32)
+        job_vector[job_ids] = 1.0
+
+        intersection = resume_matrix @ job_vector
+        resume_sizes = np.asarray(resume_matrix.sum(axis=1)).ravel()
+        union = resume_sizes + len(job_ids) - intersection
+        jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+        coverage = (resume_matrix @ (job_vector * self.weights)) / self.weights[job_ids].sum()
+        return jaccard.astype(np.float32), coverage.astype(np.float32)
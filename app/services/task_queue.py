@@ -0,0 +1,63 @@
+# app/services/task_queue.py
+"""
+A small in-process background task queue. Tasks run on daemon worker threads
+inside their own application context, so they can use the database session
+like a request would. It is used to take slow scoring work off the request path.
+"""
+import queue
+import threading
+import traceback
+
+
+class BackgroundTaskQueue:
+    """Runs submitted callables on a fixed number of background worker threads."""
+
+    def __init__(self):
+        self.app = None
+        self.num_workers = 1
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Binds the queue to the application; workers start on the first submitted task."""
+        self.app = app
+        self.num_workers = max(1, app.config.get('BACKGROUND_WORKERS', 1))
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(self.num_workers - len(self._threads)):
+                thread = threading.Thread(target=self._run, name=f"background-task-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, func, *args, **kwargs):
+        """Queues `func(*args, **kwargs)` to run in the background."""
+        if self.app is None:
+            raise RuntimeError("BackgroundTaskQueue.init_app() must be called before submitting tasks.")
+        self._ensure_workers()
+        self._queue.put((func, args, kwargs))
+
+    def pending(self) -> int:
+        """Returns the approximate number of tasks waiting to run."""
+        return self._queue.qsize()
+
+    def join(self):
+        """Blocks until every queued task has finished."""
+        self._queue.join()
+
+    def _run(self):
+        from app.extensions import db
+
+        while True:
+            func, args, kwargs = self._queue.get()
+            try:
+                with self.app.app_context():
+                    try:
+                        func(*args, **kwargs)
+                    except Exception:
+                        db.session.rollback()
+                        print(f"ERROR: Background task {func.__name__} failed:\n{traceback.format_exc()}")
+            finally:
+                self._queue.task_done()
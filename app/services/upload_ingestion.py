@@ -0,0 +1,141 @@
+# app/services/upload_ingestion.py
+"""
+Streaming ingestion of multi-file talent-pool uploads.
+
+receive_uploads() parses the multipart request body itself, one chunk at a time,
+so every file goes straight to the upload folder while its SHA-256 is computed,
+instead of being spooled by werkzeug first. A file over MAX_UPLOAD_FILE_SIZE is
+dropped as soon as it crosses the limit; the request as a whole is capped by
+Flask's MAX_CONTENT_LENGTH (413).
+
+ResumeBatchWriter inserts the analysed resumes, with their MinHash signatures
+and LSH buckets, through multi-row INSERT statements committed every
+UPLOAD_INSERT_BATCH_SIZE resumes. No ORM objects pile up in the session, and a
+failed chunk does not lose the chunks committed before it.
+"""
+import os
+import uuid
+import hashlib
+from collections import namedtuple
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.utils import secure_filename
+from werkzeug.exceptions import BadRequest
+from werkzeug.sansio.multipart import MultipartDecoder, Data, Epilogue, Field, File, NeedData
+from app.extensions import db
+from app.models import Resume, ResumeSignature, ResumeLshBucket
+from app.services.near_duplicates import PendingIndex, PendingResume, index_rows
+
+SavedUpload = namedtuple('SavedUpload', ['filename', 'path', 'size', 'sha256'])
+
+
+def receive_uploads(request, field_name: str, directory: str) -> tuple[list[SavedUpload], list[tuple[str, str]]]:
+    """
+    Streams the files of a multipart field to `directory`. Returns the saved
+    uploads in request order and the (filename, reason) pairs of rejected ones.
+    Files are stored as '<SHA-256 prefix>-<secure filename>', so two different
+    files with the same name do not overwrite each other.
+    Must be called before anything reads request.form or request.files.
+    """
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        raise BadRequest("Expected a multipart/form-data upload.")
+    chunk_size = current_app.config['UPLOAD_CHUNK_SIZE']
+    max_file_size = current_app.config['MAX_UPLOAD_FILE_SIZE']
+
+    decoder = MultipartDecoder(boundary.encode('latin-1'), max_form_memory_size=request.max_form_memory_size,
+                               max_parts=request.max_form_parts)
+    saved, rejected = [], []
+    output = partial_path = filename = digest = None
+    size = 0
+    try:
+        while True:
+            data = request.stream.read(chunk_size)
+            decoder.receive_data(data or None)
+            event = decoder.next_event()
+            while not isinstance(event, (Epilogue, NeedData)):
+                if isinstance(event, File) and event.name == field_name and secure_filename(event.filename or ''):
+                    filename, size, digest = secure_filename(event.filename), 0, hashlib.sha256()
+                    partial_path = os.path.join(directory, f".upload-{uuid.uuid4().hex}.part")
+                    output = open(partial_path, 'wb')
+                elif isinstance(event, (File, Field)):
+                    output = None  # Other form fields and empty file inputs are ignored
+                elif isinstance(event, Data) and output is not None:
+                    size += len(event.data)
+                    if size > max_file_size:
+                        output.close()
+                        os.remove(partial_path)
+                        output = None
+                        rejected.append((filename, f"larger than {max_file_size / (1024 * 1024):.3g} MB"))
+                    else:
+                        digest.update(event.data)
+                        output.write(event.data)
+                        if not event.more_data:
+                            output.close()
+                            output = None
+                            sha256 = digest.hexdigest()
+                            path = os.path.join(directory, f"{sha256[:16]}-{filename}")
+                            os.replace(partial_path, path)
+                            saved.append(SavedUpload(filename, path, size, sha256))
+                event = decoder.next_event()
+            if not data or isinstance(event, Epilogue):
+                break
+    except ValueError as e:
+        # Raised by the decoder for a truncated or malformed body
+        raise BadRequest(f"Malformed upload: {e}")
+    finally:
+        if output is not None:
+            output.close()
+            os.remove(partial_path)
+    return saved, rejected
+
+
+class ResumeBatchWriter:
+    """Collects analysed talent-pool resumes and inserts them in committed chunks."""
+
+    def __init__(self, scope: str, batch_size: int):
+        self.scope = scope
+        self.batch_size = batch_size
+        # Resumes of the current chunk, for near-duplicate lookups before they are inserted
+        self.pending = PendingIndex()
+        self.indexed_ids = []   # Committed resumes that are not near-duplicates
+        self.added = 0
+        self.duplicates = 0
+        self.failed = 0
+        self._resume_rows, self._signature_rows, self._bucket_rows, self._chunk_indexed_ids = [], [], [], []
+
+    def add(self, values: dict, signature, duplicate) -> str:
+        """Queues a resume row (and its index rows unless it is a near-duplicate). Returns its ID."""
+        resume_id = str(uuid.uuid4())
+        self._resume_rows.append(dict(values, id=resume_id, duplicate_of_id=duplicate.id if duplicate else None))
+        if duplicate is None:
+            signature_row, bucket_rows = index_rows(resume_id, self.scope, signature)
+            self._signature_rows.append(signature_row)
+            self._bucket_rows.extend(bucket_rows)
+            self._chunk_indexed_ids.append(resume_id)
+            self.pending.add(PendingResume(resume_id, values['extracted_text'], values['sectioned_text']), signature)
+        if len(self._resume_rows) >= self.batch_size:
+            self.flush()
+        return resume_id
+
+    def flush(self):
+        """Inserts and commits the queued rows with one multi-row INSERT per table."""
+        if not self._resume_rows:
+            return
+        try:
+            db.session.execute(insert(Resume).values(self._resume_rows))
+            if self._signature_rows:
+                db.session.execute(insert(ResumeSignature).values(self._signature_rows))
+                db.session.execute(insert(ResumeLshBucket).values(self._bucket_rows))
+            db.session.commit()
+            self.added += len(self._resume_rows)
+            self.duplicates += len(self._resume_rows) - len(self._signature_rows)
+            self.indexed_ids.extend(self._chunk_indexed_ids)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            self.failed += len(self._resume_rows)
+            print(f"ERROR: Could not insert a chunk of {len(self._resume_rows)} talent-pool resumes. Reason: {e}")
+        finally:
+            self._resume_rows, self._signature_rows, self._bucket_rows, self._chunk_indexed_ids = [], [], [], []
+            self.pending.clear()
@@ -0,0 +1,89 @@
+# app/utils/db_profile.py
+"""
+Database engine profile, applied by the application factory:
+
+  - SQLite connections are opened in WAL mode with the SQLITE_PRAGMAS settings,
+    so readers keep working while a talent-pool upload holds the write lock.
+  - Server databases such as PostgreSQL get a sized QueuePool whose connections
+    are pinged before use and recycled periodically.
+  - When DATABASE_REPLICA_URL is set, the SELECTs of read-heavy code wrapped in
+    `replica_reads()` are sent to the read replica. Writes, and anything outside
+    such a block, always use the primary database.
+"""
+import contextvars
+from functools import partial
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+class RoutingSession(Session):
+    """A session that reads from the replica bind inside `replica_reads()` blocks."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _replica_reads.get() and not self._flushing and getattr(clause, 'is_select', False):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def replica_reads():
+    """Sends the queries of the block to the read replica, if one is configured."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def engine_options(url: str, config) -> dict:
+    """Returns the connection pool options for a database URL (none for SQLite, which SQLAlchemy sizes itself)."""
+    if make_url(url).get_backend_name() == 'sqlite':
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True,
+    }
+
+
+def init_app(app):
+    """Sets the engine options and the replica bind. Must run before db.init_app(app)."""
+    config = app.config
+    options = engine_options(config['SQLALCHEMY_DATABASE_URI'], config)
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    replica_url = config.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds.setdefault(REPLICA_BIND, {'url': replica_url, **engine_options(replica_url, config)})
+        config['SQLALCHEMY_BINDS'] = binds
+        print(f"INFO: Routing heavy reads to the read replica at {make_url(replica_url).host or replica_url}.")
+
+
+def _set_sqlite_pragmas(pragmas: dict, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def init_engines(app, db):
+    """Applies SQLITE_PRAGMAS to every new connection of the app's SQLite engines. Runs after db.init_app(app)."""
+    pragmas = app.config.get('SQLITE_PRAGMAS') or {}
+    if not pragmas:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', partial(_set_sqlite_pragmas, pragmas))
@@ -6,6 +6,7 @@ such as text cleaning and content extraction from files.
 import re
 import docx
 from PyPDF2 import PdfReader
+from app.utils.timing import timed
 
 def preprocess_text(text: str) -> str:
     """Cleans raw text for database storage or NLP processing.
@@ -16,6 +17,7 @@ def preprocess_text(text: str) -> str:
     text = re.sub(r'\s+', ' ', text).strip()
     return text
 
+@timed("extract_text")
 def extract_text_from_file(file_path: str, filename: str) -> str:
     """Extracts raw text from an uploaded file (PDF or DOCX).
     """
@@ -0,0 +1,186 @@
+# app/utils/profiling.py
+"""
+On-demand profiling of a live worker process, without a restart and without
+any cost while no profile is running.
+
+  - sample_stacks() polls the Python stacks of every thread at a fixed interval
+    for a bounded time and counts them as collapsed stacks, the text format read
+    by flamegraph.pl, speedscope and inferno ("thread;outer;...;inner count").
+  - allocation_diff() compares two tracemalloc snapshots taken a few seconds
+    apart and returns the top allocation sites by growth. Tracing is switched on
+    only for that window unless it was already on (e.g. PYTHONTRACEMALLOC=1).
+  - deep_sizeof() and rss_bytes() estimate the memory held by objects and by the
+    whole process, for the per-service report.
+
+Only one stack or allocation profile runs at a time in a process.
+"""
+import gc
+import os
+import sys
+import time
+import resource
+import sysconfig
+import threading
+import tracemalloc
+from collections import Counter
+
+import numpy as np
+
+# Held while a profile runs; a second request is refused instead of queued.
+profile_lock = threading.Lock()
+
+# Standard library frames that only mean a thread is waiting for work.
+STDLIB_DIR = sysconfig.get_paths()['stdlib']
+IDLE_FUNCTIONS = {'wait', '_wait_for_tstate_lock', 'select', 'poll', 'accept', 'get', 'readinto', 'recv_into'}
+
+ALLOCATION_GROUPINGS = ('filename', 'lineno', 'traceback')
+
+# Shared definitions that deep_sizeof() does not charge to the object referencing them.
+NOT_FOLLOWED = (type, type(sys), type(len), type(lambda: None))
+
+_frame_labels = {}
+
+
+def _frame_label(code) -> str:
+    """Returns 'qualified name (path:first line)' for a code object, the path relative to its sys.path entry."""
+    label = _frame_labels.get(code)
+    if label is None:
+        path = code.co_filename
+        roots = [root for root in sys.path if root and path.startswith(root + os.sep)]
+        if roots:
+            path = os.path.relpath(path, max(roots, key=len))
+        label = f"{code.co_qualname} ({path}:{code.co_firstlineno})".replace(';', ':')
+        _frame_labels[code] = label
+    return label
+
+
+def _is_idle(frame) -> bool:
+    """True when the innermost frame of a stack is a standard library wait."""
+    code = frame.f_code
+    return code.co_name in IDLE_FUNCTIONS and code.co_filename.startswith(STDLIB_DIR)
+
+
+def sample_stacks(seconds: float, interval: float, include_idle: bool = False) -> tuple[Counter, int]:
+    """
+    Samples the stacks of every other thread every `interval` seconds for
+    `seconds`. Returns the collapsed stacks with their sample counts, and the
+    number of sampling rounds. Idle threads are left out unless `include_idle`.
+    """
+    own_thread = threading.get_ident()
+    stacks = Counter()
+    rounds = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread or (not include_idle and _is_idle(frame)):
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, str(thread_id)))
+            stacks[';'.join(reversed(labels))] += 1
+        rounds += 1
+        time.sleep(interval)
+    return stacks, rounds
+
+
+def render_collapsed(stacks: Counter) -> str:
+    """Renders collapsed stacks one per line, most sampled first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def allocation_diff(seconds: float, top: int, group_by: str = 'lineno', frames: int = 10) -> dict:
+    """
+    Returns the `top` allocation sites that grew the most during a window of
+    `seconds`, with the memory traced so far. `frames` is the traceback depth
+    recorded when tracing has to be started for the window.
+    """
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(frames)
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+               tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+               tracemalloc.Filter(False, '<unknown>')]
+    try:
+        before = tracemalloc.take_snapshot().filter_traces(filters)
+        time.sleep(seconds)
+        after = tracemalloc.take_snapshot().filter_traces(filters)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+
+    report = {
+        'seconds': seconds,
+        'group_by': group_by,
+        'traced_before_window': not started_here,
+        'traced_bytes': current,
+        'traced_peak_bytes': peak,
+        'growth': [{
+            'location': _allocation_location(stat.traceback),
+            'size_diff': stat.size_diff, 'count_diff': stat.count_diff,
+            'size': stat.size, 'count': stat.count,
+        } for stat in after.compare_to(before, group_by)[:top]],
+    }
+    if not started_here:
+        # Tracing predates the window, so the snapshot also shows what is held overall.
+        report['largest'] = [{'location': _allocation_location(stat.traceback), 'size': stat.size,
+                              'count': stat.count} for stat in after.statistics(group_by)[:top]]
+    return report
+
+
+def _allocation_location(traceback) -> str:
+    """Formats an allocation traceback, innermost frame last."""
+    return " <- ".join(f"{frame.filename}:{frame.lineno}" for frame in traceback)
+
+
+def deep_sizeof(obj, limit: int = 5_000_000) -> int:
+    """
+    Estimates the bytes held by an object and everything it references through
+    containers and instance attributes, counting shared objects once. Classes,
+    modules and functions are not followed. Stops after `limit` objects.
+    """
+    seen = set()
+    pending = [obj]
+    total = 0
+    while pending and len(seen) < limit:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, NOT_FOLLOWED):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, np.ndarray):
+            # getsizeof includes the data of an array that owns it; a view is charged to its base.
+            if current.base is not None:
+                pending.append(current.base)
+        elif isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            pending.extend(current)
+        elif not isinstance(current, (str, bytes, bytearray, int, float, complex, bool)):
+            if hasattr(current, '__dict__'):
+                pending.append(vars(current))
+            for slot in getattr(type(current), '__slots__', ()):
+                if hasattr(current, slot):
+                    pending.append(getattr(current, slot))
+    return total
+
+
+def live_objects(classes: tuple) -> list:
+    """Returns the objects tracked by the garbage collector that are instances of `classes`."""
+    return [obj for obj in gc.get_objects() if isinstance(obj, classes)]
+
+
+def rss_bytes() -> tuple[int | None, int]:
+    """Returns the current (None where /proc is unavailable) and peak resident set size of the process."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB on Linux.
+    peak = peak if sys.platform == 'darwin' else peak * 1024
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE'), peak
+    except (OSError, ValueError, IndexError):
+        return None, peak
@@ -0,0 +1,78 @@
+# app/utils/schema.py
+"""
+Additive schema upgrades for existing databases.
+
+db.create_all() creates missing tables but never alters a table that already
+exists, so a column or index added to the model of an existing table is listed
+in ADDED_COLUMNS or ADDED_INDEXES. upgrade_schema() runs right after
+create_all() when the app starts and adds every listed column the database does
+not have yet, with its default filled in for the existing rows, then every
+listed index.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError, IntegrityError
+
+# (table, column, SQL column definition). A NOT NULL column needs a DEFAULT,
+# which both SQLite and PostgreSQL apply to the existing rows.
+ADDED_COLUMNS = [
+    ('application', 'scoring_status', "VARCHAR(20) NOT NULL DEFAULT 'scored'"),
+    ('resume', 'stored_filename', "VARCHAR(255)"),
+    ('job', 'pool_matched_at', "TIMESTAMP"),
+    ('job', 'pool_scoring_version', "VARCHAR(120)"),
+    ('job_pool_match', 'scoring_version', "VARCHAR(120)"),
+    ('resume', 'duplicate_of_id', "VARCHAR(36) REFERENCES resume(id)"),
+    ('resume', 'version', "INTEGER NOT NULL DEFAULT 1"),
+    ('resume', 'previous_version_id', "VARCHAR(36) REFERENCES resume(id)"),
+    ('resume', 'content_hash', "VARCHAR(40)"),
+]
+
+
+# (table, index name, columns, unique)
+ADDED_INDEXES = [
+    ('resume', 'uq_resume_candidate_version', ('candidate_id', 'version'), True),
+]
+
+
+def upgrade_schema(engine) -> list[str]:
+    """
+    Adds the missing ADDED_COLUMNS and ADDED_INDEXES to the database. Returns
+    the 'table.column' and index names added.
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    columns = {}
+    added = []
+    for table, column, definition in ADDED_COLUMNS:
+        if table not in tables:
+            continue  # Created by create_all() with every column
+        if table not in columns:
+            columns[table] = {c['name'] for c in inspector.get_columns(table)}
+        if column in columns[table]:
+            continue
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {definition}'))
+        except (OperationalError, ProgrammingError) as e:
+            # Another worker process starting at the same time may have added it first.
+            if column not in {c['name'] for c in inspect(engine).get_columns(table)}:
+                raise
+            print(f"INFO: Column {table}.{column} was added by another process ({e.orig}).")
+            continue
+        columns[table].add(column)
+        added.append(f"{table}.{column}")
+
+    for table, name, index_columns, unique in ADDED_INDEXES:
+        if table not in tables or name in {index['name'] for index in inspector.get_indexes(table)}:
+            continue
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS {name} '
+                                        f'ON "{table}" ({", ".join(index_columns)})'))
+        except (OperationalError, ProgrammingError, IntegrityError) as e:
+            # E.g. rows that already break the uniqueness; the app still starts without the index.
+            print(f"ERROR: Could not create index {name} on {table}: {e.orig}")
+            continue
+        added.append(name)
+    if added:
+        print(f"INFO: Added database columns and indexes: {', '.join(added)}.")
+    return added
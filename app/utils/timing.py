@@ -0,0 +1,158 @@
+# app/utils/timing.py
+"""
+This module provides lightweight timing instrumentation for the hot paths of
+the application. Named spans are aggregated per request (logged, and returned
+in a Server-Timing header when SERVER_TIMING_HEADER is set) and into
+process-wide histograms that are exposed in the Prometheus text format.
+"""
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from flask import g, request, has_request_context, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Histogram bucket upper bounds in seconds.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """A cumulative histogram with a fixed set of buckets."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe collection of histograms keyed by metric name and a single label."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, metric: str, label_name: str, label_value: str, seconds: float):
+        key = (metric, label_name, label_value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def render_prometheus(self) -> str:
+        """Renders every histogram in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            current_metric = None
+            for (metric, label_name, label_value), histogram in sorted(self._histograms.items()):
+                if metric != current_metric:
+                    current_metric = metric
+                    lines.append(f"# HELP {metric} Duration in seconds by {label_name}.")
+                    lines.append(f"# TYPE {metric} histogram")
+                label = f'{label_name}="{label_value}"'
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{{label}}} {histogram.total:.6f}')
+                lines.append(f'{metric}_count{{{label}}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def record_span(name: str, seconds: float):
+    """Records a finished span in the histograms and in the current request's breakdown."""
+    registry.observe("resume_ranker_span_duration_seconds", "span", name, seconds)
+    if has_request_context():
+        spans = g.setdefault('span_timings', {})
+        total, count = spans.get(name, (0.0, 0))
+        spans[name] = (total + seconds, count + 1)
+
+
+@contextmanager
+def span(name: str):
+    """Times the enclosed block as a named span."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - start)
+
+
+def timed(name: str):
+    """Decorator that times every call of the wrapped function as a named span."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_times', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_times')
+    if start_times:
+        record_span("db", time.perf_counter() - start_times.pop())
+
+
+def _handle_db_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start_times'):
+        connection.info['query_start_times'].pop()
+
+
+def _start_request_timer():
+    g.request_start_time = time.perf_counter()
+
+
+def _finish_request_timer(response):
+    start = g.pop('request_start_time', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    endpoint = request.endpoint or 'unknown'
+    registry.observe("resume_ranker_request_duration_seconds", "endpoint", endpoint, elapsed)
+
+    spans = g.get('span_timings', {})
+    if current_app.config.get('SERVER_TIMING_HEADER', False):
+        server_timing = [f'{name};dur={total * 1000:.1f};desc="{count}x"' for name, (total, count) in spans.items()]
+        server_timing.append(f'total;dur={elapsed * 1000:.1f}')
+        response.headers['Server-Timing'] = ", ".join(server_timing)
+
+    if current_app.config.get('REQUEST_TIMING_LOG', True):
+        breakdown = " ".join(f"{name}={total * 1000:.1f}ms/{count}" for name, (total, count) in spans.items())
+        current_app.logger.info(f"{request.method} {request.path} {response.status_code} "
+                                f"{elapsed * 1000:.1f}ms {breakdown}")
+    return response
+
+
+def init_app(app):
+    """Installs the per-request timers and the SQLAlchemy query timer."""
+    app.before_request(_start_request_timer)
+    app.after_request(_finish_request_timer)
+
+    # Listening on the Engine class times queries on every engine, including binds.
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_db_error)
@@ -1,24 +1,115 @@
 # app/utils/ui_utils.py
 """
 This module contains utility functions specifically for enhancing the user interface (UI).
+
+Keyword highlighting is rendered from the skill offsets stored by
+NLPService.process_document when they are available, and falls back to a
+keyword regex for documents processed before offsets were stored. Compiled
+patterns and rendered fragments are kept in bounded LRU caches, so a page that
+shows many resumes does not rescan every resume on every view.
 """
 import re
-from markupsafe import Markup
+import sys
+import hashlib
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+from flask import current_app
+from markupsafe import Markup, escape
+
+
+class FragmentCache:
+    """Thread-safe LRU of rendered fragments keyed by (document digest, keyword set)."""
+
+    def __init__(self):
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+            return fragment
+
+    def put(self, key, fragment: Markup):
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > current_app.config['HIGHLIGHT_CACHE_SIZE']:
+                self._fragments.popitem(last=False)
+
+    def memory_usage(self) -> dict:
+        """Returns the number of cached fragments and the bytes of their text."""
+        with self._lock:
+            fragments = list(self._fragments.values())
+        return {'entries': len(fragments), 'bytes': sum(sys.getsizeof(fragment) for fragment in fragments)}
+
+
+fragment_cache = FragmentCache()
+
+
+@lru_cache(maxsize=256)
+def _keyword_pattern(keywords: frozenset) -> re.Pattern:
+    # Longest keywords first, so "machine learning" wins over "machine"
+    return re.compile(
+        r'\b(' + '|'.join(map(re.escape, sorted(keywords, key=len, reverse=True))) + r')\b',
+        re.IGNORECASE
+    )
+
+
+def _document_key(text: str) -> bytes:
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+
+def _render_marks(text: str, spans) -> Markup:
+    """Wraps the sorted [start, end] spans of the text in <mark> tags, escaping everything else."""
+    parts, position = [], 0
+    for start, end in spans:
+        if start < position:
+            continue  # Overlaps the previous mark, e.g. "learning" inside "machine learning"
+        parts.append(escape(text[position:start]))
+        parts.append(Markup('<mark>%s</mark>') % text[start:end])
+        position = end
+    parts.append(escape(text[position:]))
+    return Markup('').join(parts)
+
 
 def highlight_keywords(text: str, keywords_str: str) -> Markup:
     if not keywords_str or not text:
         return text
 
     # Sanitize the input by stripping whitespace from each keyword
-    keyword_list = [k.strip() for k in keywords_str.split(',') if k.strip()]
-    if not keyword_list:
+    keywords = frozenset(k.strip() for k in keywords_str.split(',') if k.strip())
+    if not keywords:
         return text
 
-    regex = re.compile(
-        r'\b(' + '|'.join(map(re.escape, keyword_list)) + r')\b',
-        re.IGNORECASE
-    )
+    key = (_document_key(text), 'keywords', keywords)
+    fragment = fragment_cache.get(key)
+    if fragment is None:
+        spans = (match.span() for match in _keyword_pattern(keywords).finditer(text))
+        fragment = _render_marks(text, spans)
+        fragment_cache.put(key, fragment)
+    return fragment
+
 
-    highlighted_text = regex.sub(r'<mark>\1</mark>', text)
+def highlight_skills(text: str, document_data: dict, job_data: dict) -> Markup:
+    """
+    Highlights the job's skills in a processed document from the skill offsets
+    found when it was processed, without scanning the text again.
+    """
+    document_data, job_data = document_data or {}, job_data or {}
+    # Skill IDs are only comparable when both were assigned from the same skills.json.
+    if not text or 'skill_spans' not in document_data or 'skill_ids' not in job_data \
+            or document_data.get('skill_vocabulary') is None \
+            or document_data.get('skill_vocabulary') != job_data.get('skill_vocabulary'):
+        return highlight_keywords(text, job_data.get('skills', ''))
 
-    return Markup(highlighted_text)
\ No newline at end of file
+    job_skill_ids = frozenset(job_data['skill_ids'])
+    key = (_document_key(text), 'skills', job_skill_ids)
+    fragment = fragment_cache.get(key)
+    if fragment is None:
+        spans = sorted((start, end) for start, end, skill_id in document_data['skill_spans']
+                       if skill_id in job_skill_ids)
+        fragment = _render_marks(text, spans)
+        fragment_cache.put(key, fragment)
+    return fragment
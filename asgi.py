@@ -0,0 +1,13 @@
+# asgi.py
+"""
+ASGI entry point, for serving the application with an ASGI server:
+    uvicorn asgi:asgi_app --workers 4
+
+The Flask app is wrapped with asgiref's WSGI adapter. The upload, apply and
+ranking views are async and run their inference on the bounded inference
+executor, so slow document analysis cannot starve the cheap pages.
+"""
+from asgiref.wsgi import WsgiToAsgi
+from main import app
+
+asgi_app = WsgiToAsgi(app)
@@ -0,0 +1,159 @@
+# benchmarks/bench_cascade.py
+"""
+Recall and latency of the cascade ranker against exhaustive pool scoring.
+
+A synthetic talent pool is seeded together with several jobs. For every job the
+whole pool is scored with RankingService.score_resumes (the exhaustive path),
+then ranked with CascadeRanker.rank for each shortlist size. The report shows,
+per shortlist size, the mean recall@k of the cascade's top k against the
+exhaustive top k, and the latency of the cascade on its first run (embeddings
+encoded and stored) and on a later run (stored embeddings reused).
+
+Usage (from the project root):
+    python -m benchmarks.bench_cascade --pool-size 2000 --jobs 5 --shortlist-sizes 25 50 100 200
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime, timezone
+from config import Config
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.bench_pipeline import RESULTS_DIR, git_commit, make_benchmark_config, seed_database
+
+
+def recall_at_k(exhaustive: list, cascade: list, k: int) -> float:
+    """Share of the exhaustive top-k resumes that the cascade also ranks in its top k."""
+    expected = {resume.id for resume, _, _ in exhaustive[:k]}
+    found = {resume.id for resume, _, _ in cascade[:k]}
+    return len(expected & found) / len(expected) if expected else 1.0
+
+
+def timed_call(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run(args) -> dict:
+    from app import create_app
+    from app.extensions import db
+    from app.models import Job, DocumentEmbedding
+
+    database_path = os.path.join(tempfile.mkdtemp(prefix='srr_cascade_'), 'bench.db')
+    app = create_app(make_benchmark_config(database_path))
+    from app.services.shared_services import nlp_service, ranking_service
+    from app.services.cascade_ranking import cascade_ranker
+
+    generator = CorpusGenerator(seed=args.seed)
+    results = {str(size): {'recall': [], 'first_run_sec': [], 'later_run_sec': []} for size in args.shortlist_sizes}
+    exhaustive_timings = []
+
+    with app.app_context():
+        first_job, recruiter = seed_database(db, nlp_service, generator, args.pool_size)
+        jobs = [first_job]
+        for title, description in generator.job_descriptions(args.jobs - 1):
+            jobs.append(Job(title=title, description=description, uploader_id=recruiter.id,
+                            sectioned_text=nlp_service.process_document(description)))
+        db.session.add_all(jobs[1:])
+        db.session.commit()
+
+        def load_pool():
+            return ranking_service.pool_candidates(first_job, recruiter.id)
+
+        def run_exhaustive(job):
+            return ranking_service.score_resumes(job, load_pool())
+
+        def run_cascade(job, shortlist_size):
+            scored = cascade_ranker.rank(job, load_pool(), prefilter_size=args.prefilter_size,
+                                         shortlist_size=shortlist_size, time_budget_ms=args.budget_ms,
+                                         batch_size=args.batch_size)
+            db.session.commit()
+            return scored
+
+        for number, job in enumerate(jobs, 1):
+            ranking_service.embedding_cache.clear()
+            scored, elapsed = timed_call(run_exhaustive, job)
+            exhaustive = sorted(scored, key=lambda match: match[2], reverse=True)
+            exhaustive_timings.append(elapsed)
+
+            for size in args.shortlist_sizes:
+                runs = []
+                # First run encodes and stores the embeddings, the second reuses the stored ones.
+                DocumentEmbedding.query.delete()
+                db.session.commit()
+                for _ in range(2):
+                    ranking_service.embedding_cache.clear()
+                    runs.append(timed_call(run_cascade, job, size))
+                entry = results[str(size)]
+                entry['recall'].append(recall_at_k(exhaustive, runs[-1][0], args.k))
+                entry['first_run_sec'].append(runs[0][1])
+                entry['later_run_sec'].append(runs[1][1])
+            print(f"  job {number}/{len(jobs)}: exhaustive {elapsed:.3f}s")
+
+    summary = {}
+    for size, entry in results.items():
+        summary[size] = {
+            f'recall_at_{args.k}': round(sum(entry['recall']) / len(entry['recall']), 4),
+            'min_recall': round(min(entry['recall']), 4),
+            'first_run_sec': round(sum(entry['first_run_sec']) / len(jobs), 4),
+            'later_run_sec': round(sum(entry['later_run_sec']) / len(jobs), 4),
+        }
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'encoder_backend': Config.ENCODER_BACKEND,
+        'seed': args.seed,
+        'pool_size': args.pool_size,
+        'jobs': args.jobs,
+        'k': args.k,
+        'prefilter_size': args.prefilter_size,
+        'budget_ms': args.budget_ms,
+        'exhaustive_sec': round(sum(exhaustive_timings) / len(exhaustive_timings), 4),
+        'results': summary,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pool-size', type=int, default=2000, help="Seeded talent-pool resumes.")
+    parser.add_argument('--jobs', type=int, default=5, help="Jobs ranked against the pool.")
+    parser.add_argument('--k', type=int, default=5, help="Top results compared for recall.")
+    parser.add_argument('--prefilter-size', type=int, default=Config.CASCADE_PREFILTER_SIZE)
+    parser.add_argument('--shortlist-sizes', type=int, nargs='+', default=[25, 50, 100, 200])
+    parser.add_argument('--batch-size', type=int, default=Config.CASCADE_BATCH_SIZE)
+    parser.add_argument('--budget-ms', type=int, default=0,
+                        help="Cascade time budget (default 0, so recall is measured without the deadline).")
+    parser.add_argument('--min-recall', type=float, default=0.9,
+                        help="Fail when the mean recall at the configured shortlist size is lower.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/cascade_<commit>.json).")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"cascade_{report['commit']}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nPool of {report['pool_size']} resumes, {report['jobs']} jobs, prefilter {report['prefilter_size']}; "
+          f"exhaustive scoring {report['exhaustive_sec']:.3f}s per job.")
+    print(f"{'shortlist':>10}{f'recall@{args.k}':>11}{'min':>8}{'first run s':>13}{'later run s':>13}{'speed-up':>10}")
+    for size, r in report['results'].items():
+        speed_up = report['exhaustive_sec'] / r['later_run_sec'] if r['later_run_sec'] else float('inf')
+        print(f"{size:>10}{r[f'recall_at_{args.k}']:>11.3f}{r['min_recall']:>8.3f}{r['first_run_sec']:>13.3f}"
+              f"{r['later_run_sec']:>13.3f}{speed_up:>9.1f}x")
+    print(f"Results written to {output}")
+
+    configured = report['results'].get(str(Config.CASCADE_SHORTLIST_SIZE))
+    if configured and configured[f'recall_at_{args.k}'] < args.min_recall:
+        print(f"FAILED: recall@{args.k} at the configured shortlist size ({Config.CASCADE_SHORTLIST_SIZE}) "
+              f"is below {args.min_recall}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# benchmarks/bench_db_concurrency.py
+"""
+Measures whether readers are blocked while a talent-pool upload is being ingested.
+
+For each SQLite profile, a writer thread replays the write pattern of the
+talent-pool upload: each resume is flushed, then the next document is analysed
+(simulated with --analysis-delay), and the batch is committed at the end. At the
+same time, reader threads run the queries of the job list and talent-pool pages.
+Reader latency percentiles and reader errors ("database is locked") are compared
+between the default rollback journal and the tuned profile of Config.SQLITE_PRAGMAS.
+
+Usage (from the project root):
+    python -m benchmarks.bench_db_concurrency --readers 8 --batches 3 --batch-size 1000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from sqlalchemy.exc import OperationalError
+from config import Config
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.bench_pipeline import make_benchmark_config, seed_database
+
+PROFILES = {
+    'rollback journal': {'journal_mode': 'DELETE'},
+    'tuned (WAL)': Config.SQLITE_PRAGMAS,
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def ingest(app, recruiter_id: str, documents: list[tuple[str, dict]], args, stats: dict):
+    """Adds the documents to the talent pool in batches, like the upload route does."""
+    from app.extensions import db
+    from app.models import Resume
+
+    with app.app_context():
+        start = time.perf_counter()
+        for offset in range(0, len(documents), args.batch_size):
+            try:
+                for text, processed in documents[offset:offset + args.batch_size]:
+                    db.session.add(Resume(original_filename='load.pdf', extracted_text=text, sectioned_text=processed,
+                                          source='talent_pool', uploader_id=recruiter_id))
+                    db.session.flush()
+                    time.sleep(args.analysis_delay)
+                db.session.commit()
+                stats['rows'] += min(args.batch_size, len(documents) - offset)
+            except OperationalError:
+                db.session.rollback()
+                stats['errors'] += 1
+        stats['seconds'] = time.perf_counter() - start
+
+
+def read_pages(app, recruiter_id: str, done: threading.Event, latencies: list, errors: list):
+    """Runs the job list and talent-pool page queries until the ingestion is done."""
+    from app.extensions import db
+    from app.models import Job, Resume
+
+    with app.app_context():
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                Job.query.order_by(Job.date_created.desc()).all()
+                Resume.query.filter_by(source='talent_pool', uploader_id=recruiter_id) \
+                    .order_by(Resume.date_uploaded.desc()).limit(50).all()
+                latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                errors.append(time.perf_counter() - start)
+            db.session.rollback()
+
+
+def run_profile(name: str, pragmas: dict, documents: list, args) -> dict:
+    from app import create_app
+    from app.extensions import db
+
+    class ProfileConfig(make_benchmark_config(os.path.join(tempfile.mkdtemp(prefix='srr_dbc_'), 'bench.db'))):
+        SQLITE_PRAGMAS = pragmas
+    app = create_app(ProfileConfig)
+    from app.services.shared_services import nlp_service
+
+    with app.app_context():
+        _, recruiter = seed_database(db, nlp_service, CorpusGenerator(seed=args.seed), args.pool_size)
+        recruiter_id = recruiter.id
+        journal_mode = db.session.connection().exec_driver_sql("PRAGMA journal_mode").scalar()
+
+    done = threading.Event()
+    latencies, errors = [], []
+    writer_stats = {'rows': 0, 'errors': 0, 'seconds': 0.0}
+    readers = [threading.Thread(target=read_pages, args=(app, recruiter_id, done, latencies, errors))
+               for _ in range(args.readers)]
+    writer = threading.Thread(target=ingest, args=(app, recruiter_id, documents, args, writer_stats))
+    for thread in readers:
+        thread.start()
+    writer.start()
+    writer.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    result = {'profile': name, 'journal_mode': journal_mode, 'reads': len(latencies), 'read_errors': len(errors),
+              'writer_rows_per_sec': writer_stats['rows'] / writer_stats['seconds'],
+              'writer_errors': writer_stats['errors']}
+    for q in (50, 95, 99, 100):
+        result[f'p{q}_ms'] = 1000 * percentile(latencies, q) if latencies else float('nan')
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8, help="Concurrent reader threads.")
+    parser.add_argument('--batches', type=int, default=3, help="Upload batches to ingest.")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Resumes per upload batch.")
+    parser.add_argument('--analysis-delay', type=float, default=0.002,
+                        help="Seconds of simulated document analysis between two flushes.")
+    parser.add_argument('--pool-size', type=int, default=500, help="Seeded talent-pool resumes.")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from app import create_app
+    create_app(make_benchmark_config(os.path.join(tempfile.mkdtemp(prefix='srr_dbc_'), 'setup.db')))
+    from app.services.shared_services import nlp_service
+    documents = [(text, nlp_service.process_document(text))
+                 for text in CorpusGenerator(seed=args.seed + 1).resumes(args.batches * args.batch_size)]
+
+    results = []
+    for name, pragmas in PROFILES.items():
+        print(f"Running profile '{name}'...")
+        results.append(run_profile(name, pragmas, documents, args))
+
+    print(f"\n{'profile':<18}{'journal':>9}{'reads':>8}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'p99 ms':>9}{'max ms':>9}{'writes/s':>10}")
+    for r in results:
+        print(f"{r['profile']:<18}{r['journal_mode']:>9}{r['reads']:>8}{r['read_errors']:>8}{r['p50_ms']:>9.1f}"
+              f"{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['p100_ms']:>9.1f}{r['writer_rows_per_sec']:>10.1f}")
+
+    tuned = results[-1]
+    if tuned['read_errors']:
+        print(f"FAILED: {tuned['read_errors']} reads failed while the tuned profile was ingesting.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# benchmarks/bench_pipeline.py
+"""
+Reproducible throughput benchmark for document ingestion, scoring and ranking.
+
+It seeds a throw-away SQLite database with a synthetic corpus and measures:
+  - docs/sec of NLPService.process_document
+  - pairs/sec of RankingService.generate_feature_vector and predict_score
+  - end-to-end latency of find_matches_in_pool for each pool size
+  - peak RSS of the process
+
+Results are written as JSON so that runs can be compared across commits.
+
+Usage (from the project root):
+    python -m benchmarks.bench_pipeline --pool-sizes 100 1000 10000
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/<baseline>.json
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from config import Config
+from benchmarks.corpus import CorpusGenerator
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# Metrics where a larger value is better; every other metric is a latency or a size.
+HIGHER_IS_BETTER = ('docs_per_sec', 'pairs_per_sec')
+
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB on Linux.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def make_benchmark_config(database_path: str):
+    """Returns a config class that points the app at a throw-away SQLite database."""
+    class BenchmarkConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + database_path
+        REQUEST_TIMING_LOG = False
+    return BenchmarkConfig
+
+
+def seed_database(db, nlp_service, generator: CorpusGenerator, pool_size: int):
+    """Creates a recruiter, one job and a talent pool of `pool_size` processed resumes."""
+    from app.models import User, Job, Resume
+
+    recruiter = User(username=f"bench_{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex}@example.com",
+                     role='recruiter')
+    recruiter.set_password('Benchmark1')
+    db.session.add(recruiter)
+    db.session.flush()
+
+    title, description = generator.job_description()
+    job = Job(title=title, description=description, sectioned_text=nlp_service.process_document(description),
+              uploader_id=recruiter.id)
+    db.session.add(job)
+
+    for text in generator.resumes(pool_size):
+        processed = nlp_service.process_document(text)
+        db.session.add(Resume(
+            original_filename='synthetic.pdf', extracted_text=text, sectioned_text=processed,
+            extracted_name=processed.get('extracted_name'), extracted_email=processed.get('extracted_email'),
+            source='talent_pool', uploader_id=recruiter.id
+        ))
+    db.session.commit()
+    return job, recruiter
+
+
+def run(args) -> dict:
+    from app import create_app
+    from app.extensions import db
+    from app.models import Job, Resume
+
+    database_path = os.path.join(tempfile.mkdtemp(prefix='srr_bench_'), 'bench.db')
+    app = create_app(make_benchmark_config(database_path))
+
+    # Imported after create_app, which loads the shared services inside the app context.
+    from app.services.shared_services import nlp_service, ranking_service
+
+    generator = CorpusGenerator(seed=args.seed)
+    results = {}
+
+    with app.app_context():
+        # Ingestion throughput
+        documents = generator.resumes(args.docs)
+        start = time.perf_counter()
+        processed = [nlp_service.process_document(text) for text in documents]
+        elapsed = time.perf_counter() - start
+        results['process_document'] = {'docs': len(documents), 'seconds': round(elapsed, 4),
+                                       'docs_per_sec': round(len(documents) / elapsed, 2)}
+
+        # Pairwise scoring throughput, on transient (unsaved) objects
+        title, description = generator.job_description()
+        job = Job(title=title, description=description, sectioned_text=nlp_service.process_document(description))
+        resumes = [Resume(original_filename='synthetic.pdf', extracted_text=text, sectioned_text=data)
+                   for text, data in zip(documents[:args.pairs], processed[:args.pairs])]
+
+        start = time.perf_counter()
+        feature_vectors = [ranking_service.generate_feature_vector(job, resume) for resume in resumes]
+        elapsed = time.perf_counter() - start
+        results['generate_feature_vector'] = {'pairs': len(resumes), 'seconds': round(elapsed, 4),
+                                              'pairs_per_sec': round(len(resumes) / elapsed, 2)}
+
+        start = time.perf_counter()
+        for features in feature_vectors:
+            ranking_service.predict_score(features)
+        elapsed = time.perf_counter() - start
+        results['predict_score'] = {'pairs': len(feature_vectors), 'seconds': round(elapsed, 4),
+                                    'pairs_per_sec': round(len(feature_vectors) / elapsed, 2)}
+
+        # End-to-end pool ranking at each pool size
+        results['find_matches_in_pool'] = {}
+        for pool_size in args.pool_sizes:
+            pool_job, recruiter = seed_database(db, nlp_service, generator, pool_size)
+            timings = []
+            for _ in range(args.repeats):
+                db.session.expire_all()
+                start = time.perf_counter()
+                ranking_service.find_matches_in_pool(pool_job, recruiter_id=recruiter.id)
+                timings.append(time.perf_counter() - start)
+            results['find_matches_in_pool'][str(pool_size)] = {
+                'latency_sec': round(min(timings), 4),
+                'mean_latency_sec': round(sum(timings) / len(timings), 4),
+            }
+            print(f"  pool {pool_size}: {min(timings):.3f}s")
+
+    results['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'encoder_backend': Config.ENCODER_BACKEND,
+        'seed': args.seed,
+        'results': results,
+    }
+
+
+def flatten(results: dict, prefix: str = '') -> dict:
+    """Flattens nested results into {'a.b.c': value} for comparison."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)):
+            flat[name] = value
+    return flat
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Prints the change of every metric against the baseline and returns the regressions."""
+    current_flat, baseline_flat = flatten(current['results']), flatten(baseline['results'])
+    regressions = []
+    print(f"\nComparison against {baseline.get('commit', '?')} (tolerance {tolerance:.0%}):")
+    for name, value in sorted(current_flat.items()):
+        base = baseline_flat.get(name)
+        if not base or name.endswith(('.docs', '.pairs', '.seconds')):
+            continue
+        change = (value - base) / base
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        flag = 'REGRESSION' if worse > tolerance else ''
+        print(f"  {name:<50}{base:>12.4f}{value:>12.4f}{change:>+9.1%}  {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=200, help="Documents for the ingestion benchmark.")
+    parser.add_argument('--pairs', type=int, default=100, help="Job-resume pairs for the scoring benchmarks.")
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument('--compare', help="Baseline result file to compare against.")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed relative slowdown.")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report['results'], indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"FAILED: {len(regressions)} metric(s) regressed beyond tolerance.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
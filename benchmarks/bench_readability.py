@@ -0,0 +1,111 @@
+# benchmarks/bench_readability.py
+"""
+Compares the in-house readability engine with textstat on a large corpus:
+Flesch reading ease differences, readability level agreement, per-word
+syllable agreement and throughput.
+
+The corpus is synthetic by default; pass --text-dir to add real extracted
+documents (one .txt file per document).
+
+Usage (from the project root):
+    python -m benchmarks.bench_readability --docs 5000
+    python -m benchmarks.bench_readability --text-dir path/to/texts --max-mean-error 1.0
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import textstat
+from app.services import readability
+from app.services.nlp_service import NLPService
+from app.services.skill_matcher import tokenize
+from benchmarks.corpus import CorpusGenerator
+
+
+def load_documents(args) -> list[str]:
+    """Returns the synthetic resumes and job descriptions plus any documents from --text-dir."""
+    generator = CorpusGenerator(seed=args.seed)
+    documents = generator.resumes(args.docs - args.docs // 4)
+    documents += [description for _, description in generator.job_descriptions(args.docs // 4)]
+    if args.text_dir:
+        for filename in sorted(os.listdir(args.text_dir)):
+            if filename.endswith('.txt'):
+                with open(os.path.join(args.text_dir, filename), 'r', encoding='utf-8', errors='ignore') as f:
+                    documents.append(f.read())
+    return documents
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=5000, help="Synthetic documents to generate.")
+    parser.add_argument('--text-dir', help="Directory of extracted .txt documents to add to the corpus.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--max-mean-error', type=float, default=None,
+                        help="Fail if the mean absolute reading ease difference exceeds this.")
+    args = parser.parse_args()
+
+    documents = load_documents(args)
+    print(f"{len(documents)} documents, {sum(len(d.split()) for d in documents)} words")
+
+    # Load both dictionaries before timing anything.
+    readability.load_syllable_dictionary()
+    textstat.flesch_reading_ease("Warm up the syllable dictionary once.")
+
+    start = time.perf_counter()
+    expected = [textstat.flesch_reading_ease(text) for text in documents]
+    textstat_time = time.perf_counter() - start
+
+    readability.syllable_count.cache_clear()
+    readability._word_stats.cache_clear()
+    start = time.perf_counter()
+    analyses = [readability.analyze(text) for text in documents]
+    engine_time = time.perf_counter() - start
+    actual = [analysis["flesch_reading_ease"] for analysis in analyses]
+
+    # In process_document the tokens are shared with the skill matcher.
+    tokens = [tokenize(text) for text in documents]
+    start = time.perf_counter()
+    for text, text_tokens in zip(documents, tokens):
+        readability.analyze(text, text_tokens)
+    shared_tokens_time = time.perf_counter() - start
+
+    errors = [abs(a - e) for a, e in zip(actual, expected)]
+    level_agreement = sum(NLPService._readability_level(a) == NLPService._readability_level(e)
+                          for a, e in zip(actual, expected)) / len(documents)
+    print("\nFlesch reading ease vs textstat:")
+    print(f"  mean abs difference   {sum(errors) / len(errors):8.3f}")
+    print(f"  p95 abs difference    {percentile(errors, 0.95):8.3f}")
+    print(f"  max abs difference    {max(errors):8.3f}")
+    print(f"  within 1 point        {sum(e <= 1 for e in errors) / len(errors):8.1%}")
+    print(f"  same readability level{level_agreement:8.1%}")
+
+    words = sorted({word for text in documents for word in re.findall(r"[a-z]+(?:'[a-z]+)?", text.lower())})
+    dictionary = readability.load_syllable_dictionary()
+    known = [w for w in words if w in dictionary]
+    unknown = [w for w in words if w not in dictionary]
+    for label, group in (("dictionary words", known), ("other words", unknown)):
+        if group:
+            agreement = sum(readability.syllable_count(w) == textstat.syllable_count(w) for w in group) / len(group)
+            print(f"  syllables, {label:<16}{agreement:8.1%} of {len(group)}")
+
+    print(f"\n{'':<22}{'seconds':>10}{'docs/sec':>12}")
+    print(f"{'textstat':<22}{textstat_time:>10.3f}{len(documents) / textstat_time:>12.1f}")
+    print(f"{'engine':<22}{engine_time:>10.3f}{len(documents) / engine_time:>12.1f}")
+    print(f"{'engine, shared tokens':<22}{shared_tokens_time:>10.3f}{len(documents) / shared_tokens_time:>12.1f}")
+    print(f"Speed-up: {textstat_time / engine_time:.1f}x, {textstat_time / shared_tokens_time:.1f}x with shared tokens "
+          f"(the engine also computes five more indices)")
+
+    if args.max_mean_error is not None and sum(errors) / len(errors) > args.max_mean_error:
+        print(f"FAILED: mean difference exceeds {args.max_mean_error}.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
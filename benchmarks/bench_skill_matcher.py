@@ -0,0 +1,93 @@
+# benchmarks/bench_skill_matcher.py
+"""
+Compares the precompiled skill automaton with spaCy's PhraseMatcher on a large
+synthetic skill dictionary.
+
+Usage (from the project root):
+    python -m benchmarks.bench_skill_matcher --skills 20000 --docs 500
+"""
+import time
+import random
+import argparse
+import spacy
+from spacy.matcher import PhraseMatcher
+from app.services.skill_vocabulary import SkillVocabulary
+from app.services.skill_matcher import SkillMatcher
+
+WORDS = [
+    "cloud", "data", "platform", "network", "security", "analytics", "design", "systems", "clinical",
+    "financial", "marketing", "sales", "quality", "process", "project", "product", "risk", "supply",
+    "chain", "patient", "service", "software", "testing", "automation", "mobile", "web", "api",
+    "database", "reporting", "compliance", "operations", "research", "content", "engineering",
+]
+
+FILLER = (
+    "Experienced professional who managed cross-functional teams and delivered results. "
+    "Worked closely with stakeholders to improve processes and reduce costs. "
+)
+
+
+def build_skill_dictionary(size: int, seed: int) -> dict:
+    """Returns a skills.json-shaped dictionary with `size` unique one- to three-word skills."""
+    rng = random.Random(seed)
+    base = SkillVocabulary.from_json()
+    skills = set(base.skills)
+    while len(skills) < size:
+        skills.add(" ".join(rng.choice(WORDS) + str(rng.randint(0, 999)) if rng.random() < 0.3
+                            else rng.choice(WORDS) for _ in range(rng.randint(1, 3))))
+    skills = sorted(skills)
+    return {f"category_{i % 40}": skills[i::40] for i in range(40)}
+
+
+def build_documents(vocabulary: SkillVocabulary, count: int, seed: int) -> list[str]:
+    """Returns synthetic resume-sized texts mentioning a handful of skills each."""
+    rng = random.Random(seed)
+    documents = []
+    for _ in range(count):
+        mentioned = rng.sample(vocabulary.skills, 15)
+        sentences = [f"Applied {skill.title()} on several projects." for skill in mentioned]
+        documents.append(FILLER * 5 + " ".join(sentences) + FILLER * 5)
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--skills', type=int, default=10000)
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    vocabulary = SkillVocabulary(build_skill_dictionary(args.skills, args.seed))
+    documents = build_documents(vocabulary, args.docs, args.seed)
+    print(f"{len(vocabulary)} skills, {len(documents)} documents")
+
+    start = time.perf_counter()
+    automaton = SkillMatcher(vocabulary)
+    automaton_build = time.perf_counter() - start
+
+    nlp = spacy.blank("en")
+    start = time.perf_counter()
+    phrase_matcher = PhraseMatcher(nlp.vocab, attr='LOWER')
+    phrase_matcher.add("SKILL", [nlp.make_doc(skill) for skill in vocabulary.skills])
+    phrase_matcher_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    automaton_results = [{vocabulary.skills[m.skill_id] for m in automaton.find(text)} for text in documents]
+    automaton_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    phrase_results = []
+    for text in documents:
+        doc = nlp(text)
+        phrase_results.append({doc[s:e].text.lower() for _, s, e in phrase_matcher(doc)})
+    phrase_time = time.perf_counter() - start
+
+    agreement = sum(a == p for a, p in zip(automaton_results, phrase_results)) / len(documents)
+    print(f"{'':<16}{'build (s)':>12}{'match (s)':>12}{'docs/sec':>12}")
+    print(f"{'automaton':<16}{automaton_build:>12.3f}{automaton_time:>12.3f}{len(documents) / automaton_time:>12.1f}")
+    print(f"{'PhraseMatcher':<16}{phrase_matcher_build:>12.3f}{phrase_time:>12.3f}{len(documents) / phrase_time:>12.1f}")
+    print(f"Speed-up: {phrase_time / automaton_time:.1f}x, identical skill sets on {agreement:.1%} of documents")
+
+
+if __name__ == "__main__":
+    main()
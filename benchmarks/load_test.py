@@ -0,0 +1,371 @@
+# benchmarks/load_test.py
+"""
+Concurrent load test of the web application under a simulated recruiter and
+candidate workload.
+
+The app is served by a threaded local server on a throw-away SQLite database
+seeded with recruiters, jobs, talent pools and candidate accounts. Virtual users
+then log in and run concurrently:
+  - candidates browse /candidate/jobs and upload synthetic PDF and DOCX resumes
+    to /candidate/apply/<job_id>
+  - recruiters upload batches of resumes to /recruiter/talent-pool and poll
+    /recruiter/job/<job_id>/ranking
+
+Throughput and p50/p95/p99 latency are reported per endpoint and written as
+JSON, so that runs can be compared across commits like bench_pipeline results.
+
+Usage (from the project root):
+    python -m benchmarks.load_test --candidates 100 --recruiters 5
+    python -m benchmarks.load_test --compare benchmarks/results/load_<baseline>.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+from datetime import datetime, timezone
+import docx
+import requests
+from werkzeug.serving import make_server
+from config import Config
+from benchmarks.corpus import CorpusGenerator
+from benchmarks.bench_pipeline import make_benchmark_config, seed_database, git_commit, peak_rss_mb
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+PASSWORD = 'Benchmark1'  # Set by seed_database for recruiters, reused for candidates
+
+# Latency percentiles reported per endpoint, and compared against the baseline.
+PERCENTILES = (50, 95, 99)
+# Endpoints with fewer requests than this are too noisy to compare with the baseline.
+MIN_REQUESTS_TO_COMPARE = 20
+LINES_PER_PDF_PAGE = 60
+
+
+def synthetic_pdf(text: str) -> bytes:
+    """Returns a minimal single-font PDF containing the text, one text line per line."""
+    def escape(line: str) -> str:
+        return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    lines = text.split('\n')
+    pages = [lines[i:i + LINES_PER_PDF_PAGE] for i in range(0, len(lines), LINES_PER_PDF_PAGE)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for page in pages:
+        stream = "BT /F1 10 Tf 12 TL 50 800 Td " + " ".join(f"({escape(line)}) Tj T*" for line in page) + " ET"
+        stream = stream.encode('latin-1', errors='replace').decode('latin-1')
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    output, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode('latin-1')
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    return bytes(output)
+
+
+def synthetic_docx(text: str) -> bytes:
+    """Returns a DOCX document with one paragraph per line of the text."""
+    document = docx.Document()
+    for line in text.split('\n'):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def synthetic_upload(text: str, index: int) -> tuple[str, bytes]:
+    """Returns a unique file name and the file content, alternating between PDF and DOCX."""
+    if index % 2 == 0:
+        return f"load_{uuid.uuid4().hex}.pdf", synthetic_pdf(text)
+    return f"load_{uuid.uuid4().hex}.docx", synthetic_docx(text)
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+class LatencyRecorder:
+    """Thread-safe collection of request latencies and errors per endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + (not ok)
+
+    def summary(self, duration: float) -> dict:
+        """Returns throughput, error rate and latency percentiles (in ms) per endpoint and overall."""
+        results = {}
+        groups = dict(self.latencies)
+        groups['total'] = [latency for values in self.latencies.values() for latency in values]
+        for endpoint, values in groups.items():
+            if not values:
+                continue
+            errors = sum(self.errors.values()) if endpoint == 'total' else self.errors[endpoint]
+            results[endpoint] = {
+                'requests': len(values),
+                'error_rate': round(errors / len(values), 4),
+                'requests_per_sec': round(len(values) / duration, 2),
+                'mean_ms': round(1000 * sum(values) / len(values), 1),
+                **{f'p{q}_ms': round(1000 * percentile(values, q), 1) for q in PERCENTILES},
+            }
+        return results
+
+
+class VirtualUser:
+    """A logged-in browser session that times every request it makes."""
+
+    def __init__(self, base_url: str, recorder: LatencyRecorder, timeout: float):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def request(self, endpoint: str, method: str, path: str, expect_redirect: str = None, **kwargs) -> bool:
+        """
+        Sends one request without following redirects and records its latency.
+        A request fails on an error status, a redirect to the login page or, when
+        `expect_redirect` is given, a redirect anywhere else.
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, allow_redirects=False,
+                                            timeout=self.timeout, **kwargs)
+            location = response.headers.get('Location', '')
+            ok = response.status_code < 400 and '/login' not in location
+            if expect_redirect is not None:
+                ok = ok and expect_redirect in location
+        except requests.RequestException:
+            ok = False
+        self.recorder.record(endpoint, time.perf_counter() - start, ok)
+        return ok
+
+    def login(self, email: str) -> bool:
+        return self.request('POST /auth/login', 'POST', '/auth/login', data={'email': email, 'password': PASSWORD})
+
+
+def candidate_session(user: VirtualUser, email: str, applications: list[tuple[str, str, bytes]], think_time: float):
+    """Logs in, then browses the job list and applies to each (job_id, filename, content) in turn."""
+    if not user.login(email):
+        return
+    for job_id, filename, content in applications:
+        user.request('GET /candidate/jobs', 'GET', '/candidate/jobs')
+        time.sleep(think_time)
+        user.request('POST /candidate/apply/<job_id>', 'POST', f'/candidate/apply/{job_id}',
+                     expect_redirect='/candidate/my-applications', files={'resume': (filename, content)})
+        time.sleep(think_time)
+
+
+def recruiter_session(user: VirtualUser, email: str, job_ids: list[str], uploads: list[list[tuple[str, bytes]]],
+                      polls: int, think_time: float, rng: random.Random):
+    """Logs in, then alternates talent-pool uploads with polls of the ranking pages of its jobs."""
+    if not user.login(email):
+        return
+    for batch in uploads:
+        user.request('POST /recruiter/talent-pool', 'POST', '/recruiter/talent-pool',
+                     files=[('resumes', upload) for upload in batch])
+        time.sleep(think_time)
+        for _ in range(polls):
+            user.request('GET /recruiter/job/<job_id>/ranking', 'GET', f'/recruiter/job/{rng.choice(job_ids)}/ranking')
+            time.sleep(think_time)
+
+
+def seed_workload(db, nlp_service, generator: CorpusGenerator, args) -> tuple[list, list[str]]:
+    """Creates the recruiters with their jobs and talent pools, and the candidate accounts."""
+    from app.models import User, Job
+
+    recruiters = []
+    for _ in range(args.recruiters):
+        job, recruiter = seed_database(db, nlp_service, generator, args.pool_size)
+        job_ids = [job.id]
+        for title, description in generator.job_descriptions(args.jobs_per_recruiter - 1):
+            extra_job = Job(title=title, description=description,
+                            sectioned_text=nlp_service.process_document(description), uploader_id=recruiter.id)
+            db.session.add(extra_job)
+            db.session.flush()
+            job_ids.append(extra_job.id)
+        recruiters.append((recruiter.email, job_ids))
+
+    candidates = []
+    for i in range(args.candidates):
+        candidate = User(username=f"load_candidate_{i}_{uuid.uuid4().hex[:6]}",
+                         email=f"{uuid.uuid4().hex}@example.com", role='candidate')
+        candidate.set_password(PASSWORD)
+        db.session.add(candidate)
+        candidates.append(candidate.email)
+    db.session.commit()
+    return recruiters, candidates
+
+
+def run(args) -> dict:
+    from app import create_app
+    from app.extensions import db
+
+    class LoadTestConfig(make_benchmark_config(os.path.join(tempfile.mkdtemp(prefix='srr_load_'), 'load.db'))):
+        DEFERRED_SCORING = args.deferred
+    app = create_app(LoadTestConfig)
+
+    # Imported after create_app, which loads the shared services inside the app context.
+    from app.services.shared_services import nlp_service
+
+    generator = CorpusGenerator(seed=args.seed)
+    rng = random.Random(args.seed)
+    print("Seeding the database...")
+    with app.app_context():
+        recruiters, candidates = seed_workload(db, nlp_service, generator, args)
+    all_job_ids = [job_id for _, job_ids in recruiters for job_id in job_ids]
+
+    # Generate every upload up front, so that document generation is not timed.
+    print("Generating uploads...")
+    file_index = 0
+
+    def next_upload() -> tuple[str, bytes]:
+        nonlocal file_index
+        file_index += 1
+        return synthetic_upload(generator.resume(), file_index)
+
+    applications_per_candidate = min(args.applications, len(all_job_ids))
+    candidate_work = [[(job_id, *next_upload()) for job_id in rng.sample(all_job_ids, applications_per_candidate)]
+                      for _ in candidates]
+    recruiter_work = [[[next_upload() for _ in range(args.files_per_upload)] for _ in range(args.uploads)]
+                      for _ in recruiters]
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    recorder = LatencyRecorder()
+    threads = [threading.Thread(target=candidate_session,
+                                args=(VirtualUser(base_url, recorder, args.timeout), email, work, args.think_time))
+               for email, work in zip(candidates, candidate_work)]
+    threads += [threading.Thread(target=recruiter_session,
+                                 args=(VirtualUser(base_url, recorder, args.timeout), email, job_ids, work,
+                                       args.polls, args.think_time, random.Random(args.seed + i)))
+                for i, ((email, job_ids), work) in enumerate(zip(recruiters, recruiter_work))]
+
+    print(f"Running {len(candidates)} candidates and {len(recruiters)} recruiters against {base_url}...")
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start
+    server.shutdown()
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'encoder_backend': Config.ENCODER_BACKEND,
+        'seed': args.seed,
+        'workload': {key: getattr(args, key) for key in (
+            'candidates', 'applications', 'recruiters', 'jobs_per_recruiter', 'pool_size', 'uploads',
+            'files_per_upload', 'polls', 'think_time', 'deferred')},
+        'duration_sec': round(duration, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'results': recorder.summary(duration),
+    }
+
+
+def print_report(report: dict):
+    print(f"\n{'endpoint':<38}{'requests':>9}{'errors':>8}{'req/s':>8}"
+          + "".join(f"{f'p{q} ms':>10}" for q in PERCENTILES))
+    for endpoint, stats in report['results'].items():
+        print(f"{endpoint:<38}{stats['requests']:>9}{stats['error_rate']:>8.1%}{stats['requests_per_sec']:>8.2f}"
+              + "".join(f"{stats[f'p{q}_ms']:>10.1f}" for q in PERCENTILES))
+    print(f"Duration {report['duration_sec']:.1f}s, peak RSS {report['peak_rss_mb']:.0f} MiB")
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Prints the change of every endpoint's throughput and latency percentiles against
+    the baseline and returns the regressions. Any increase of the error rate is a regression.
+    """
+    if current['workload'] != baseline.get('workload'):
+        print("WARNING: The baseline was recorded with a different workload; the comparison may be meaningless.")
+    regressions = []
+    print(f"\nComparison against {baseline.get('commit', '?')} (tolerance {tolerance:.0%}):")
+    for endpoint, stats in current['results'].items():
+        base_stats = baseline['results'].get(endpoint)
+        if not base_stats:
+            continue
+        if min(stats['requests'], base_stats['requests']) < MIN_REQUESTS_TO_COMPARE:
+            print(f"  {endpoint:<58}skipped, fewer than {MIN_REQUESTS_TO_COMPARE} requests")
+            continue
+        for metric in ('requests_per_sec', *(f'p{q}_ms' for q in PERCENTILES)):
+            base, value = base_stats[metric], stats[metric]
+            if not base:
+                continue
+            change = (value - base) / base
+            worse = -change if metric == 'requests_per_sec' else change
+            flag = 'REGRESSION' if worse > tolerance else ''
+            print(f"  {endpoint + ' ' + metric:<58}{base:>10.2f}{value:>10.2f}{change:>+9.1%}  {flag}")
+            if flag:
+                regressions.append(f"{endpoint} {metric}")
+        if stats['error_rate'] > base_stats['error_rate']:
+            print(f"  {endpoint + ' error_rate':<58}{base_stats['error_rate']:>10.2%}{stats['error_rate']:>10.2%}"
+                  f"{'':>9}  REGRESSION")
+            regressions.append(f"{endpoint} error_rate")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--candidates', type=int, default=50, help="Concurrent candidate users.")
+    parser.add_argument('--applications', type=int, default=2, help="Applications per candidate.")
+    parser.add_argument('--recruiters', type=int, default=3, help="Concurrent recruiter users.")
+    parser.add_argument('--jobs-per-recruiter', type=int, default=3)
+    parser.add_argument('--pool-size', type=int, default=200, help="Seeded talent-pool resumes per recruiter.")
+    parser.add_argument('--uploads', type=int, default=3, help="Talent-pool uploads per recruiter.")
+    parser.add_argument('--files-per-upload', type=int, default=5)
+    parser.add_argument('--polls', type=int, default=3, help="Ranking page polls after each upload.")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Seconds each user waits between requests.")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Request timeout in seconds.")
+    parser.add_argument('--deferred', action='store_true', help="Run with DEFERRED_SCORING enabled.")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/load_<commit>.json).")
+    parser.add_argument('--compare', help="Baseline result file to compare against.")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Allowed relative slowdown.")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    output = args.output or os.path.join(RESULTS_DIR, f"load_{report['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"FAILED: {len(regressions)} metric(s) regressed beyond tolerance.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,6 +20,112 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'instance', 'app.db')
+    # Read-heavy pages and training data loads read from this replica when it is set.
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    # Applied to every SQLite connection: WAL lets readers run while a writer holds the lock.
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # Negative values are in KiB
+        'busy_timeout': 5000,
+    }
+    # Connection pool of server databases such as PostgreSQL.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+
+    # Sentence encoder used for semantic similarity: 'torch', 'onnx' or 'onnx-int8'.
+    # The ONNX backends need the model exported with export_encoder.py first.
+    ENCODER_BACKEND = os.environ.get('ENCODER_BACKEND', 'torch')
+    ENCODER_MODEL_NAME = os.environ.get('ENCODER_MODEL_NAME', 'all-MiniLM-L6-v2')
+    ENCODER_MODEL_DIR = os.environ.get('ENCODER_MODEL_DIR') or \
+        os.path.join(basedir, 'instance', 'ml_models', 'encoder')
+    # Intra-op threads for encoder inference (0 lets the runtime decide).
+    ENCODER_INTRA_OP_THREADS = int(os.environ.get('ENCODER_INTRA_OP_THREADS', 0))
+    # Number of text embeddings kept in the in-memory LRU cache.
+    EMBEDDING_CACHE_SIZE = int(os.environ.get('EMBEDDING_CACHE_SIZE', 10000))
+
+    # Minimum share of a job's skills a talent-pool resume must cover before it is
+    # scored as a passive candidate (0 disables the prefilter).
+    POOL_MIN_SKILL_OVERLAP = float(os.environ.get('POOL_MIN_SKILL_OVERLAP', 0.0))
+    # Minimum score for a talent-pool resume to be shown (and stored) as a passive candidate.
+    POOL_MATCH_SCORE_THRESHOLD = float(os.environ.get('POOL_MATCH_SCORE_THRESHOLD', 0.5))
+
+    # Cascade ranking of passive candidates on the ranking page: the pool is cut to
+    # CASCADE_PREFILTER_SIZE resumes on skills, experience and education, then to
+    # CASCADE_SHORTLIST_SIZE on stored embedding similarity, and only those get the full
+    # model score, in batches of CASCADE_BATCH_SIZE until CASCADE_TIME_BUDGET_MS is spent
+    # (0 disables the budget). When enabled, it is used instead of partitioned scoring on
+    # the ranking page whatever the pool size; stored matches are still computed in full.
+    CASCADE_RANKING = os.environ.get('CASCADE_RANKING', 'true').lower() == 'true'
+    CASCADE_PREFILTER_SIZE = int(os.environ.get('CASCADE_PREFILTER_SIZE', 5000))
+    CASCADE_SHORTLIST_SIZE = int(os.environ.get('CASCADE_SHORTLIST_SIZE', 100))
+    CASCADE_BATCH_SIZE = int(os.environ.get('CASCADE_BATCH_SIZE', 32))
+    CASCADE_TIME_BUDGET_MS = int(os.environ.get('CASCADE_TIME_BUDGET_MS', 2000))
+
+    # "Recommended for you": jobs shown, and jobs shortlisted from the embedding index for re-ranking.
+    RECOMMENDATION_COUNT = 5
+    RECOMMENDATION_SHORTLIST_SIZE = 20
+    # Candidates whose computed recommendations each worker keeps, and their age in seconds
+    # after which a page view queues a refresh (to pick up jobs indexed by other workers).
+    RECOMMENDATION_CACHE_SIZE = int(os.environ.get('RECOMMENDATION_CACHE_SIZE', 10000))
+    RECOMMENDATION_REFRESH_SECONDS = int(os.environ.get('RECOMMENDATION_REFRESH_SECONDS', 300))
+
+    # Rendered keyword-highlight fragments kept in memory (one per document and keyword set).
+    HIGHLIGHT_CACHE_SIZE = int(os.environ.get('HIGHLIGHT_CACHE_SIZE', 512))
+
+    # Log a per-request breakdown of the timed spans.
+    REQUEST_TIMING_LOG = os.environ.get('REQUEST_TIMING_LOG', 'true').lower() == 'true'
+    # Also send the breakdown to the client as a Server-Timing header (it names internal steps).
+    SERVER_TIMING_HEADER = os.environ.get('SERVER_TIMING_HEADER', 'false').lower() == 'true'
+    # Bearer token the Prometheus scraper sends to read /metrics; /metrics is closed while it is unset.
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # Accounts allowed to open the /admin profiling pages, as comma-separated user IDs (user.id).
+    # Emails are not verified at registration, so they cannot designate an admin.
+    ADMIN_USER_IDS = {user_id.strip() for user_id in os.environ.get('ADMIN_USER_IDS', '').split(',') if user_id.strip()}
+    # Profiling of a live worker: longest stack-sampling or allocation-tracing window, default
+    # stack sampling interval, allocation sites reported and traceback depth traced.
+    PROFILER_MAX_SECONDS = int(os.environ.get('PROFILER_MAX_SECONDS', 60))
+    PROFILER_SAMPLE_INTERVAL_MS = int(os.environ.get('PROFILER_SAMPLE_INTERVAL_MS', 10))
+    PROFILER_TOP_ALLOCATIONS = 25
+    PROFILER_TRACEMALLOC_FRAMES = int(os.environ.get('PROFILER_TRACEMALLOC_FRAMES', 10))
+
+    # Deferred scoring: store applications as 'pending' and score them on background
+    # workers instead of during the upload request.
+    DEFERRED_SCORING = os.environ.get('DEFERRED_SCORING', 'false').lower() == 'true'
+    BACKGROUND_WORKERS = int(os.environ.get('BACKGROUND_WORKERS', 1))
+    # How often the applications page asks for the status of pending applications.
+    SCORING_STATUS_POLL_SECONDS = 3
+
+    # Uploads: request bodies over MAX_CONTENT_LENGTH are refused with a 413, and talent-pool
+    # files over MAX_UPLOAD_FILE_SIZE are skipped. Files are streamed to disk in UPLOAD_CHUNK_SIZE
+    # chunks, and resumes are inserted and committed UPLOAD_INSERT_BATCH_SIZE at a time.
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 512 * 1024 * 1024))
+    MAX_UPLOAD_FILE_SIZE = int(os.environ.get('MAX_UPLOAD_FILE_SIZE', 10 * 1024 * 1024))
+    UPLOAD_CHUNK_SIZE = 64 * 1024
+    UPLOAD_INSERT_BATCH_SIZE = int(os.environ.get('UPLOAD_INSERT_BATCH_SIZE', 50))
+
+    # Async views run text extraction, analysis and scoring on a pool of INFERENCE_WORKERS
+    # threads. Once INFERENCE_QUEUE_SIZE more requests are waiting, new ones get a 503
+    # asking the client to retry after INFERENCE_RETRY_AFTER seconds.
+    INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', 2))
+    INFERENCE_QUEUE_SIZE = int(os.environ.get('INFERENCE_QUEUE_SIZE', 8))
+    INFERENCE_RETRY_AFTER = int(os.environ.get('INFERENCE_RETRY_AFTER', 10))
+
+    # Estimated Jaccard similarity of word shingles above which an uploaded resume
+    # counts as a near-duplicate of an earlier one.
+    NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.9))
+
+    # Partitioned scoring: talent pools with at least this many resumes are scored
+    # shard by shard on a process pool (0 worker processes means one per CPU). On the
+    # ranking page this applies only when CASCADE_RANKING is off.
+    PARTITIONED_SCORING_MIN_POOL = int(os.environ.get('PARTITIONED_SCORING_MIN_POOL', 20000))
+    PARTITIONED_SCORING_WORKERS = int(os.environ.get('PARTITIONED_SCORING_WORKERS', 0))
+    # Leading resume ID hex characters that name a shard (1 gives 16 shards, 2 gives 256).
+    PARTITIONED_SCORING_PREFIX_LENGTH = int(os.environ.get('PARTITIONED_SCORING_PREFIX_LENGTH', 1))
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,86 @@
+# export_encoder.py
+"""
+Standalone script that exports the sentence encoder to ONNX (plus a dynamically
+int8-quantized copy) and verifies that the exported models reproduce the
+PyTorch embeddings within tolerance before they can be selected with
+ENCODER_BACKEND=onnx or ENCODER_BACKEND=onnx-int8.
+"""
+import sys
+import time
+import argparse
+from config import Config
+from app.services.encoder_service import (TorchEncoder, OnnxEncoder, export_onnx_model,
+                                          compare_encoders)
+
+# Maximum allowed difference between the pairwise cosine similarities of the
+# PyTorch model and the exported model. The similarities are rounded to four
+# decimals in the feature vector, so fp32 ONNX must match almost exactly.
+TOLERANCES = {
+    "onnx": 1e-4,
+    "onnx-int8": 0.03,
+}
+
+SAMPLE_TEXTS = [
+    "Senior Python developer with 6 years of experience building Flask and Django APIs.",
+    "Managed a team of five nurses in a busy emergency department, ensuring HIPAA compliance.",
+    "Responsibilities: design CI/CD pipelines on AWS using Docker and Kubernetes.",
+    "Financial analyst skilled in financial modeling, risk management and Microsoft Excel.",
+    "Bachelor's Degree in Computer Science. Certifications: AWS Solutions Architect.",
+    "Led the redesign of the checkout flow, which increased conversion by 12%.",
+    "We are looking for a data scientist with experience in machine learning and SQL.",
+    "Skills: React, Angular, Node.js, JavaScript, MongoDB, agile, scrum.",
+    "Experienced phlebotomist with strong patient care and medical terminology skills.",
+    "Professional Experience\nSoftware Engineer, Acme Corp, Jan 2019 - Present\nBuilt data pipelines.",
+]
+
+
+def time_encoder(encoder, texts: list[str], repeats: int = 5) -> float:
+    """Returns the mean wall-clock seconds to encode the texts one by one."""
+    encoder.encode(texts[:1])  # Warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            encoder.encode([text])
+    return (time.perf_counter() - start) / (repeats * len(texts))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model-name', default=Config.ENCODER_MODEL_NAME)
+    parser.add_argument('--output-dir', default=Config.ENCODER_MODEL_DIR)
+    parser.add_argument('--threads', type=int, default=Config.ENCODER_INTRA_OP_THREADS)
+    parser.add_argument('--no-quantize', action='store_true', help="Skip the int8-quantized export.")
+    args = parser.parse_args()
+
+    print(f"Exporting '{args.model_name}' to {args.output_dir} ...")
+    for path in export_onnx_model(args.model_name, args.output_dir, quantize=not args.no_quantize):
+        print(f"  wrote {path}")
+
+    reference = TorchEncoder(args.model_name, intra_op_threads=args.threads)
+    candidates = {"onnx": OnnxEncoder(args.output_dir, intra_op_threads=args.threads)}
+    if not args.no_quantize:
+        candidates["onnx-int8"] = OnnxEncoder(args.output_dir, quantized=True, intra_op_threads=args.threads)
+
+    torch_latency = time_encoder(reference, SAMPLE_TEXTS)
+    print(f"torch: {torch_latency * 1000:.2f} ms/text")
+
+    failed = False
+    for backend, encoder in candidates.items():
+        parity = compare_encoders(reference, encoder, SAMPLE_TEXTS)
+        latency = time_encoder(encoder, SAMPLE_TEXTS)
+        ok = parity["max_similarity_error"] <= TOLERANCES[backend]
+        failed = failed or not ok
+        print(f"{backend}: {latency * 1000:.2f} ms/text ({torch_latency / latency:.1f}x), "
+              f"min cosine to torch {parity['min_cosine']:.5f}, "
+              f"max similarity error {parity['max_similarity_error']:.5f} "
+              f"(tolerance {TOLERANCES[backend]}) -> {'OK' if ok else 'FAILED'}")
+
+    if failed:
+        print("ERROR: Exported encoder is outside tolerance. Do not enable it.")
+        return 1
+    print("SUCCESS: Exported encoders are within tolerance.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
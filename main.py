@@ -7,5 +7,11 @@ from app import create_app
 
 app = create_app()
 
+# Resume background scoring of applications left pending by a previous run.
+if app.config['DEFERRED_SCORING']:
+    with app.app_context():
+        from app.services.application_scoring import requeue_pending_applications
+        requeue_pending_applications()
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
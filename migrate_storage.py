@@ -0,0 +1,143 @@
+# migrate_storage.py
+"""
+Standalone script that converts existing rows to the compressed storage format:
+Resume.extracted_text, Resume.sectioned_text and Job.sectioned_text are
+rewritten zlib-compressed, and the duplicated 'raw_sections' copies inside the
+sectioned documents are replaced by line offsets into the document text.
+
+Rows are converted in batches of --batch-size, each committed on its own, so the
+script can be interrupted and re-run; rows already in the compressed format are
+skipped. On PostgreSQL the columns are first converted to bytea. Columns added to
+existing tables since are created by app.utils.schema when the app starts,
+which includes this script.
+
+Usage (from the project root):
+    python migrate_storage.py --batch-size 500
+"""
+import sys
+import json
+import argparse
+from sqlalchemy import inspect, select, text, bindparam, type_coerce
+from sqlalchemy.types import NullType, LargeBinary
+from app import create_app
+from app.extensions import db
+from app.models import Job, Resume
+from app.models.types import is_compressed, decompress_bytes
+from app.services.nlp_service import NLPService
+
+# table -> (compressed text column or None, compressed JSON column, column holding the sectioned text)
+MIGRATIONS = {
+    Resume.__table__: ('extracted_text', 'sectioned_text', 'extracted_text'),
+    Job.__table__: (None, 'sectioned_text', 'description'),
+}
+
+
+def database_size() -> int | None:
+    """Returns the size of the database in bytes, where the dialect can report it."""
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        page_count = db.session.execute(text("PRAGMA page_count")).scalar()
+        page_size = db.session.execute(text("PRAGMA page_size")).scalar()
+        return page_count * page_size
+    if dialect == 'postgresql':
+        return db.session.execute(text("SELECT pg_database_size(current_database())")).scalar()
+    return None
+
+
+def convert_postgres_columns():
+    """Changes the text and JSON columns to bytea, keeping their content as UTF-8 bytes."""
+    inspector = inspect(db.engine)
+    for table, (text_column, json_column, _) in MIGRATIONS.items():
+        column_types = {c['name']: c['type'] for c in inspector.get_columns(table.name)}
+        for column, cast in ((text_column, ''), (json_column, '::text')):
+            if column and not isinstance(column_types[column], LargeBinary):
+                print(f"INFO: Converting {table.name}.{column} to bytea...")
+                db.session.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN {column} TYPE bytea "
+                                        f"USING convert_to({column}{cast}, 'UTF8')"))
+    db.session.commit()
+
+
+def _decode_json(value):
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    return json.loads(decompress_bytes(value))
+
+
+def migrate_table(table, text_column: str, json_column: str, source_column: str, batch_size: int) -> int:
+    """Rewrites every row of a table that is not in the compressed format yet. Returns the rows converted."""
+    raw_columns = [type_coerce(table.c[name], NullType()).label(name)
+                   for name in dict.fromkeys(c for c in (text_column, json_column, source_column) if c)]
+    update_values = {json_column: bindparam('b_json')}
+    if text_column:
+        update_values[text_column] = bindparam('b_text')
+    update = table.update().where(table.c.id == bindparam('b_id')).values(**update_values)
+
+    converted, last_id = 0, ''
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, *raw_columns).where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        ).mappings().all()
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+
+        updates = []
+        for row in rows:
+            raw_text = row[text_column] if text_column else None
+            if (row[json_column] is None or is_compressed(row[json_column])) and \
+                    (raw_text is None or is_compressed(raw_text)):
+                continue
+
+            source = row[source_column]
+            source = decompress_bytes(source).decode('utf-8') if source is not None else None
+            sectioned = _decode_json(row[json_column])
+            if isinstance(sectioned, dict) and 'raw_sections' in sectioned and source:
+                sectioned = {key: value for key, value in sectioned.items() if key != 'raw_sections'}
+                sectioned['section_spans'] = NLPService._split_sections(source)
+
+            values = {'b_id': row['id'], 'b_json': sectioned}
+            if text_column:
+                values['b_text'] = decompress_bytes(raw_text).decode('utf-8') if raw_text is not None else None
+            updates.append(values)
+
+        if updates:
+            db.session.execute(update, updates)
+        db.session.commit()
+        converted += len(updates)
+        print(f"  {table.name}: {converted} rows converted (up to id {last_id})")
+    return converted
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        size_before = database_size()
+        if dialect == 'postgresql':
+            convert_postgres_columns()
+
+        for table, (text_column, json_column, source_column) in MIGRATIONS.items():
+            print(f"Migrating {table.name}...")
+            migrate_table(table, text_column, json_column, source_column, args.batch_size)
+
+        if dialect == 'sqlite':
+            # Give the freed pages back to the file system.
+            db.session.close()
+            with db.engine.connect() as connection:
+                connection.execution_options(isolation_level='AUTOCOMMIT').execute(text("VACUUM"))
+        size_after = database_size()
+
+    if size_before and size_after:
+        print(f"SUCCESS: Database size {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB "
+              f"({size_before / size_after:.1f}x smaller).")
+    else:
+        print("SUCCESS: Storage migration complete.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
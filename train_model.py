@@ -4,7 +4,6 @@ Standalone machine learning pipeline for retraining the candidate ranking model.
 """
 import os
 import joblib
-import pandas as pd
 from datetime import datetime
 import xgboost as xgb
 from sklearn.model_selection import train_test_split, GridSearchCV
@@ -14,6 +13,7 @@ from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from app import create_app
 from app.models import Application
+from app.services.feature_store import backfill_application_features, load_application_feature_frame
 
 print("Starting Advanced Model Retraining Pipeline ")
 
@@ -21,22 +21,17 @@ app = create_app()
 
 with app.app_context():
     print("Fetching labeled data from the database...")
-    # Fetch Labeled Data
-    labeled_apps = Application.query.filter(
-        Application.status.in_(['Accepted', 'Declined']),
-        Application.feature_scores.isnot(None)
-    ).all()
+    # Fetch Labeled Data, from the primary: a replica may not have the backfilled rows yet
+    backfill_application_features()
+    labeled_statuses = Application.status.in_(['Accepted', 'Declined'])
+    df = load_application_feature_frame(labeled_statuses, extra_columns=(Application.status,))
 
-    if len(labeled_apps) < 10: # Threshold lowered for easier testing
-        print(f"PROCESS CANCELED: Not enough labeled data. Found {len(labeled_apps)}, but need at least 20.")
+    if len(df) < 10: # Threshold lowered for easier testing
+        print(f"PROCESS CANCELED: Not enough labeled data. Found {len(df)}, but need at least 20.")
         exit()
 
     #  Prepare Full Dataset
-    features = [app.feature_scores for app in labeled_apps]
-    labels = [1 if app.status == 'Accepted' else 0 for app in labeled_apps]
-
-    df = pd.DataFrame(features)
-    target = pd.Series(labels)
+    target = (df.pop('status') == 'Accepted').astype(int)
 
     numeric_features = [col for col in df.columns if 'similarity' in col]
     numeric_features.extend(["accomplishment_score", "readability_score"])